@@ -0,0 +1,91 @@
+"""
+오디오만 모드 벤치마크 (로컬 서버, 네트워크 없음, ffmpeg 필요)
+
+    python -m bench.audio --ffmpeg-location ./ffmpeg [--tracks 6] [--duration 120] [--conn-rate 2M]
+                          [--formats mp3,m4a,opus] [--out results.json]
+
+ffmpeg로 만든 AAC 트랙 tracks개를 RSS 플레이리스트로 받아 저장 형식별로
+변환을 다운로드 스레드에서 바로 할 때(pipelined_merge 끔)와 후처리 풀로 넘길 때의 걸린 시간을 비교한다.
+m4a는 코덱이 같아 ffmpeg 없이 끝나고, opus / mp3는 변환한다. --conn-rate는 연결당 속도 (바이트/초)
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from bench.download import _isolate
+from bench.throttle_server import ThrottleServer
+from core.bandwidth import parse_rate
+from core.engine import DownloadEngine
+from core.options import build_options
+
+
+def make_tracks(directory, ffmpeg, tracks, duration):
+    """a{i}.mp4: AAC 128k 사인파 (throttle_server가 .mp4만 속도 제한)"""
+    for i in range(tracks):
+        subprocess.run([ffmpeg, "-loglevel", "error", "-y", "-f", "lavfi",
+                        "-i", f"sine=frequency={220 + 40 * i}:duration={duration}",
+                        "-c:a", "aac", "-b:a", "128k", os.path.join(directory, f"a{i}.mp4")], check=True)
+
+
+def write_feed(server, tracks):
+    items = "".join(f"<item><title>track {i}</title><link>{server.url(f'a{i}.mp4')}</link><guid>a{i}</guid></item>"
+                    for i in range(tracks))
+    with open(os.path.join(server.directory, "audio.xml"), "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>bench audio</title><link>{server.url()}</link>{items}</channel></rss>")
+
+
+def run_one(server, state_dir, ffmpeg_dir, audio_format, pipelined):
+    out_dir = os.path.join(state_dir, f"{audio_format}-{int(pipelined)}")
+    options = build_options(server.url("audio.xml"), output_path=out_dir, playlist_workers=1,
+                            staging_path="", audio_format=audio_format)
+    options.update(ffmpeg_location=ffmpeg_dir, pipelined_merge=pipelined, reuse_sessions=False)
+    errors = []
+    engine = DownloadEngine(options, on_error=errors.append)
+    start = time.perf_counter()
+    engine.run()
+    elapsed = time.perf_counter() - start
+    files = sorted(os.listdir(out_dir)) if os.path.isdir(out_dir) else []
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return {"format": audio_format, "pipelined": pipelined, "seconds": round(elapsed, 3),
+            "files": len(files), "error": errors[0] if errors else None}
+
+
+def run(ffmpeg_location, tracks, duration, conn_rate, formats):
+    ffmpeg = shutil.which("ffmpeg", path=ffmpeg_location) or ffmpeg_location
+    ffmpeg_dir = os.path.dirname(ffmpeg) if os.path.isfile(ffmpeg) else ffmpeg_location
+    state_dir = tempfile.TemporaryDirectory()
+    media_dir = tempfile.TemporaryDirectory()
+    _isolate(state_dir.name)
+    make_tracks(media_dir.name, ffmpeg, tracks, duration)
+    results = []
+    with ThrottleServer(directory=media_dir.name, videos=0, max_connections=0, conn_rate=conn_rate) as server:
+        write_feed(server, tracks)
+        for audio_format in formats:
+            for pipelined in (False, True):
+                results.append(run_one(server, state_dir.name, ffmpeg_dir, audio_format, pipelined))
+    state_dir.cleanup()
+    media_dir.cleanup()
+    return {"tracks": tracks, "duration": duration, "conn_rate": conn_rate, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ffmpeg-location", required=True, help="ffmpeg 실행 파일 또는 폴더")
+    parser.add_argument("--tracks", type=int, default=6)
+    parser.add_argument("--duration", type=int, default=120, help="트랙 길이 (초)")
+    parser.add_argument("--conn-rate", type=parse_rate, default=parse_rate("2M"))
+    parser.add_argument("--formats", type=lambda text: text.split(","), default=["mp3", "m4a", "opus"])
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    result = run(args.ffmpeg_location, args.tracks, args.duration, args.conn_rate, args.formats)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
@@ -0,0 +1,134 @@
+"""
+대역폭 제한 정확도 확인 (로컬 HLS 서버, 네트워크 없음)
+
+    python -m bench.bandwidth [--limit 4M] [--weights 1,1,2] [--caps 0,0,0] [--fragments 4]
+                              [--segments 80] [--segment-size 131072] [--out results.json]
+
+작업(영상)마다 DownloadEngine을 동시에 실행하고, 모든 작업이 받고 있던 구간에서
+- 합계 속도와 전체 상한(--limit)의 차이
+- 작업별 속도와 기대 배정(가중치 / 작업 상한으로 나눈 값)의 차이
+를 측정한다. 서버가 실제로 보낸 바이트(세그먼트 단위)로 합계를 한 번 더 확인
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from bench.download import BenchEngine, _isolate
+from bench.throttle_server import MANIFESTS, ThrottleServer
+from core.bandwidth import allocate, get_bandwidth_governor, parse_rate
+
+# 시작 직후(분석, 첫 연결) 구간은 빼고 측정
+WARMUP = 2.0
+
+
+class CountingEngine(BenchEngine):
+    """받은 바이트를 시각과 함께 기록 (제한기와 별도로 progress_hook에서 직접 계산)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.received = 0
+        self._seen = {}
+        self._count_lock = threading.Lock()
+
+    def progress_hook(self, d):
+        if d.get("status") == "downloading":
+            key = d.get("tmpfilename") or d.get("filename")
+            with self._count_lock:
+                last = self._seen.get(key, 0)
+                downloaded = d.get("downloaded_bytes") or 0
+                if downloaded > last:
+                    self.received += downloaded - last
+                    self._seen[key] = downloaded
+        super().progress_hook(d)
+
+
+def run(limit, weights, caps, fragments, segments, segment_size, interval=0.1):
+    state_dir = tempfile.TemporaryDirectory()
+    _isolate(state_dir.name)
+    governor = get_bandwidth_governor()
+    governor.configure(limit=limit, schedule=[])
+
+    samples = []
+    with ThrottleServer(segments=segments, max_connections=0, segment_size=segment_size,
+                        protocol="hls", videos=len(weights)) as server:
+        engines = []
+        for i, (weight, cap) in enumerate(zip(weights, caps)):
+            engines.append(CountingEngine({
+                "url": server.url(f"v{i}/{MANIFESTS['hls']}"),
+                "format": "best",
+                "output_path": os.path.join(state_dir.name, f"out{i}"),
+                "staging_path": os.path.join(state_dir.name, "staging"),
+                "max_fragments": fragments,
+                "use_archive": False,
+                "rate_limit": cap,
+                "bandwidth_weight": weight,
+            }))
+        threads = [threading.Thread(target=engine.run) for engine in engines]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            samples.append((time.monotonic() - start, server.bytes_sent, [e.received for e in engines],
+                            [e.result is not None for e in engines]))
+            time.sleep(interval)
+        for thread in threads:
+            thread.join()
+    state_dir.cleanup()
+
+    # 모든 작업이 아직 받고 있던 구간 (가장 먼저 끝난 작업의 마지막 샘플까지)
+    window = [s for s in samples if s[0] >= WARMUP and not any(s[3])]
+    if len(window) < 2:
+        return {"error": "측정 구간이 너무 짧습니다. --segments를 늘리세요."}
+    (t0, sent0, recv0, _), (t1, sent1, recv1, _) = window[0], window[-1]
+    elapsed = t1 - t0
+    rates = [(b - a) / elapsed for a, b in zip(recv0, recv1)]
+    expected = allocate(limit, [(i, w, c) for i, (w, c) in enumerate(zip(weights, caps))])
+
+    def error(actual, target):
+        return round((actual - target) / target * 100, 2) if target else None
+
+    return {
+        "limit": limit,
+        "window_s": round(elapsed, 2),
+        "total_rate": round(sum(rates)),
+        "total_error_pct": error(sum(rates), limit or sum(caps)),
+        "server_rate": round((sent1 - sent0) / elapsed),
+        "jobs": [{
+            "weight": weight,
+            "cap": cap,
+            "rate": round(rate),
+            "expected": round(expected[i]) if expected[i] else None,
+            "error_pct": error(rate, expected[i]),
+            "throttled_s": (engine.telemetry.phases.get("throttle") or [0, 0.0])[1],
+        } for i, (weight, cap, rate, engine) in enumerate(zip(weights, caps, rates, engines))],
+    }
+
+
+def _list(text, parse=int):
+    return [parse(x) for x in text.split(",") if x]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=parse_rate, default=parse_rate("4M"), help="전체 상한 (0 = 무제한)")
+    parser.add_argument("--weights", type=_list, default=[1, 1, 2])
+    parser.add_argument("--caps", type=lambda text: _list(text, parse_rate), default=None,
+                        help="작업별 상한 (쉼표 구분, 0 = 없음)")
+    parser.add_argument("--fragments", type=int, default=4)
+    parser.add_argument("--segments", type=int, default=80)
+    parser.add_argument("--segment-size", type=int, default=128 * 1024)
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    caps = args.caps or [0] * len(args.weights)
+    if len(caps) != len(args.weights):
+        parser.error("--caps와 --weights의 개수가 같아야 합니다.")
+    result = run(args.limit, args.weights, caps, args.fragments, args.segments, args.segment_size)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
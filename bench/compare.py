@@ -0,0 +1,68 @@
+"""
+두 bench.download 결과 비교
+
+    python -m bench.compare before.json after.json
+
+같은 조합(protocol, fragments, workers, videos)끼리 MB/s, TTFB, CPU 시간, 최대 RSS, 시그널 수의
+변화율을 표로 출력한다. MB/s가 --threshold(기본 10%) 넘게 떨어진 조합이 있으면 종료 코드 1
+"""
+import argparse
+import json
+import sys
+
+_METRICS = ("mb_per_s", "ttfb_s", "cpu_s", "peak_rss_mb")
+
+
+def _key(result):
+    return result["protocol"], result["fragments"], result["workers"], result["videos"]
+
+
+def _change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(before, after, threshold=10.0):
+    old = {_key(r): r for r in before["results"]}
+    rows = []
+    regressed = False
+    for result in after["results"]:
+        prev = old.get(_key(result))
+        if prev is None:
+            continue
+        row = {"case": "/".join(str(x) for x in _key(result))}
+        for metric in _METRICS:
+            row[metric] = (prev[metric], result[metric], _change(prev[metric], result[metric]))
+        row["signals"] = (prev["signals"]["progress"], result["signals"]["progress"], None)
+        change = row["mb_per_s"][2]
+        if change is not None and change < -threshold:
+            regressed = True
+        rows.append(row)
+    return rows, regressed
+
+
+def _format(cell):
+    before, after, change = cell
+    text = f"{before} → {after}"
+    return text + (f" ({change:+.1f}%)" if change is not None else "")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="MB/s 하락 허용 비율 (%%)")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+
+    rows, regressed = compare(before, after, args.threshold)
+    print(f"{before['meta'].get('commit')} → {after['meta'].get('commit')}")
+    print("case(protocol/fragments/workers/videos) | " + " | ".join(_METRICS) + " | progress signals")
+    for row in rows:
+        print(row["case"] + " | " + " | ".join(_format(row[m]) for m in (*_METRICS, "signals")))
+    sys.exit(1 if regressed else 0)
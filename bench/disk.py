@@ -0,0 +1,68 @@
+"""
+스테이징 폴더 -> 저장 폴더 옮기기(core.storage.finalize_file) 벤치마크
+
+    python -m bench.disk --target /mnt/nas/tmp [--staging /tmp] [--size 256M]
+                         [--buffers 64K,1M,8M,32M] [--fsync none,final] [--preallocate 0,1] [--out results.json]
+
+같은 파일시스템이면 이름만 바뀌므로, 쓰기 단위 / fsync / 사전 할당의 차이는 --target을 다른 디스크
+(네트워크 공유 등)로 줄 때 의미가 있다. 조합마다 MB/s와 걸린 시간을 JSON으로 출력한다.
+"""
+import argparse
+import itertools
+import json
+import os
+import tempfile
+import time
+
+from core.storage import finalize_file, parse_size
+
+
+def _make_source(directory, size, chunk=4 * 1024 * 1024):
+    path = os.path.join(directory, "source.bin")
+    block = os.urandom(chunk)
+    with open(path, "wb") as f:
+        for _ in range(size // chunk):
+            f.write(block)
+        f.write(block[:size % chunk])
+    return path
+
+
+def run(staging, target, size, buffers, fsyncs, preallocates):
+    results = []
+    with tempfile.TemporaryDirectory(dir=staging) as src_dir, tempfile.TemporaryDirectory(dir=target) as dst_dir:
+        same_device = os.stat(src_dir).st_dev == os.stat(dst_dir).st_dev
+        for buffer_size, fsync, preallocate in itertools.product(buffers, fsyncs, preallocates):
+            source = _make_source(src_dir, size)
+            destination = os.path.join(dst_dir, "target.bin")
+            start = time.perf_counter()
+            finalize_file(source, destination, buffer_size, preallocate, fsync)
+            elapsed = time.perf_counter() - start
+            os.remove(destination)
+            results.append({
+                "buffer": buffer_size,
+                "fsync": fsync,
+                "preallocate": preallocate,
+                "seconds": round(elapsed, 3),
+                "mb_per_s": round(size / elapsed / 1024 ** 2, 1),
+            })
+    return {"size": size, "same_device": same_device, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--staging", default=tempfile.gettempdir())
+    parser.add_argument("--target", required=True, help="저장 폴더가 있는 디스크의 임시 폴더")
+    parser.add_argument("--size", type=parse_size, default=parse_size("256M"))
+    parser.add_argument("--buffers", type=lambda text: [parse_size(x) for x in text.split(",")],
+                        default=[parse_size(x) for x in ("64K", "1M", "8M", "32M")])
+    parser.add_argument("--fsync", type=lambda text: text.split(","), default=["none", "final"])
+    parser.add_argument("--preallocate", type=lambda text: [x == "1" for x in text.split(",")], default=[False])
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    result = run(args.staging, args.target, args.size, args.buffers, args.fsync, args.preallocate)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
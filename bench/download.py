@@ -0,0 +1,216 @@
+"""
+다운로드 경로 벤치마크 (네트워크 없이 로컬 HLS/DASH 서버 사용)
+
+    python -m bench.download [--protocol hls,dash] [--fragments 1,4,16] [--workers 1,4]
+                             [--videos 4] [--segments 40] [--segment-size 262144]
+                             [--latency 0.02] [--conn-rate 0] [--total-rate 0] [--out results.json]
+
+DownloadEngine.run()을 현재 스레드에서 실행하고 조합마다
+- MB/s, 첫 바이트까지 시간(TTFB, 분석 포함), 걸린 시간
+- CPU 시간(전체 스레드), 최대 RSS
+- 콜백 수 (progress / finished / error, GUI에서는 같은 수의 시그널)
+- 엔진 계측(JobTelemetry)의 단계별 시간 / 재시도 수 / 최고 속도
+를 측정해 JSON으로 출력한다. --out을 주면 커밋 정보와 함께 파일로 저장 (bench.compare로 비교)
+workers가 1이고 videos가 1이면 단일 영상, 그 외에는 RSS 플레이리스트로 받는다.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import yt_dlp
+
+from bench.throttle_server import ThrottleServer
+from core import cache as metadata_cache, telemetry, tuning
+from core.engine import DownloadEngine
+
+
+class BenchEngine(DownloadEngine):
+    """첫 바이트 시각을 기록하고 ffmpeg 없이 실행 (임의 데이터라 후처리 불가)"""
+
+    first_byte = None
+
+    def progress_hook(self, d):
+        if self.first_byte is None and d.get("downloaded_bytes"):
+            self.first_byte = time.perf_counter()
+        super().progress_hook(d)
+
+    def _get_ffmpeg_path(self):
+        return os.path.join(tempfile.gettempdir(), "ytd-bench-no-ffmpeg")
+
+
+class RssSampler:
+    """실행 중 RSS를 주기적으로 읽어 최댓값 기록 (/proc이 없으면 ru_maxrss)"""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def current():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            # 리눅스는 KiB, macOS는 바이트 단위
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def run_case(server, fragments, workers, videos):
+    signals = {"progress": 0, "finished": 0, "error": 0}
+    messages = []
+    lock = threading.Lock()
+    url = server.url() if videos == 1 and workers == 1 else server.playlist_url()
+
+    def counter(name):
+        def on_signal(*args):
+            with lock:
+                signals[name] += 1
+                if name != "progress":
+                    messages.append(args[0])
+        return on_signal
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        engine = BenchEngine({
+            "url": url,
+            "format": "best",
+            "output_path": os.path.join(out_dir, "out"),
+            # 같은 파일시스템의 스테이징 (사용자 data/staging을 건드리지 않게)
+            "staging_path": os.path.join(out_dir, "staging"),
+            "max_fragments": fragments,
+            "playlist_workers": workers,
+            "use_archive": False,
+        }, on_progress=counter("progress"), on_finished=counter("finished"), on_error=counter("error"))
+
+        # 이전 조합의 메타데이터 캐시가 분석 시간을 가리지 않도록 비운다.
+        metadata_cache.get_metadata_cache().clear()
+        rejected = server.rejected
+        with RssSampler() as rss:
+            cpu = time.process_time()
+            start = time.perf_counter()
+            engine.run()
+            elapsed = time.perf_counter() - start
+            cpu = time.process_time() - cpu
+        size = _dir_size(out_dir)
+        summary = telemetry.get_telemetry_sink().last_job
+
+    return {
+        "protocol": server.protocol,
+        "fragments": fragments,
+        "workers": workers,
+        "videos": videos if url == server.playlist_url() else 1,
+        "bytes": size,
+        "elapsed_s": round(elapsed, 4),
+        "mb_per_s": round(size / 1e6 / elapsed, 3) if elapsed else None,
+        "ttfb_s": round(engine.first_byte - start, 4) if engine.first_byte else None,
+        "cpu_s": round(cpu, 4),
+        "peak_rss_mb": round(rss.peak / 1e6, 1),
+        "signals": signals,
+        "rejected_503": server.rejected - rejected,
+        "phases_s": {name: phase["seconds"] for name, phase in summary["phases"].items()},
+        "retries": summary["retries"],
+        "peak_mb_per_s": round(summary["peak_speed"] / 1e6, 3) if summary["peak_speed"] else None,
+        "ok": signals["error"] == 0,
+        "message": " ".join(messages[-1].split()) if messages else "",
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        return None
+
+
+def _isolate(tmp):
+    """사용자 캐시 / 세그먼트 조절 기록을 건드리지 않도록 벤치마크 전용으로 교체"""
+    metadata_cache._default_cache = metadata_cache.MetadataCache(os.path.join(tmp, "metadata.sqlite3"))
+    tuning._default_tuner = tuning.FragmentTuner(path=None)
+    telemetry._default_sink = telemetry.TelemetrySink(path=None)
+
+
+def run(protocols, fragments_list, workers_list, videos, segments, segment_size, latency,
+        conn_rate, total_rate, max_connections):
+    results = []
+    state_dir = tempfile.TemporaryDirectory()
+    _isolate(state_dir.name)
+    for protocol in protocols:
+        with ThrottleServer(segments=segments, max_connections=max_connections, conn_rate=conn_rate,
+                            total_rate=total_rate, segment_size=segment_size, protocol=protocol,
+                            videos=videos, latency=latency) as server:
+            for fragments, workers in itertools.product(fragments_list, workers_list):
+                results.append(run_case(server, fragments, workers, videos))
+    metadata_cache.get_metadata_cache().close()
+    state_dir.cleanup()
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "yt_dlp": yt_dlp.version.__version__,
+            "platform": platform.platform(),
+            "params": {
+                "videos": videos, "segments": segments, "segment_size": segment_size, "latency": latency,
+                "conn_rate": conn_rate, "total_rate": total_rate, "max_connections": max_connections,
+            },
+        },
+        "results": results,
+    }
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(",") if x]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--protocol", default="hls,dash")
+    parser.add_argument("--fragments", type=_int_list, default=[1, 4, 16], help="0 = 자동 조절")
+    parser.add_argument("--workers", type=_int_list, default=[1, 4])
+    parser.add_argument("--videos", type=int, default=4)
+    parser.add_argument("--segments", type=int, default=40)
+    parser.add_argument("--segment-size", type=int, default=256 * 1024)
+    parser.add_argument("--latency", type=float, default=0.02, help="세그먼트 응답 전 지연 (초)")
+    parser.add_argument("--conn-rate", type=int, default=0, help="연결당 바이트/초 (0 = 무제한)")
+    parser.add_argument("--total-rate", type=int, default=0, help="전체 바이트/초 (0 = 무제한)")
+    parser.add_argument("--max-connections", type=int, default=0, help="초과 시 503 (0 = 무제한)")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = run(args.protocol.split(","), args.fragments, args.workers, args.videos, args.segments,
+                 args.segment_size, args.latency, args.conn_rate, args.total_rate, args.max_connections)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
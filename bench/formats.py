@@ -0,0 +1,97 @@
+"""
+포맷 선택(core.formats) 벤치마크 (네트워크 없음, 받지 않고 고르기만)
+
+    python -m bench.formats [--videos 200] [--quality 1080] [--max-size 0] [--seed 1] [--out results.json]
+
+YouTube와 비슷한 포맷 표(avc1 / vp9 / av1, 30 / 60fps, 길이와 비트레이트는 영상마다 다름)를 videos개 만들어
+  - preset: 품질 프리셋 형식 문자열(QUALITY_PRESETS)을 yt-dlp 선택기로
+  - budget: FormatBudget 표 선택 (같은 화질이면 작은 파일, --max-size가 있으면 그 안에서)
+으로 골랐을 때 영상당 크기 합계 / 해상도 분포 / 선택에 걸린 시간을 JSON으로 출력한다.
+"""
+import argparse
+import copy
+import json
+import random
+import time
+from collections import Counter
+
+from core.bandwidth import parse_rate
+from core.formats import FormatBudget, install_selector
+from core.options import QUALITY_HEIGHTS, QUALITY_PRESETS
+from core.postprocess import PipelinedYoutubeDL
+
+# (format_id, 높이, fps, vcodec, ext, 1080p30 avc1 대비 비트레이트 비율)
+VIDEO_FORMATS = [
+    ("134", 360, 30, "avc1.4d401e", "mp4", 0.13), ("243", 360, 30, "vp09.00.21.08", "webm", 0.10),
+    ("136", 720, 30, "avc1.4d401f", "mp4", 0.5), ("247", 720, 30, "vp09.00.31.08", "webm", 0.4),
+    ("298", 720, 60, "avc1.4d4020", "mp4", 0.8), ("302", 720, 60, "vp09.00.40.08", "webm", 0.75),
+    ("137", 1080, 30, "avc1.640028", "mp4", 1.0), ("248", 1080, 30, "vp09.00.40.08", "webm", 0.95),
+    ("399", 1080, 30, "av01.0.08M.08", "mp4", 0.65),
+    ("299", 1080, 60, "avc1.64002a", "mp4", 1.8), ("303", 1080, 60, "vp09.00.41.08", "webm", 2.0),
+    ("271", 1440, 30, "vp09.00.50.08", "webm", 2.9), ("313", 2160, 30, "vp09.00.51.08", "webm", 6.0),
+]
+AUDIO_FORMATS = [("140", "mp4a.40.2", "m4a", 129), ("251", "opus", "webm", 135)]
+
+
+def make_info(n, rng):
+    """영상 하나의 info (길이 2~30분, 1080p30 avc1 비트레이트 1.5~4Mbps, 60fps / 고해상도는 일부 영상만)"""
+    duration = rng.randint(120, 1800)
+    base = rng.uniform(1500, 4000)
+    high_fps = rng.random() < 0.5
+    max_height = rng.choice((1080, 1440, 2160))
+    formats = []
+    for fid, height, fps, vcodec, ext, ratio in VIDEO_FORMATS:
+        if fps > 30 and not high_fps or height > max_height:
+            continue
+        kbps = base * ratio * rng.uniform(0.9, 1.1)
+        formats.append({"format_id": fid, "url": f"http://bench/{n}/{fid}", "height": height, "fps": fps,
+                        "vcodec": vcodec, "acodec": "none", "ext": ext, "tbr": kbps,
+                        "filesize_approx": int(kbps * 1000 / 8 * duration)})
+    for fid, acodec, ext, kbps in AUDIO_FORMATS:
+        formats.append({"format_id": fid, "url": f"http://bench/{n}/{fid}", "vcodec": "none", "acodec": acodec,
+                        "ext": ext, "tbr": kbps, "filesize_approx": int(kbps * 1000 / 8 * duration)})
+    return {"id": f"v{n}", "title": f"video {n}", "duration": duration, "formats": formats,
+            "extractor": "generic", "extractor_key": "Generic", "webpage_url": f"http://bench/{n}"}
+
+
+def select(infos, fmt, budget=None):
+    # 엔진과 같은 YoutubeDL (포맷 표 선택기에 영상 길이를 넘긴다)
+    ydl = PipelinedYoutubeDL({"quiet": True, "no_warnings": True, "simulate": True, "format": fmt})
+    if budget is not None:
+        install_selector(ydl, budget, fmt)
+    total, heights = 0, Counter()
+    start = time.perf_counter()
+    for info in infos:
+        result = ydl.process_ie_result(copy.deepcopy(info), download=False)
+        chosen = result.get("requested_formats") or [result]
+        total += sum(f.get("filesize") or f.get("filesize_approx") or 0 for f in chosen)
+        heights[f"{result.get('height')}p{round(result.get('fps') or 0)}"] += 1
+    return {"bytes": total, "mb_per_video": round(total / len(infos) / 1e6, 1),
+            "seconds": round(time.perf_counter() - start, 3), "heights": dict(sorted(heights.items()))}
+
+
+def run(videos, quality, max_size, seed):
+    rng = random.Random(seed)
+    infos = [make_info(n, rng) for n in range(videos)]
+    fmt = QUALITY_PRESETS[QUALITY_HEIGHTS[quality]]
+    preset = select(infos, fmt)
+    budget = select(infos, fmt, FormatBudget(max_height=quality, size_budget=max_size))
+    return {"videos": videos, "quality": quality, "max_size": max_size, "preset": preset, "budget": budget,
+            "saved": round(1 - budget["bytes"] / preset["bytes"], 3)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=200)
+    parser.add_argument("--quality", type=int, choices=sorted(QUALITY_HEIGHTS), default=1080)
+    parser.add_argument("--max-size", type=parse_rate, default=0, help="영상 하나의 최대 크기 (예: 300M)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    result = run(args.videos, args.quality, args.max_size, args.seed)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
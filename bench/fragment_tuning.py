@@ -0,0 +1,65 @@
+"""
+세그먼트 동시 다운로드 수 자동 조절 확인
+
+    python -m bench.fragment_tuning [--runs 8] [--max-connections 6] [--conn-rate 524288]
+
+bench.throttle_server(연결당 속도 제한 + 동시 연결 초과 시 503)에서 같은 HLS를 여러 번 받으며
+매 회 사용한 동시 세그먼트 수, 걸린 시간, 재시도 수를 JSON으로 출력한다.
+자동 조절이 서버 한도(--max-connections) 근처로 수렴하는지 확인한다.
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import yt_dlp
+
+from bench.throttle_server import ThrottleServer
+from core.tuning import FragmentTuner, FragmentTuningSession
+
+
+def run(runs, segments, max_connections, conn_rate, total_rate, initial):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, \
+            ThrottleServer(segments=segments, max_connections=max_connections,
+                           conn_rate=conn_rate, total_rate=total_rate) as server:
+        tuner = FragmentTuner(path=None, initial=initial)
+        for i in range(runs):
+            session = FragmentTuningSession(tuner)
+            rejected = server.rejected
+            with yt_dlp.YoutubeDL({
+                "outtmpl": f"{tmp}/run{i}.%(ext)s",
+                "quiet": True,
+                "noprogress": True,
+                "progress_hooks": [session.hook],
+                "retry_sleep_functions": session.retry_sleep_functions(),
+                "fixup": "never",
+                "retries": 10,
+                "fragment_retries": 10,
+            }) as ydl:
+                session.attach(ydl)
+                start = time.perf_counter()
+                ydl.download([server.url()])
+                elapsed = time.perf_counter() - start
+            results.append({
+                "run": i + 1,
+                "concurrency": session.concurrency_used,
+                "elapsed_s": round(elapsed, 3),
+                "retries": session.retries,
+                "rejected_503": server.rejected - rejected,
+                "next": tuner.suggest("127.0.0.1"),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=8)
+    parser.add_argument("--segments", type=int, default=40)
+    parser.add_argument("--max-connections", type=int, default=6)
+    parser.add_argument("--conn-rate", type=int, default=512 * 1024)
+    parser.add_argument("--total-rate", type=int, default=0)
+    parser.add_argument("--initial", type=int, default=16)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs, args.segments, args.max_connections,
+                         args.conn_rate, args.total_rate, args.initial), indent=2))
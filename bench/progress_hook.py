@@ -0,0 +1,82 @@
+"""
+progress_hook 마이크로벤치마크
+
+    python -m bench.progress_hook [--calls 200000] [--files 16]
+
+세그먼트 16개가 번갈아 보고하는 상황을 흉내 내어
+- 호출 1회당 평균 비용 (µs)
+- 실제로 보낸 진행 콜백 수 (GUI에서는 같은 수의 시그널)
+를 기존 방식(매 호출마다 문자열 파싱 + 시그널)과 비교한다.
+"""
+import argparse
+import json
+import time
+
+from core.engine import DownloadEngine
+
+
+def _make_events(calls, files):
+    total = 50 * 1024 * 1024
+    for i in range(calls):
+        downloaded = total * i // calls
+        yield {
+            "status": "downloading",
+            "filename": f"video.f{i % files}.mp4",
+            "downloaded_bytes": downloaded,
+            "total_bytes_estimate": total,
+            "speed": 8 * 1024 * 1024,
+            "_percent_str": f"{downloaded * 100 / total:5.1f}%",
+            "info_dict": {"title": "벤치마크 영상", "ext": "mp4"},
+        }
+
+
+def legacy_hook(emit, d):
+    """변경 전 progress_hook의 downloading 경로 (비교 기준)"""
+    extension = d.get("info_dict", []).get("ext", "null")
+    title = d.get("info_dict").get("title")
+    display_title = title[:50] + "\n" + title[50:] if len(title) > 50 else ""
+    percent = d.get("_percent_str", "").replace("%", "").strip()
+    emit(float(percent or 0), f"영상 다운로드 중 : {display_title}{extension}")
+
+
+def run(calls, files):
+    events = list(_make_events(calls, files))
+
+    counts = {"legacy": 0, "current": 0}
+    key = "legacy"
+
+    def on_progress(*_):
+        counts[key] += 1
+
+    engine = DownloadEngine({}, on_progress=on_progress)
+
+    # 기존 방식 (같은 콜백으로 보냄)
+    start = time.perf_counter()
+    for d in events:
+        legacy_hook(engine.on_progress, d)
+    legacy_elapsed = time.perf_counter() - start
+
+    # 현재 DownloadEngine.progress_hook
+    key = "current"
+    start = time.perf_counter()
+    for d in events:
+        engine.progress_hook(d)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "calls": calls,
+        "files": files,
+        "legacy_us_per_call": legacy_elapsed / calls * 1e6,
+        "legacy_signals": counts["legacy"],
+        "us_per_call": elapsed / calls * 1e6,
+        "signals": counts["current"],
+        "elapsed_s": elapsed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--files", type=int, default=16)
+    args = parser.parse_args()
+    print(json.dumps(run(args.calls, args.files), indent=2))
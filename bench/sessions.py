@@ -0,0 +1,83 @@
+"""
+YoutubeDL 세션 재사용 벤치마크 (로컬 keep-alive HLS 서버, 네트워크 없음)
+
+    python -m bench.sessions [--jobs 6] [--segments 10] [--fragments 4] [--handshake-delay 0.05]
+                             [--latency 0] [--out results.json]
+
+같은 서버의 영상 jobs개를 차례로 받는 작업을 세션 재사용(core.sessions) 켜고 / 끄고 실행해서
+작업마다 서버가 받은 새 연결 수(= TCP/TLS 핸드셰이크 수)와 시작부터 첫 바이트까지 시간, 걸린 시간을 비교한다.
+--handshake-delay는 새 연결마다 서버가 기다리는 시간 (TLS 핸드셰이크 비용 흉내)
+yt-dlp가 requests 요청 처리기를 쓸 때만 연결이 유지된다. (urllib 처리기는 요청마다 연결을 닫음)
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+
+from bench.download import BenchEngine, _isolate
+from bench.throttle_server import MANIFESTS, ThrottleServer
+from core import sessions, telemetry
+
+
+def run_jobs(server, out_dir, jobs, fragments, reuse):
+    sessions._default_pool = sessions.SessionPool()
+    rows = []
+    for i in range(jobs):
+        before = server.connections
+        engine = BenchEngine({
+            "url": server.url(f"v{i}/{MANIFESTS['hls']}"),
+            "format": "best",
+            "output_path": os.path.join(out_dir, f"reuse{int(reuse)}"),
+            "staging_path": "",
+            "max_fragments": fragments,
+            "use_archive": False,
+            "reuse_sessions": reuse,
+        })
+        engine.run()
+        summary = telemetry.get_telemetry_sink().last_job
+        rows.append({
+            "result": summary["result"],
+            "connections": server.connections - before,
+            "first_byte_s": summary["first_byte_s"],
+            "duration_s": summary["duration_s"],
+            "sessions": summary["sessions"],
+        })
+    sessions.get_session_pool().close()
+    # 첫 작업은 어느 쪽이든 새로 연결하므로 평균에서 뺀다.
+    warm = rows[1:] or rows
+    return {
+        "reuse_sessions": reuse,
+        "mean_connections": round(statistics.mean(r["connections"] for r in warm), 2),
+        "mean_first_byte_s": round(statistics.mean(r["first_byte_s"] or 0 for r in warm), 4),
+        "mean_duration_s": round(statistics.mean(r["duration_s"] for r in warm), 4),
+        "jobs": rows,
+    }
+
+
+def run(jobs, segments, fragments, handshake_delay, latency):
+    state_dir = tempfile.TemporaryDirectory()
+    _isolate(state_dir.name)
+    with ThrottleServer(segments=segments, max_connections=0, protocol="hls", videos=jobs, latency=latency,
+                        keep_alive=True, handshake_delay=handshake_delay) as server:
+        results = [run_jobs(server, state_dir.name, jobs, fragments, reuse) for reuse in (False, True)]
+    state_dir.cleanup()
+    return {"handshake_delay": handshake_delay, "fragments": fragments, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=6)
+    parser.add_argument("--segments", type=int, default=10)
+    parser.add_argument("--fragments", type=int, default=4)
+    parser.add_argument("--handshake-delay", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    result = run(args.jobs, args.segments, args.fragments, args.handshake_delay, args.latency)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
@@ -0,0 +1,92 @@
+"""
+GUI 시작 시간 측정 (import 분석 포함)
+
+    python -m bench.startup [--runs 3] [--top 15] [--offscreen] [--out startup.json]
+
+main.py를 '-X importtime --startup-report --exit-after-startup'으로 runs번 실행해
+- 단계별 경과 시간 (imports / window / first_paint / web_view / prewarm_* / ready, ms, 중앙값)
+- 첫 화면 전 / 후 import 시간을 최상위 패키지별로 합산 (self 시간 기준, ms)
+- 첫 화면 전 import 중 누적 시간이 큰 모듈 --top개
+를 JSON으로 출력한다. 첫 화면 전 import에 yt_dlp가 보이면 지연 로드가 깨진 것.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_output(text):
+    """표준 에러 출력에서 (단계별 ms, 첫 화면 전 import 목록, 후 import 목록)"""
+    marks = {}
+    before, after = [], []
+    painted = False
+    for line in text.splitlines():
+        if line.startswith("startup: "):
+            _, name, ms = line.split()
+            marks[name] = float(ms.rstrip("ms"))
+            painted = painted or name == "first_paint"
+        elif line.startswith("import time:") and "|" in line:
+            self_us, cumulative_us, module = line[len("import time:"):].split("|")
+            if not self_us.strip().isdigit():
+                continue  # 헤더 줄
+            (after if painted else before).append(
+                (module.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return marks, before, after
+
+
+def by_package(imports):
+    totals = defaultdict(float)
+    for module, self_ms, _ in imports:
+        totals[module.split(".")[0]] += self_ms
+    return {name: round(ms, 1) for name, ms in sorted(totals.items(), key=lambda x: -x[1])}
+
+
+def run_once(offscreen):
+    env = dict(os.environ)
+    if offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(_ROOT, "main.py"), "--startup-report", "--exit-after-startup"],
+        capture_output=True, text=True, env=env, cwd=_ROOT, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f"main.py 종료 코드 {proc.returncode}\n{proc.stderr[-2000:]}")
+    return parse_output(proc.stderr)
+
+
+def run(runs, top, offscreen):
+    samples = [run_once(offscreen) for _ in range(runs)]
+    names = list(samples[0][0])
+    marks = {name: statistics.median(s[0][name] for s in samples if name in s[0]) for name in names}
+    # import 목록은 마지막 실행 기준 (모듈 캐시(.pyc)가 만들어진 뒤)
+    _, before, after = samples[-1]
+    return {
+        "runs": runs,
+        "marks_ms": marks,
+        "imports_before_paint_ms": by_package(before),
+        "imports_after_paint_ms": by_package(after),
+        "top_before_paint": [
+            {"module": module, "cumulative_ms": round(cumulative, 1)}
+            for module, _, cumulative in sorted(before, key=lambda x: -x[2])[:top]
+        ],
+        "yt_dlp_before_paint": any(module == "yt_dlp" for module, _, _ in before),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--offscreen", action="store_true", help="창 없이 실행 (QT_QPA_PLATFORM=offscreen)")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    text = json.dumps(run(args.runs, args.top, args.offscreen), indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
@@ -0,0 +1,129 @@
+"""
+자막만 모드 처리량 측정 (네트워크 없이 로컬 서버)
+
+    python -m bench.subtitles [--videos 2000] [--workers 1,4,16] [--format srt]
+
+- 임시 폴더에 영상 videos개의 VTT 자막(ko, en)을 만들고 keep-alive(HTTP/1.1) 서버로 제공
+- 영상 메타데이터는 메모리 캐시에 미리 넣어 둔다. (추출 없이 캐시로 자막 존재 여부 확인)
+- ko, en, th를 요청 (th는 없는 언어 -> 요청하지 않아야 함)
+조합마다 저장한 파일 수, 걸린 시간, 분당 파일 수, 서버가 받은 연결 / 요청 수를 JSON으로 출력한다.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import yt_dlp
+
+from core.analyzer import canonical_key
+from core.cache import MetadataCache
+from core.subtitles import download_subtitles
+
+_CUE = "{n:02d}:{s:02d}.000 --> 00:{n:02d}:{s:02d}.900\n<c>자막</c> 줄 {i} &amp; {lang}\n\n"
+
+
+def make_vtt(lang, index, cues=120):
+    return "WEBVTT\nKind: captions\nLanguage: {}\n\n".format(lang) + "".join(
+        "00:" + _CUE.format(n=i // 60, s=i % 60, i=i, lang=lang) for i in range(cues)) + f"NOTE 영상 {index}\n"
+
+
+class SubtitleServer:
+    def __init__(self, videos, langs=("ko", "en")):
+        self.directory = tempfile.mkdtemp(prefix="ytd-bench-subs-")
+        for i in range(videos):
+            for lang in langs:
+                with open(os.path.join(self.directory, f"{i}.{lang}.vtt"), "w", encoding="utf-8") as f:
+                    f.write(make_vtt(lang, i))
+        self.connections = 0
+        self.requests = 0
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 헤더와 본문을 따로 쓰므로 Nagle + 지연 ACK로 요청마다 40ms가 붙지 않게
+            disable_nagle_algorithm = True
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=server.directory, **kwargs)
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                super().do_GET()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def make_playlist(server, videos, cache, langs=("ko", "en")):
+    """url 참조 entries의 플레이리스트 + 영상별 메타데이터를 캐시에 저장"""
+    entries = []
+    for i in range(videos):
+        url = f"{server.base}/watch/{i}"
+        cache.put(canonical_key(url), {
+            "id": f"v{i}",
+            "title": f"bench video {i}",
+            "subtitles": {lang: [{"ext": "vtt", "url": f"{server.base}/{i}.{lang}.vtt"}] for lang in langs},
+        })
+        entries.append({"_type": "url", "url": url, "title": f"bench video {i}"})
+    return {"_type": "playlist", "id": "bench", "title": "bench", "playlist_count": videos, "entries": entries}
+
+
+def run(videos, workers_list, fmt):
+    results = []
+    server = SubtitleServer(videos)
+    cache = MetadataCache(":memory:")
+    try:
+        for workers in workers_list:
+            playlist = make_playlist(server, videos, cache)
+            connections, requests = server.connections, server.requests
+            with tempfile.TemporaryDirectory() as out_dir, yt_dlp.YoutubeDL({"quiet": True}) as ydl:
+                start = time.perf_counter()
+                files, skipped, failed = download_subtitles(
+                    ydl, playlist, ["ko", "en", "th"], out_dir, fmt=fmt, cache=cache, workers=workers,
+                    make_ydl=lambda: yt_dlp.YoutubeDL({"quiet": True}))
+                elapsed = time.perf_counter() - start
+            results.append({
+                "workers": workers,
+                "files": files,
+                "skipped": skipped,
+                "failed": len(failed),
+                "elapsed_s": round(elapsed, 3),
+                "files_per_min": round(files / elapsed * 60) if elapsed else None,
+                "connections": server.connections - connections,
+                "requests": server.requests - requests,
+            })
+    finally:
+        cache.close()
+        server.close()
+    return results
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(",") if x]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=2000)
+    parser.add_argument("--workers", type=_int_list, default=[1, 4, 16])
+    parser.add_argument("--format", default="srt", choices=["srt", "txt", "vtt"])
+    args = parser.parse_args()
+    print(json.dumps(run(args.videos, args.workers, args.format), indent=2))
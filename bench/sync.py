@@ -0,0 +1,96 @@
+"""
+구독 동기화(core.sync) 벤치마크 (로컬 RSS 피드, 네트워크 없음)
+
+    python -m bench.sync [--sources 200] [--entries 50] [--workers 1,16] [--handshake-delay 0.02]
+                         [--out results.json]
+
+피드 sources개(영상 entries개씩)를 구독하고
+  1) 첫 확인 (backfill 없음: 지금 있는 영상은 기준으로만 기록)
+  2) 바뀌지 않은 피드 다시 확인
+  3) 피드 10%에 새 영상 하나씩 추가 후 확인
+을 동시 확인 수(workers)별로 실행해 걸린 시간 / 찾은 새 영상 / 등록한 작업 수를 JSON으로 출력한다.
+작업은 등록만 하고 받지 않는다. --handshake-delay는 요청마다 서버가 기다리는 시간 (원격 서버 응답 지연 흉내)
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from bench.download import _isolate
+from bench.throttle_server import ThrottleServer
+from core import sessions
+from core.sync import SyncRunner, SyncStore
+
+
+def write_feed(server, n, first, count):
+    """feed{n}.xml: 최신 영상이 앞에 오는 RSS (first부터 count개)"""
+    base = server.url(f"feed{n}")
+    items = "".join(
+        f"<item><title>feed {n} video {i}</title><link>{base}/v{i}</link><guid>{base}/v{i}</guid></item>"
+        for i in range(first + count - 1, first - 1, -1)
+    )
+    with open(os.path.join(server.directory, f"feed{n}.xml"), "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>feed {n}</title><link>{base}/</link>{items}</channel></rss>")
+
+
+def timed(runner, force=True):
+    start = time.perf_counter()
+    results = runner.sync(force=force)
+    return {
+        "seconds": round(time.perf_counter() - start, 3),
+        "sources": len(results),
+        "errors": sum(1 for r in results if r["error"]),
+        "new": sum(r["new"] for r in results),
+        "queued": sum(r["queued"] for r in results),
+        "scanned": sum(r["scanned"] for r in results),
+    }
+
+
+def run_workers(server, state_dir, sources, entries, workers):
+    sessions._default_pool = sessions.SessionPool(max_idle=workers)
+    for n in range(sources):
+        write_feed(server, n, 0, entries)
+    store = SyncStore(os.path.join(state_dir, f"sync-{workers}.sqlite3"))
+    for n in range(sources):
+        store.add_source(server.url(f"feed{n}.xml"), {"output_path": state_dir}, backfill=False)
+    submitted = []
+    runner = SyncRunner(store, submitted.append, workers=workers)
+
+    initial = timed(runner)
+    unchanged = timed(runner)
+    changed = list(range(0, sources, 10))
+    for n in changed:
+        write_feed(server, n, 0, entries + 1)
+    updated = timed(runner)
+    store.close()
+    sessions.get_session_pool().close()
+    return {"workers": workers, "initial": initial, "unchanged": unchanged, "updated": updated,
+            "submitted": len(submitted), "expected_new": len(changed)}
+
+
+def run(sources, entries, workers_list, handshake_delay):
+    state_dir = tempfile.TemporaryDirectory()
+    _isolate(state_dir.name)
+    with ThrottleServer(max_connections=0, handshake_delay=handshake_delay, keep_alive=True) as server:
+        results = [run_workers(server, state_dir.name, sources, entries, workers) for workers in workers_list]
+    state_dir.cleanup()
+    return {"sources": sources, "entries": entries, "handshake_delay": handshake_delay, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--workers", type=lambda text: [int(x) for x in text.split(",")], default=[1, 16])
+    parser.add_argument("--handshake-delay", type=float, default=0.02)
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    result = run(args.sources, args.entries, args.workers, args.handshake_delay)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
@@ -0,0 +1,261 @@
+"""
+HLS / DASH 세그먼트 서버 (벤치마크 / 동작 확인용 로컬 대역)
+
+    python -m bench.throttle_server [--protocol hls|dash] [--videos 4] [--segments 40] [--max-connections 6]
+
+- 시작 시 임의 데이터로 된 영상 videos개를 임시 폴더에 만들어 제공
+  · HLS: v<N>/index.m3u8 + seg*.ts
+  · DASH: v<N>/manifest.mpd (영상+음성 단일 Representation, SegmentTemplate) + init.mp4 + seg*.m4s
+  · /playlist.xml: 모든 영상을 담은 RSS (yt-dlp generic 추출기가 플레이리스트로 인식)
+  (내용은 실제 영상이 아니므로 받는 쪽은 fixup / ffmpeg 없이 사용)
+- 세그먼트 응답 전 지연(--latency), 연결당 속도(--conn-rate), 서버 전체 속도(--total-rate) 제한
+- 동시 세그먼트 요청이 --max-connections를 넘으면 503 Service Unavailable 응답 (yt-dlp가 재시도하는 과부하 응답)
+- --keep-alive면 HTTP/1.1 keep-alive 연결 (기본은 요청마다 연결을 닫는 HTTP/1.0),
+  --handshake-delay로 새 연결마다 TLS 핸드셰이크 같은 지연. 받은 연결 수는 connections
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+_CHUNK = 16 * 1024
+_SEGMENT_EXTS = (".ts", ".m4s", ".mp4")
+MANIFESTS = {"hls": "index.m3u8", "dash": "manifest.mpd"}
+
+_MPD_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" minBufferTime="PT2S"
+     mediaPresentationDuration="PT{duration}S" profiles="urn:mpeg:dash:profile:isoff-live:2011">
+  <Period>
+    <AdaptationSet mimeType="video/mp4" codecs="avc1.4d401f,mp4a.40.2">
+      <Representation id="av" bandwidth="{bandwidth}" width="640" height="360">
+        <SegmentTemplate timescale="1" duration="{segment_time}" startNumber="0"
+                         initialization="init.mp4" media="seg$Number%04d$.m4s"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+"""
+
+
+class TokenBucket:
+    """초당 rate 바이트까지 허용 (여러 연결이 공유)"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _write_segments(directory, names, segment_size):
+    # 세그먼트마다 새로 만들면 준비가 오래 걸리므로 같은 임의 데이터를 재사용
+    data = os.urandom(segment_size)
+    for name in names:
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+
+
+def make_hls(directory, segments, segment_size=256 * 1024, segment_time=1):
+    """segments개 세그먼트(각 segment_size 바이트)의 HLS를 만든다. 재생 목록 경로 반환"""
+    names = [f"seg{i:04d}.ts" for i in range(segments)]
+    _write_segments(directory, names, segment_size)
+
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{segment_time}", "#EXT-X-MEDIA-SEQUENCE:0"]
+    for name in names:
+        lines += [f"#EXTINF:{segment_time:.1f},", name]
+    lines.append("#EXT-X-ENDLIST")
+
+    playlist = os.path.join(directory, MANIFESTS["hls"])
+    with open(playlist, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return playlist
+
+
+def make_dash(directory, segments, segment_size=256 * 1024, segment_time=1):
+    """segments개 세그먼트의 DASH(SegmentTemplate)를 만든다. MPD 경로 반환"""
+    _write_segments(directory, [f"seg{i:04d}.m4s" for i in range(segments)], segment_size)
+    _write_segments(directory, ["init.mp4"], 1024)
+
+    manifest = os.path.join(directory, MANIFESTS["dash"])
+    with open(manifest, "w", encoding="utf-8") as f:
+        f.write(_MPD_TEMPLATE.format(
+            duration=segments * segment_time,
+            segment_time=segment_time,
+            bandwidth=segment_size * 8 // segment_time,
+        ))
+    return manifest
+
+
+def make_feed(directory, base_url, protocol, videos):
+    """모든 영상을 담은 RSS (/playlist.xml)"""
+    items = "".join(
+        f"<item><title>bench video {i}</title><link>{base_url}/v{i}/{MANIFESTS[protocol]}</link>"
+        f"<guid>v{i}</guid></item>"
+        for i in range(videos)
+    )
+    with open(os.path.join(directory, "playlist.xml"), "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>bench playlist</title><link>{base_url}/</link>{items}</channel></rss>")
+
+
+class ThrottleServer:
+    """
+    with ThrottleServer(...) as server:
+        server.url()            # 첫 영상의 재생 목록 / MPD
+        server.playlist_url()   # 전체 영상 RSS
+    """
+
+    def __init__(self, port=0, segments=40, max_connections=6, conn_rate=0, total_rate=0, directory=None,
+                 segment_size=256 * 1024, protocol="hls", videos=1, latency=0.0, keep_alive=False,
+                 handshake_delay=0.0):
+        self.protocol = protocol
+        self.max_connections = max_connections
+        self.conn_rate = conn_rate
+        self.latency = latency
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self.bucket = TokenBucket(total_rate)
+        self.active = 0
+        self.rejected = 0
+        self.served = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+        self._own_dir = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="ytd-bench-")
+        make = make_hls if protocol == "hls" else make_dash
+        for i in range(videos):
+            video_dir = os.path.join(self.directory, f"v{i}")
+            if not os.path.exists(os.path.join(video_dir, MANIFESTS[protocol])):
+                os.makedirs(video_dir, exist_ok=True)
+                make(video_dir, segments, segment_size)
+
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" if keep_alive else "HTTP/1.0"
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=server.directory, **kwargs)
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+                if server.handshake_delay:
+                    time.sleep(server.handshake_delay)
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if not self.path.endswith(_SEGMENT_EXTS):
+                    return super().do_GET()
+                if not server._enter():
+                    self.send_error(503, "Service Unavailable")
+                    return
+                try:
+                    server._send_throttled(self)
+                finally:
+                    server._leave()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        make_feed(self.directory, f"http://127.0.0.1:{self.port}", protocol, videos)
+
+    def url(self, name=None):
+        return f"http://127.0.0.1:{self.port}/{name or f'v0/{MANIFESTS[self.protocol]}'}"
+
+    def playlist_url(self):
+        return self.url("playlist.xml")
+
+    def _enter(self):
+        with self._lock:
+            if self.max_connections and self.active >= self.max_connections:
+                self.rejected += 1
+                return False
+            self.active += 1
+            return True
+
+    def _leave(self):
+        with self._lock:
+            self.active -= 1
+            self.served += 1
+
+    def _send_throttled(self, handler):
+        path = handler.translate_path(handler.path)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            handler.send_error(404)
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        handler.send_response(200)
+        handler.send_header("Content-Type", "video/mp2t" if path.endswith(".ts") else "video/mp4")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        for offset in range(0, len(data), _CHUNK):
+            chunk = data[offset:offset + _CHUNK]
+            self.bucket.consume(len(chunk))
+            if self.conn_rate:
+                time.sleep(len(chunk) / self.conn_rate)
+            handler.wfile.write(chunk)
+        with self._lock:
+            self.bytes_sent += len(data)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._own_dir:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--protocol", choices=sorted(MANIFESTS), default="hls")
+    parser.add_argument("--videos", type=int, default=4)
+    parser.add_argument("--segments", type=int, default=40)
+    parser.add_argument("--segment-size", type=int, default=256 * 1024)
+    parser.add_argument("--latency", type=float, default=0.0, help="세그먼트 응답 전 지연 (초)")
+    parser.add_argument("--max-connections", type=int, default=6)
+    parser.add_argument("--conn-rate", type=int, default=512 * 1024, help="연결당 바이트/초 (0 = 무제한)")
+    parser.add_argument("--total-rate", type=int, default=0, help="전체 바이트/초 (0 = 무제한)")
+    parser.add_argument("--keep-alive", action="store_true", help="HTTP/1.1 keep-alive 연결")
+    parser.add_argument("--handshake-delay", type=float, default=0.0, help="새 연결마다 지연 (초)")
+    args = parser.parse_args()
+    with ThrottleServer(args.port, args.segments, args.max_connections, args.conn_rate, args.total_rate,
+                        segment_size=args.segment_size, protocol=args.protocol, videos=args.videos,
+                        latency=args.latency, keep_alive=args.keep_alive,
+                        handshake_delay=args.handshake_delay) as srv:
+        print(f"영상: {srv.url()}\n플레이리스트: {srv.playlist_url()}  (Ctrl+C로 종료)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,132 @@
+"""
+작업자 모드(core.workqueue) 벤치마크 (로컬 HLS 서버, 작업자는 별도 프로세스)
+
+    python -m bench.workers [--videos 24] [--segments 8] [--conn-rate 512K] [--workers 1,2,4] [--jobs 2]
+                            [--duplicates 0.25] [--kill-after 0] [--out results.json]
+
+영상 videos개(+ 같은 영상을 다시 넣은 작업 duplicates 비율)를 대기열에 넣고
+`cli.py --worker --exit-when-empty` 프로세스 workers개가 대기열이 빌 때까지 받는 데 걸린 시간을 잰다.
+연결당 속도(--conn-rate)가 제한된 서버에서 작업자 수에 따른 전체 처리량과,
+서버가 보낸 바이트 / 영상 크기 합계(1.0 = 같은 영상을 두 번 받지 않음)를 JSON으로 출력한다.
+--kill-after가 있으면 그 시간(초) 뒤 첫 작업자를 강제 종료해 lease가 끝난 작업이 다른 작업자에게 넘어가는지 확인한다.
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.throttle_server import ThrottleServer
+from core.bandwidth import parse_rate
+from core.options import build_options
+from core.workqueue import JobQueue
+
+_CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cli.py")
+
+
+def write_manifests(server, videos, segments):
+    """video{i}.m3u8: v{i}의 세그먼트를 가리키는 재생 목록 (generic 추출기의 영상 ID가 영상마다 다르게)"""
+    for i in range(videos):
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:1", "#EXT-X-MEDIA-SEQUENCE:0"]
+        for n in range(segments):
+            lines += ["#EXTINF:1.0,", f"v{i}/seg{n:04d}.ts"]
+        lines.append("#EXT-X-ENDLIST")
+        with open(os.path.join(server.directory, f"video{i}.m3u8"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def run_workers(server, state_dir, videos, duplicates, workers, jobs, lease, kill_after):
+    case_dir = os.path.join(state_dir, f"w{workers}")
+    os.makedirs(case_dir)
+    out_dir = os.path.join(case_dir, "out")
+    queue_path = os.path.join(case_dir, "queue.sqlite3")
+    queue = JobQueue(queue_path)
+    urls = [server.url(f"video{i}.m3u8") for i in range(videos)]
+    urls += urls[:int(videos * duplicates)]
+    for url in urls:
+        options = build_options(url, output_path=out_dir, max_fragments=1, playlist_workers=1)
+        options["reuse_sessions"] = False
+        queue.enqueue(options)
+
+    sent_before = server.bytes_sent
+    command = [sys.executable, _CLI, "--worker", "--exit-when-empty", "-j", str(jobs), "--queue", queue_path,
+               "--archive", os.path.join(case_dir, "archive.sqlite3"), "--lease", str(lease), "--telemetry-log", ""]
+    start = time.perf_counter()
+    # 작업자마다 작업 폴더를 따로 (메타데이터 캐시 / 스테이징 폴더는 작업자 로컬)
+    procs = []
+    for n in range(workers):
+        cwd = os.path.join(case_dir, f"worker{n}")
+        os.makedirs(cwd)
+        procs.append(subprocess.Popen(command + ["--worker-id", f"bench-{n}"], cwd=cwd,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    killed = False
+    if kill_after and workers > 1:
+        time.sleep(kill_after)
+        procs[0].send_signal(signal.SIGKILL)
+        killed = True
+    for proc in procs:
+        proc.wait()
+    elapsed = time.perf_counter() - start
+
+    unique_bytes = sum(os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir)) \
+        if os.path.isdir(out_dir) else 0
+    counts = queue.counts()
+    queue.close()
+    sent = server.bytes_sent - sent_before
+    return {
+        "workers": workers,
+        "jobs_per_worker": jobs,
+        "queued_jobs": len(urls),
+        "killed_worker": killed,
+        "seconds": round(elapsed, 2),
+        "mb_per_s": round(unique_bytes / elapsed / 1e6, 2),
+        "states": counts,
+        "files": len(os.listdir(out_dir)) if os.path.isdir(out_dir) else 0,
+        "fetched_ratio": round(sent / unique_bytes, 3) if unique_bytes else None,
+    }
+
+
+def run(videos, segments, segment_size, conn_rate, workers_list, jobs, duplicates, lease, kill_after):
+    state_dir = tempfile.mkdtemp(prefix="ytd-workers-")
+    results = []
+    try:
+        with ThrottleServer(segments=segments, max_connections=0, conn_rate=conn_rate, segment_size=segment_size,
+                            videos=videos) as server:
+            write_manifests(server, videos, segments)
+            for workers in workers_list:
+                results.append(run_workers(server, state_dir, videos, duplicates, workers, jobs, lease, kill_after))
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+    base = results[0]["mb_per_s"] / results[0]["workers"] if results and results[0]["mb_per_s"] else None
+    for result in results:
+        # 1.0 = 작업자 수에 정확히 비례
+        result["scaling"] = round(result["mb_per_s"] / (base * result["workers"]), 3) if base else None
+    return {"videos": videos, "segments": segments, "segment_size": segment_size, "conn_rate": conn_rate,
+            "duplicates": duplicates, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=24)
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--segment-size", type=parse_rate, default=parse_rate("256K"))
+    parser.add_argument("--conn-rate", type=parse_rate, default=parse_rate("512K"), help="연결당 바이트/초")
+    parser.add_argument("--workers", type=lambda text: [int(x) for x in text.split(",")], default=[1, 2, 4])
+    parser.add_argument("--jobs", type=int, default=2, help="작업자 하나의 동시 작업 수")
+    parser.add_argument("--duplicates", type=float, default=0.25, help="같은 영상을 다시 넣는 비율")
+    parser.add_argument("--lease", type=float, default=10)
+    parser.add_argument("--kill-after", type=float, default=0, help="첫 작업자를 강제 종료할 시각 (초, 0 = 안 함)")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    result = run(args.videos, args.segments, args.segment_size, args.conn_rate, args.workers, args.jobs,
+                 args.duplicates, args.lease, args.kill_after)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
@@ -0,0 +1,349 @@
+"""
+헤드리스 다운로드 (GUI / PyQt 없이 실행)
+
+    python cli.py URL [URL ...] [-o 폴더] [-q 1080] [--subtitle ko,en] [-j 2]
+    python cli.py -b urls.txt          # 한 줄에 URL 하나 (빈 줄, #으로 시작하는 줄은 무시)
+    python cli.py URL --profile job.prof --metrics-textfile /var/lib/node_exporter/ytd.prom
+    python cli.py URL -o /mnt/nas/videos --io-buffer 16M --wait-for-space
+    python cli.py PLAYLIST_URL -q 1080 --max-size 300M   # 영상마다 300MB 안의 가장 좋은 화질 (같은 화질이면 작은 파일)
+    python cli.py PLAYLIST_URL --max-time 30             # 최근 다운로드 속도로 30분 안에 끝나는 화질
+    python cli.py PLAYLIST_URL -x mp3 --audio-bitrate 256   # 오디오만 (코덱이 같으면 변환 없이 복사)
+    python cli.py --sync-add CHANNEL_URL [-o 폴더] [--sync-interval 24]   # 구독 추가 (작업 옵션 함께 저장)
+    python cli.py --sync [--watch 10]   # 확인 간격이 지난 구독의 새 영상만 받기 (--watch: N분마다 반복)
+    python cli.py --enqueue URL [URL ...] [-o 폴더]   # 작업 대기열에 넣기 (받지 않음)
+    python cli.py --worker -j 4 [--queue /mnt/nas/queue.sqlite3 --archive /mnt/nas/archive.sqlite3 --network-fs]
+        # 대기열에서 작업을 가져와 받는 작업자 (여러 프로세스 / 컴퓨터에서 실행, 같은 영상은 한 번만 받음)
+
+받는 중인 파일은 로컬 스테이징 폴더(data/staging)에 두고 끝난 파일만 저장 폴더로 옮긴다. (--temp-dir '' = 바로 쓰기)
+작업마다 단계별 시간 / 바이트 / 속도 / 재시도 수를 data/telemetry/jobs.jsonl에 한 줄씩 기록한다.
+
+GUI와 같은 DownloadEngine을 사용한다. (다운로드 기록 / 세그먼트 자동 조절 / 메타데이터 캐시 공유)
+하나라도 실패하면 종료 코드 1
+"""
+import argparse
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.bandwidth import get_bandwidth_governor, parse_rate, parse_schedule
+from core.sync import DEFAULT_SYNC_INTERVAL, DEFAULT_SYNC_WORKERS
+from core.workqueue import DEFAULT_LEASE, DEFAULT_QUEUE_PATH
+from core.options import (
+    AUDIO_BITRATES, AUDIO_FORMATS, DEFAULT_AUDIO_BITRATE, DEFAULT_OUTPUT_PATH, DEFAULT_QUALITY, DEFAULT_STAGING_PATH, FSYNC_POLICIES, QUALITY_HEIGHTS,
+    QUALITY_LABEL_HEIGHTS, QUALITY_PRESETS,
+    SUBTITLE_FORMAT_LABELS, build_options,
+)
+from core.telemetry import DEFAULT_TELEMETRY_PATH, configure_telemetry
+
+_print_lock = threading.Lock()
+
+
+def _log(prefix, text):
+    with _print_lock:
+        print(f"{prefix} {' '.join(str(text).split())}", flush=True)
+
+
+def read_batch_file(path):
+    """배치 파일의 URL 목록 ('-'는 표준 입력)"""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def make_job(options, prefix):
+    """진행 상황을 prefix와 함께 출력하는 엔진과 결과 dict ({"ok": bool}, run() 후 채워짐)"""
+    from core.engine import DownloadEngine
+
+    result = {"ok": False, "message": None}
+    last = [None]
+
+    def on_progress(percent, text):
+        # 같은 상태 / 1% 미만 변화는 생략 (엔진이 이미 10Hz로 제한하지만 로그가 길어지지 않게)
+        line = (int(percent), text)
+        if line != last[0]:
+            last[0] = line
+            _log(prefix, f"{percent:5.1f}% {text}")
+
+    def on_finished(msg):
+        result.update(ok=engine.ok, message=msg)
+        _log(prefix, msg)
+
+    def on_error(msg):
+        result["message"] = msg
+        _log(prefix, msg)
+
+    engine = DownloadEngine(options, on_progress=on_progress, on_finished=on_finished, on_error=on_error)
+    return engine, result
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="*", help="영상 / 플레이리스트 URL")
+    parser.add_argument("-b", "--batch", help="URL 목록 파일 ('-' = 표준 입력)")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT_PATH, help="저장 폴더")
+    parser.add_argument("-q", "--quality", type=int, choices=sorted(QUALITY_HEIGHTS, reverse=True),
+                        help="최대 세로 해상도 (기본 2160)")
+    parser.add_argument("-f", "--format", help="yt-dlp format 문자열 (--quality 대신 직접 지정)")
+    parser.add_argument("--max-size", type=parse_rate, default=0, metavar="SIZE",
+                        help="영상 하나의 최대 크기 (예: 500M), 이 안에 들어가는 가장 좋은 화질")
+    parser.add_argument("--max-time", type=float, default=0, metavar="MINUTES",
+                        help="작업 전체를 이 시간 안에 끝낼 화질 (최근 다운로드 속도 기준)")
+    parser.add_argument("--smallest-format", action="store_true",
+                        help="같은 화질이면 포맷 표에서 가장 작은 파일 (--max-size / --max-time을 주면 자동)")
+    parser.add_argument("--prefer-fps", action="store_true",
+                        help="포맷 표에서 고를 때 같은 해상도면 60fps 우선 (기본: 더 작은 파일)")
+    parser.add_argument("-x", "--audio", choices=list(AUDIO_FORMATS), help="오디오만 받아 이 형식으로 저장")
+    parser.add_argument("--audio-bitrate", type=int, default=DEFAULT_AUDIO_BITRATE, metavar="KBPS",
+                        help=f"오디오 변환 비트레이트 (기본 {DEFAULT_AUDIO_BITRATE}, 예: {', '.join(map(str, AUDIO_BITRATES))})")
+    parser.add_argument("--subtitle", metavar="LANGS", help="받을 자막 언어 코드 (쉼표 구분, 예: ko,en)")
+    parser.add_argument("--subtitle-only", action="store_true", help="영상 없이 자막만 받기")
+    parser.add_argument("--subtitle-format", choices=list(SUBTITLE_FORMAT_LABELS), default="srt",
+                        help="자막만 받을 때 저장 형식 (기본 srt)")
+    parser.add_argument("--fragments", type=int, default=0, help="동시 세그먼트 수 (0 = 자동 조절)")
+    parser.add_argument("--playlist-workers", type=int, default=3, help="플레이리스트 동시 다운로드 영상 수")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="동시에 실행할 작업(URL) 수")
+    parser.add_argument("--ffmpeg-location", help="ffmpeg 경로 (기본: ./ffmpeg)")
+    parser.add_argument("--limit-rate", type=parse_rate, default=0,
+                        help="모든 작업을 합친 속도 상한 (예: 5M, 500K / 작업끼리 나눠 씀)")
+    parser.add_argument("--job-limit-rate", type=parse_rate, default=0, help="작업 하나의 속도 상한")
+    parser.add_argument("--bandwidth-schedule", action="append", default=[], metavar="HH:MM-HH:MM=RATE",
+                        help="시간대별 전체 상한 (여러 번 지정 가능, 예: 09:00-18:00=2M)")
+    parser.add_argument("--temp-dir", default=DEFAULT_STAGING_PATH,
+                        help="받는 중인 파일을 둘 로컬 폴더 ('' = 저장 폴더에 바로 쓰기)")
+    parser.add_argument("--io-buffer", type=parse_rate, default=0, metavar="SIZE",
+                        help="저장 폴더에 쓰는 단위 (예: 16M, 기본 8M / 네트워크 공유에서는 크게)")
+    parser.add_argument("--preallocate", action="store_true", help="옮기기 전에 최종 파일 크기만큼 미리 할당")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, default="final",
+                        help="final = 파일을 디스크에 기록한 뒤 완료 처리, none = 운영체제에 맡김")
+    parser.add_argument("--wait-for-space", action="store_true",
+                        help="공간이 부족하면 실패하지 않고 공간이 생길 때까지 대기")
+    parser.add_argument("--no-reuse-sessions", action="store_true",
+                        help="작업마다 새 YoutubeDL을 만든다. (기본: 연결 / 쿠키 / 추출기 상태를 작업끼리 재사용)")
+    parser.add_argument("--sync-add", action="store_true", help="URL을 구독 목록에 추가 (받지 않음)")
+    parser.add_argument("--sync-remove", action="store_true", help="URL을 구독 목록에서 삭제")
+    parser.add_argument("--sync-list", action="store_true", help="구독 목록 출력")
+    parser.add_argument("--sync", action="store_true", help="구독 소스를 확인해 새 영상만 받기 (URL을 주면 그 소스만)")
+    parser.add_argument("--sync-force", action="store_true", help="확인 간격과 관계없이 모두 확인")
+    parser.add_argument("--sync-interval", type=float, default=DEFAULT_SYNC_INTERVAL / 3600, metavar="HOURS",
+                        help="구독 확인 간격 (시간, --sync-add와 함께)")
+    parser.add_argument("--no-backfill", action="store_true",
+                        help="구독 시점에 있던 영상은 받지 않고 이후 새 영상만 (--sync-add와 함께)")
+    parser.add_argument("--sync-workers", type=int, default=DEFAULT_SYNC_WORKERS, help="동시에 확인할 소스 수")
+    parser.add_argument("--watch", type=float, metavar="MINUTES", help="--sync를 N분마다 반복 (Ctrl+C로 종료)")
+    parser.add_argument("--enqueue", action="store_true", help="URL을 작업 대기열에 넣기 (받지 않음, --worker가 받음)")
+    parser.add_argument("--priority", type=int, default=0, help="대기열 우선순위 (--enqueue와 함께, 클수록 먼저)")
+    parser.add_argument("--worker", action="store_true",
+                        help="대기열에서 작업을 가져와 받는 작업자로 실행 (-j = 동시 작업 수, Ctrl+C로 종료)")
+    parser.add_argument("--exit-when-empty", action="store_true", help="대기열이 비면 작업자 종료 (--worker와 함께)")
+    parser.add_argument("--queue-status", action="store_true", help="대기열 상태별 작업 수 / 작업자 출력")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH, metavar="PATH",
+                        help="작업 대기열 경로 (여러 컴퓨터면 공유 폴더)")
+    parser.add_argument("--archive", metavar="PATH", help="다운로드 기록 경로 (작업자끼리 공유, 기본 data/archive.sqlite3)")
+    parser.add_argument("--network-fs", action="store_true",
+                        help="대기열 / 다운로드 기록이 네트워크 파일 시스템에 있음 (WAL 대신 롤백 저널)")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE, metavar="SECONDS",
+                        help="작업자가 이 시간 동안 응답이 없으면 작업을 다른 작업자에게 넘김")
+    parser.add_argument("--worker-id", help="작업자 이름 (기본: 호스트:pid:임의값)")
+    parser.add_argument("--telemetry-log", default=DEFAULT_TELEMETRY_PATH,
+                        help="작업 계측 기록(JSON lines) 경로 ('' = 기록 안 함)")
+    parser.add_argument("--metrics-textfile", help="Prometheus textfile 지표를 작업이 끝날 때마다 갱신할 경로")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="첫 번째 작업을 cProfile로 측정해 저장 (python -m pstats PATH로 확인)")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        args.urls += read_batch_file(args.batch)
+    if not args.urls and not (args.sync or args.sync_list or args.worker or args.queue_status):
+        parser.error("URL 또는 --batch 파일을 지정하세요.")
+    if args.exit_when_empty and not args.worker:
+        parser.error("--exit-when-empty는 --worker와 함께 씁니다.")
+    if args.watch is not None and not args.sync:
+        parser.error("--watch는 --sync와 함께 씁니다.")
+    if args.format and args.quality:
+        parser.error("--format과 --quality는 함께 쓸 수 없습니다.")
+    if args.audio and args.quality:
+        parser.error("--audio와 --quality는 함께 쓸 수 없습니다.")
+    if args.subtitle_only and not args.subtitle:
+        parser.error("--subtitle-only에는 --subtitle 언어가 필요합니다.")
+    try:
+        args.bandwidth_schedule = parse_schedule(args.bandwidth_schedule)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def job_options(args, url):
+    """명령줄 옵션으로 만든 작업 옵션 (구독에는 url을 뺀 나머지를 저장)"""
+    fmt = args.format or QUALITY_PRESETS[QUALITY_HEIGHTS.get(args.quality) or DEFAULT_QUALITY]
+    langs = [lang.strip() for lang in (args.subtitle or "").split(",") if lang.strip()]
+    options = build_options(url, fmt, subtitle_langs=langs, subtitle_only=args.subtitle_only,
+                            max_fragments=args.fragments, playlist_workers=args.playlist_workers,
+                            output_path=args.output, subtitle_format=args.subtitle_format,
+                            rate_limit=args.job_limit_rate, staging_path=args.temp_dir,
+                            io_buffer_size=args.io_buffer, preallocate=args.preallocate, fsync=args.fsync,
+                            disk_full="wait" if args.wait_for_space else "fail",
+                            audio_format=args.audio, audio_bitrate=args.audio_bitrate,
+                            # -f로 직접 지정하면 화질 상한 없이 크기 / 시간 목표만으로 표에서 고른다.
+                            max_height=None if args.format else QUALITY_LABEL_HEIGHTS[
+                                QUALITY_HEIGHTS.get(args.quality) or DEFAULT_QUALITY],
+                            size_budget=args.max_size, time_budget=args.max_time * 60, prefer_fps=args.prefer_fps,
+                            smallest_format=args.smallest_format)
+    if args.audio and args.format:
+        options["format"] = args.format
+    if args.ffmpeg_location:
+        options["ffmpeg_location"] = args.ffmpeg_location
+    if args.no_reuse_sessions:
+        options["reuse_sessions"] = False
+    return options
+
+
+def run_jobs(jobs, concurrency):
+    """jobs를 동시에 concurrency개씩 실행하고 작업별 성공 여부 목록 반환 (Ctrl+C면 모두 취소 후 KeyboardInterrupt)"""
+    width = len(str(len(jobs)))
+    engines = [make_job(options, f"[{i + 1:>{width}}/{len(jobs)}]") for i, options in enumerate(jobs)]
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    futures = [pool.submit(engine.run) for engine, _ in engines]
+    try:
+        for future in futures:
+            future.result()
+    except KeyboardInterrupt:
+        # 실행 중인 작업은 progress_hook에서 멈추고, 대기 중인 작업은 시작하지 않는다.
+        for future in futures:
+            future.cancel()
+        for engine, _ in engines:
+            engine.cancel()
+        pool.shutdown(wait=True)
+        raise
+    pool.shutdown()
+    return [result["ok"] for _, result in engines]
+
+
+def _report(jobs, results):
+    failed = [options["url"] for options, ok in zip(jobs, results) if not ok]
+    if failed:
+        _log("[실패]", f"{len(failed)}/{len(jobs)}개")
+        for url in failed:
+            print(f"  {url}", file=sys.stderr)
+    return failed
+
+
+def sync_command(args):
+    """--sync-add / --sync-remove / --sync-list / --sync"""
+    from core.sync import SyncRunner, get_sync_store
+
+    store = get_sync_store()
+    if args.sync_add:
+        for url in args.urls:
+            options = job_options(args, url)
+            store.add_source(url, options, interval=args.sync_interval * 3600, backfill=not args.no_backfill)
+            _log("[구독]", f"{url} → {options['output_path']}")
+    if args.sync_remove:
+        for url in args.urls:
+            _log("[구독 삭제]" if store.remove_source(url) else "[없음]", url)
+    if args.sync_list:
+        for source in store.sources():
+            checked = time.strftime("%Y-%m-%d %H:%M", time.localtime(source["last_checked"])) \
+                if source["last_checked"] else "확인 전"
+            _log("[구독]", f"{source['url']} (영상 {source['entries']}개, {checked}, "
+                         f"{source['interval'] / 3600:g}시간마다){' 오류: ' + source['last_error'] if source['last_error'] else ''}")
+    if not args.sync:
+        return 0
+
+    jobs = []
+    jobs_lock = threading.Lock()
+
+    def submit(options):
+        with jobs_lock:
+            jobs.append(options)
+
+    runner = SyncRunner(store, submit, workers=args.sync_workers)
+    urls = set(args.urls) if args.urls and not (args.sync_add or args.sync_remove) else None
+    failed = []
+    while True:
+        start = time.monotonic()
+        results = runner.sync(urls, force=args.sync_force)
+        errors = [r for r in results if r["error"]]
+        _log("[동기화]", f"소스 {len(results)}개 확인 {time.monotonic() - start:.1f}초, "
+                       f"새 영상 {sum(r['new'] for r in results)}개, 받을 영상 {len(jobs)}개, 오류 {len(errors)}개")
+        for r in errors:
+            _log("[동기화 오류]", f"{r['url']}: {r['error']}")
+        if jobs:
+            batch, jobs[:] = list(jobs), []
+            try:
+                ok = run_jobs(batch, args.jobs)
+            except KeyboardInterrupt:
+                # 끝났는지 모르는 영상은 실패로 두어 다음 동기화 때 다시 등록 (받은 영상은 아카이브가 건너뜀)
+                for options in batch:
+                    runner.job_finished(options, False)
+                raise
+            for options, success in zip(batch, ok):
+                runner.job_finished(options, success)
+            failed = _report(batch, ok)
+        if args.watch is None:
+            return 1 if failed or errors else 0
+        time.sleep(args.watch * 60)
+
+
+def queue_command(args):
+    """--enqueue / --queue-status / --worker"""
+    from core.workqueue import JobQueue, QueueWorker
+
+    queue = JobQueue(args.queue, wal=not args.network_fs)
+    try:
+        if args.enqueue:
+            for url in args.urls:
+                job_id = queue.enqueue(job_options(args, url), priority=args.priority)
+                _log("[대기열]", f"{job_id[:8]} {url}")
+        if args.queue_status:
+            counts = queue.counts()
+            _log("[대기열]", ", ".join(f"{state} {count}" for state, count in sorted(counts.items())) or "비어 있음")
+            for worker, count in sorted(queue.workers().items()):
+                _log("[작업자]", f"{worker} 실행 중 {count}개")
+        if not args.worker:
+            return 0
+
+        from core.archive import configure_download_archive, DEFAULT_ARCHIVE_PATH
+
+        archive = configure_download_archive(args.archive or DEFAULT_ARCHIVE_PATH, wal=not args.network_fs)
+        worker = QueueWorker(queue, concurrency=args.jobs, worker_id=args.worker_id, lease=args.lease,
+                             make_engine=lambda options, job: make_job(options, f"[{job['job_id'][:8]}]"),
+                             archive=archive)
+        _log("[작업자]", f"{worker.worker_id} 시작 (동시 {worker.concurrency}개, 대기열 {args.queue})")
+        # 종료 요청(SIGTERM)도 Ctrl+C처럼 실행 중인 작업을 대기열로 돌려놓고 끝낸다.
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop(cancel=True))
+        finished = worker.run(exit_when_empty=args.exit_when_empty)
+        _log("[작업자]", f"종료 (완료 {finished['done']}개, 실패 {finished['failed']}개)")
+        return 1 if finished["failed"] else 0
+    finally:
+        queue.close()
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    configure_telemetry(args.telemetry_log or None, args.metrics_textfile)
+    get_bandwidth_governor().configure(limit=args.limit_rate, schedule=args.bandwidth_schedule)
+    try:
+        if args.sync or args.sync_add or args.sync_remove or args.sync_list:
+            return sync_command(args)
+        if args.enqueue or args.worker or args.queue_status:
+            return queue_command(args)
+        jobs = [job_options(args, url) for url in args.urls]
+        if args.profile:
+            jobs[0]["profile_path"] = args.profile
+        return 1 if _report(jobs, run_jobs(jobs, args.jobs)) else 0
+    except KeyboardInterrupt:
+        _log("[취소]", "사용자가 중단했습니다.")
+        return 130
+    finally:
+        # 쉬고 있는 YoutubeDL 세션 정리 (쿠키 저장)
+        from core.sessions import get_session_pool
+        get_session_pool().close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
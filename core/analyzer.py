@@ -1,4 +1,9 @@
-import yt_dlp
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+
+# URL별 실제 네트워크 추출 횟수 (작업당 1회만 추출되는지 확인용)
+extraction_counter = Counter()
+
 
 def analyze_url_is_playlist(url: str) -> bool:
     """
@@ -10,12 +15,61 @@ def analyze_url_is_playlist(url: str) -> bool:
         return False
 
 
-def filter_available_subtitles(url, requested_langs):
-    """yt_dlp로 영상 메타데이터 확인 후, 실제 존재하는 자막만 반환"""
-    try:
-        with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
-            info = ydl.extract_info(url, download=False)
-            available = set(info.get("subtitles", {}).keys())
-            return [lang for lang in requested_langs if lang in available]
-    except Exception:
-        return []
\ No newline at end of file
+def canonical_key(url: str):
+    """
+    캐시 키로 쓸 정규화된 ID를 네트워크 없이 URL에서 계산한다.
+    - 단일 영상: 'Youtube:<video_id>'
+    - 플레이리스트: 'YoutubeTab:<playlist_id>'
+    - 그 외 URL은 'url:<url>'
+    """
+    if not url:
+        return None
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    host = parsed.netloc.lower()
+
+    if analyze_url_is_playlist(url) and query.get("list"):
+        return f"YoutubeTab:{query['list'][0]}"
+    if "youtu.be" in host:
+        video_id = parsed.path.strip("/").split("/")[0]
+        if video_id:
+            return f"Youtube:{video_id}"
+    if "youtube.com" in host:
+        if query.get("v"):
+            return f"Youtube:{query['v'][0]}"
+        parts = parsed.path.strip("/").split("/")
+        if len(parts) >= 2 and parts[0] in ("shorts", "live", "embed"):
+            return f"Youtube:{parts[1]}"
+    return f"url:{url}"
+
+
+def extract_info(ydl, url, cache=None):
+    """
+    yt_dlp로 메타데이터를 한 번만 추출한다. (다운로드/후처리 없이 원본 결과 반환)
+    - 반환된 info는 그대로 ydl.process_ie_result(info, download=True)에 넘겨 다운로드할 수 있다.
+    - cache(MetadataCache)가 주어지면 캐시를 먼저 보고, 없을 때만 네트워크로 추출한다.
+    - ydl은 extract_info(url, download=False, process=False)만 있으면 되므로 테스트용 가짜 추출기를 넣을 수 있다.
+    """
+    key = canonical_key(url)
+    if cache is not None:
+        info = cache.get(key)
+        if info is not None:
+            return info
+
+    extraction_counter[url] += 1
+    info = ydl.extract_info(url, download=False, process=False)
+    if cache is not None and info:
+        cache.put(key, info)
+    return info
+
+
+def reset_extraction_counter():
+    extraction_counter.clear()
+
+
+def filter_available_subtitles(info, requested_langs):
+    """이미 추출한 메타데이터(info)에서 실제 존재하는 자막만 반환"""
+    if not info:
+        return []
+    available = set((info.get("subtitles") or {}).keys())
+    return [lang for lang in requested_langs if lang in available]
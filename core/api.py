@@ -0,0 +1,387 @@
+import asyncio
+import json
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from core.bandwidth import get_bandwidth_governor, parse_rate, parse_schedule
+from core.options import AUDIO_FORMATS, DISK_FULL_POLICIES, FSYNC_POLICIES, SUBTITLE_FORMAT_LABELS, build_options
+from core.telemetry import get_telemetry_sink
+
+DEFAULT_API_PORT = 8765
+# 작업 등록 시 받는 필드 (DownloadPopup.result_data와 같음) + 우선순위
+SUBMIT_FIELDS = set(build_options(""))
+# SSE 연결 유지용 주석 간격 (초)
+KEEPALIVE_INTERVAL = 15
+_MAX_BODY = 64 * 1024
+_LOCAL_HOSTS = {"127.0.0.1", "localhost", "[::1]"}
+
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden",
+            404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 415: "Unsupported Media Type",
+            500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_json(body):
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise ApiError(400, "JSON 본문이 아닙니다.")
+    if not isinstance(data, dict):
+        raise ApiError(400, "JSON 객체여야 합니다.")
+    return data
+
+
+def parse_bandwidth(body):
+    """POST /bandwidth 본문 -> (전체 상한 또는 None, 시간대 목록 또는 None). 잘못된 값이면 ApiError(400)"""
+    data = _parse_json(body)
+    unknown = set(data) - {"limit", "schedule"}
+    if unknown:
+        raise ApiError(400, f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+    try:
+        limit = parse_rate(data["limit"]) if "limit" in data else None
+        schedule = parse_schedule(data["schedule"]) if "schedule" in data else None
+    except (TypeError, ValueError) as e:
+        raise ApiError(400, str(e))
+    return limit, schedule
+
+
+def _is_int(value):
+    # bool은 int의 하위 클래스라 따로 거른다.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_int(data, key, minimum, maximum=None, unit=""):
+    if key not in data:
+        return
+    value = data[key]
+    if not _is_int(value) or value < minimum or (maximum is not None and value > maximum):
+        limit = f"{minimum}~{maximum}" if maximum is not None else f"{minimum} 이상의"
+        raise ApiError(400, f"{key}는 {limit} 정수{unit}여야 합니다.")
+
+
+def _check_bool(data, key):
+    if key in data and not isinstance(data[key], bool):
+        raise ApiError(400, f"{key}는 true / false여야 합니다.")
+
+
+def _check_choice(data, key, choices, optional=False):
+    if key not in data or (optional and data[key] is None):
+        return
+    if not isinstance(data[key], str) or data[key] not in choices:
+        raise ApiError(400, f"{key}는 {', '.join(choices)} 중 하나여야 합니다.")
+
+
+def _check_text(data, key, optional=False):
+    """문자열 (optional이면 null 허용, 아니면 빈 문자열 불가)"""
+    if key not in data or (optional and data[key] is None):
+        return
+    if not isinstance(data[key], str) or not (optional or data[key].strip()):
+        raise ApiError(400, f"{key}는 {'문자열' if optional else '비어 있지 않은 문자열'}이어야 합니다.")
+
+
+def parse_submission(body):
+    """
+    POST /jobs 본문(JSON) -> (작업 옵션, 우선순위). 잘못된 값이면 ApiError(400)
+    필드마다 CLI가 받는 것과 같은 형식 / 범위만 허용한다. (엔진이 잘못된 값으로 실행 중에 멈추지 않게)
+    ffmpeg 경로는 받지 않는다. (로컬의 아무 프로그램이나 실행하게 할 수 있음)
+    """
+    data = _parse_json(body)
+    if not isinstance(data.get("url"), str) or not data["url"].strip():
+        raise ApiError(400, "url이 필요합니다.")
+    unknown = set(data) - SUBMIT_FIELDS - {"priority"}
+    if unknown:
+        raise ApiError(400, f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+    priority = data.pop("priority", 0)
+    if not _is_int(priority):
+        raise ApiError(400, "priority는 정수여야 합니다.")
+    try:
+        if "rate_limit" in data:
+            data["rate_limit"] = parse_rate(data["rate_limit"])
+        if "io_buffer_size" in data:
+            data["io_buffer_size"] = parse_rate(data["io_buffer_size"])
+        if "size_budget" in data:
+            data["size_budget"] = parse_rate(data["size_budget"])
+    except (TypeError, ValueError) as e:
+        raise ApiError(400, str(e))
+
+    _check_text(data, "format")
+    _check_text(data, "container")
+    _check_text(data, "output_path")
+    _check_text(data, "staging_path", optional=True)
+    for key in ("subtitle_only", "subtitle", "preallocate", "prefer_fps", "smallest_format"):
+        _check_bool(data, key)
+    _check_int(data, "max_fragments", 0)
+    _check_int(data, "playlist_workers", 1)
+    _check_int(data, "bandwidth_weight", 1)
+    _check_int(data, "audio_bitrate", 32, 512, "(kbps)")
+    if data.get("max_height") is not None:
+        _check_int(data, "max_height", 1)
+    if "subtitle_langs" in data and not (
+            isinstance(data["subtitle_langs"], list) and all(isinstance(lang, str) for lang in data["subtitle_langs"])):
+        raise ApiError(400, "subtitle_langs는 언어 코드 문자열 목록이어야 합니다.")
+    _check_choice(data, "subtitle_format", list(SUBTITLE_FORMAT_LABELS))
+    _check_choice(data, "fsync", FSYNC_POLICIES)
+    _check_choice(data, "disk_full", DISK_FULL_POLICIES)
+    _check_choice(data, "audio_format", list(AUDIO_FORMATS), optional=True)
+    time_budget = data.get("time_budget", 0)
+    if not isinstance(time_budget, (int, float)) or isinstance(time_budget, bool) or time_budget < 0:
+        raise ApiError(400, "time_budget은 0 이상의 숫자(초)여야 합니다.")
+
+    # 오디오만이면 format을 주지 않았을 때 오디오 프리셋
+    options = build_options(data["url"].strip(), audio_format=data.get("audio_format"))
+    options.update(data, url=data["url"].strip())
+    if "subtitle" not in data:
+        options["subtitle"] = bool(options["subtitle_langs"])
+    return options, priority
+
+
+class _Subscriber:
+    """SSE 연결 하나. 보내기 전에 쌓인 변경은 작업별 최신 상태만 남긴다. (느린 클라이언트가 밀리지 않게)"""
+
+    def __init__(self, job_id=None):
+        self.job_id = job_id
+        self.pending = {}
+        self.changed = asyncio.Event()
+        self.closed = False
+
+    def push(self, snapshot):
+        if self.job_id is None or snapshot["id"] == self.job_id:
+            self.pending[snapshot["id"]] = snapshot
+            self.changed.set()
+
+
+class ControlServer:
+    """
+    로컬 HTTP/JSON 제어 API (127.0.0.1에만 바인드, 별도 스레드의 asyncio 이벤트 루프)
+        GET    /jobs                 작업 목록
+        GET    /jobs/<id>            작업 상태
+        POST   /jobs                 작업 등록 (DownloadPopup.result_data와 같은 필드, url만 필수) -> {"id": ...}
+        POST   /jobs/<id>/cancel     취소 (DELETE /jobs/<id>도 같음)
+        GET    /events[?job=<id>]    상태 변화 스트림 (Server-Sent Events, event: job)
+        GET    /metrics              작업 계측 지표 (Prometheus 텍스트 형식)
+        GET    /bandwidth            대역폭 제한 상태 (전체 상한, 시간대, 작업별 배정 속도)
+        POST   /bandwidth            전체 상한 / 시간대 변경 {"limit": "2M", "schedule": ["09:00-18:00=1M"]}
+    - submit(options, priority) -> job_id, cancel(job_id) -> bool 은 이 서버의 실행기 스레드에서 호출된다.
+      (Qt 쪽은 ui.job_manager.ManagerControl로 메인 스레드에 넘긴다.)
+    - publish(snapshot)는 아무 스레드에서나 호출 (작업 상태가 바뀔 때)
+    - 웹 페이지에서 보내는 요청을 막기 위해 Host / Origin은 localhost만, POST는 application/json만 받는다.
+      token을 주면 Authorization: Bearer <token>도 확인
+    """
+
+    def __init__(self, submit, cancel, host="127.0.0.1", port=DEFAULT_API_PORT, token=None):
+        self.submit = submit
+        self.cancel = cancel
+        self.host = host
+        self.port = port
+        self.token = token
+        self._jobs = {}
+        self._subscribers = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    # -------------------------------------
+    # 시작 / 종료
+    # -------------------------------------
+    def start(self):
+        """서버를 시작하고 실제 포트를 반환 (port=0이면 빈 포트)"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="control-api", daemon=True)
+        self._thread.start()
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, self.host, self.port), self._loop)
+        try:
+            self._server = future.result(timeout=5)
+        except Exception:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            raise
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+
+    async def _shutdown(self):
+        self._server.close()
+        # SSE 연결은 끝나지 않으므로 직접 끊는다.
+        for subscriber in list(self._subscribers):
+            subscriber.closed = True
+            subscriber.changed.set()
+        await self._server.wait_closed()
+
+    # -------------------------------------
+    # 상태 전달
+    # -------------------------------------
+    def publish(self, snapshot):
+        """작업 상태(dict, id 포함)를 반영하고 SSE 구독자에게 보낸다. (스레드 안전)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._publish, snapshot)
+
+    def _publish(self, snapshot):
+        self._jobs[snapshot["id"]] = snapshot
+        for subscriber in self._subscribers:
+            subscriber.push(snapshot)
+
+    # -------------------------------------
+    # HTTP 처리
+    # -------------------------------------
+    async def _handle(self, reader, writer):
+        try:
+            method, path, query, headers, body = await self._read_request(reader)
+            self._check_access(method, headers)
+            if method == "GET" and path == "/events":
+                await self._stream_events(writer, query)
+                return
+            if method == "GET" and path == "/metrics":
+                await self._write(writer, 200, "text/plain; version=0.0.4; charset=utf-8",
+                                  get_telemetry_sink().prometheus_text().encode("utf-8"))
+                writer.close()
+                return
+            status, payload = await self._route(method, path, body)
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            writer.close()
+            return
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+        try:
+            await self._write_json(writer, status, payload)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, target, _ = request_line.split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > _MAX_BODY:
+            raise ApiError(413, "본문이 너무 큽니다.")
+        body = await reader.readexactly(length) if length else b""
+        parts = urlsplit(target)
+        return method.upper(), parts.path.rstrip("/") or "/", parse_qs(parts.query), headers, body
+
+    def _check_access(self, method, headers):
+        host = headers.get("host", "")
+        hostname = host.rsplit(":", 1)[0] if not host.endswith("]") else host
+        if hostname not in _LOCAL_HOSTS:
+            raise ApiError(403, "localhost로만 접근할 수 있습니다.")
+        if self.token and headers.get("authorization") != f"Bearer {self.token}":
+            raise ApiError(401, "토큰이 필요합니다.")
+        # 다른 사이트의 페이지가 보낸 요청(Origin이 있음)이나 폼 전송(JSON이 아님)은 거부
+        origin = headers.get("origin")
+        if origin and urlsplit(origin).hostname not in ("127.0.0.1", "localhost", "::1"):
+            raise ApiError(403, "다른 사이트에서 보낸 요청은 받지 않습니다.")
+        if method == "POST" and not headers.get("content-type", "").startswith("application/json"):
+            raise ApiError(415, "Content-Type: application/json만 받습니다.")
+
+    async def _route(self, method, path, body):
+        parts = path.strip("/").split("/")
+        if parts == ["bandwidth"]:
+            return self._route_bandwidth(method, body)
+        if parts[0] != "jobs":
+            raise ApiError(404, "없는 경로입니다.")
+        if len(parts) == 1:
+            if method == "GET":
+                return 200, {"jobs": sorted(self._jobs.values(), key=lambda job: job["id"])}
+            if method == "POST":
+                options, priority = parse_submission(body)
+                job_id = await self._call(self.submit, options, priority)
+                return 201, {"id": job_id}
+            raise ApiError(405, "GET 또는 POST만 지원합니다.")
+
+        job_id = self._job_id(parts[1])
+        if len(parts) == 2 and method == "GET":
+            if job_id not in self._jobs:
+                raise ApiError(404, "없는 작업입니다.")
+            return 200, self._jobs[job_id]
+        if (len(parts) == 2 and method == "DELETE") or (parts[2:] == ["cancel"] and method == "POST"):
+            if not await self._call(self.cancel, job_id):
+                raise ApiError(404, "없거나 이미 끝난 작업입니다.")
+            return 200, {"id": job_id, "canceled": True}
+        raise ApiError(405 if len(parts) <= 3 else 404, "지원하지 않는 요청입니다.")
+
+    @staticmethod
+    def _route_bandwidth(method, body):
+        governor = get_bandwidth_governor()
+        if method == "POST":
+            limit, schedule = parse_bandwidth(body)
+            governor.configure(limit=limit, schedule=schedule)
+        elif method != "GET":
+            raise ApiError(405, "GET 또는 POST만 지원합니다.")
+        return 200, governor.status()
+
+    @staticmethod
+    def _job_id(text):
+        try:
+            return int(text)
+        except ValueError:
+            raise ApiError(404, "없는 작업입니다.")
+
+    async def _call(self, func, *args):
+        # 메인 스레드 작업을 기다리는 동안 다른 요청 / 스트림이 막히지 않도록 실행기 스레드에서 호출
+        try:
+            return await asyncio.wait_for(self._loop.run_in_executor(None, func, *args), timeout=10)
+        except asyncio.TimeoutError:
+            raise ApiError(503, "프로그램이 응답하지 않습니다.")
+
+    async def _write_json(self, writer, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await self._write(writer, status, "application/json; charset=utf-8", data)
+
+    async def _write(self, writer, status, content_type, data):
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + data)
+        await writer.drain()
+
+    async def _stream_events(self, writer, query):
+        job_id = self._job_id(query["job"][0]) if query.get("job") else None
+        subscriber = _Subscriber(job_id)
+        # 연결 직후 현재 상태부터 보낸다.
+        for snapshot in self._jobs.values():
+            subscriber.push(snapshot)
+        self._subscribers.add(subscriber)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+            await writer.drain()
+            while not subscriber.closed:
+                try:
+                    await asyncio.wait_for(subscriber.changed.wait(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                    await writer.drain()
+                    continue
+                subscriber.changed.clear()
+                pending, subscriber.pending = subscriber.pending, {}
+                for snapshot in pending.values():
+                    data = json.dumps(snapshot, ensure_ascii=False)
+                    writer.write(f"event: job\nid: {snapshot['id']}\ndata: {data}\n\n".encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            writer.close()
@@ -0,0 +1,384 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from yt_dlp.postprocessor import PostProcessor
+
+from core.formats import WEBM_MIN_HEIGHT
+
+DEFAULT_ARCHIVE_PATH = os.path.join(os.getcwd(), "data", "archive.sqlite3")
+# 받는 중 표시(claim)가 갱신 없이 이 시간(초)이 지나면 그 작업자는 죽은 것으로 보고 다른 작업자가 받는다.
+DEFAULT_CLAIM_TTL = 120
+
+_HASH_CHUNK = 1024 * 1024
+# 처음 만든 뒤 items에 추가한 열 (이전 기록 파일은 열만 추가, 값은 NULL)
+_ITEM_COLUMNS = {
+    "mtime": "REAL",
+    "height": "INTEGER",
+    "container": "TEXT",
+    "format_spec": "TEXT",
+    "max_height": "INTEGER",
+    "budgeted": "INTEGER",
+    "subtitles": "TEXT",
+}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def archive_key(info):
+    """
+    info / flat entry에서 (extractor, video_id)를 꺼낸다. 알 수 없으면 None
+    - flat entry는 ie_key, 전체 info는 extractor_key를 쓴다. (yt-dlp 다운로드 아카이브와 같은 소문자 표기)
+    """
+    extractor = info.get("extractor_key") or info.get("ie_key")
+    video_id = info.get("id")
+    if not extractor or not video_id:
+        return None
+    return extractor.lower(), str(video_id)
+
+
+def archive_request(options):
+    """
+    작업 옵션에서 기록된 파일을 다시 쓸 수 있는지 판단할 요구 사항
+    {format(형식 문자열), max_height(해상도 상한), size_budget(영상 하나 바이트), budgeted, subtitles(언어 목록)}
+    """
+    return {
+        "format": options.get("format"),
+        "max_height": options.get("max_height"),
+        "size_budget": options.get("size_budget") or 0,
+        "budgeted": bool(options.get("size_budget") or options.get("time_budget") or options.get("smallest_format")),
+        "subtitles": list(options.get("subtitle_langs") or []) if options.get("subtitle") else [],
+    }
+
+
+def satisfies(record, request):
+    """
+    기록된 파일이 요구 사항(archive_request)에 맞는지
+    - 화질: 같은 형식 문자열 / 상한으로 받았거나, 높이가 요청 상한 이하이고 그때 상한이 요청 상한 이상 (같은 선택이 나옴)
+      크기 / 시간 목표로 줄여 받은 파일은 목표가 있는 작업에만, 크기 목표가 있으면 그 크기 이하만
+    - 저장 형식: 2160p 미만 상한이면 mp4 (품질 프리셋의 "mp4(4k이하) 또는 webm(4k)")
+    - 자막: 요청한 언어를 모두 그때 요청했고, 받은 자막 파일이 남아 있음
+    """
+    if request is None:
+        return True
+    if record["budgeted"] and not request["budgeted"]:
+        return False
+    if request["size_budget"] and record["size"] > request["size_budget"]:
+        return False
+
+    cap = request["max_height"]
+    if record["format_spec"] != request["format"] or record["max_height"] != cap:
+        if not cap or not record["height"] or record["height"] > cap:
+            return False
+        if record["max_height"] is not None and record["max_height"] < cap:
+            return False
+    if cap and cap < WEBM_MIN_HEIGHT and record["container"] != "mp4":
+        return False
+
+    subtitles = record["subtitles"]
+    for lang in request["subtitles"]:
+        if lang not in subtitles:
+            return False
+        # None = 그때 요청했지만 영상에 없던 언어
+        if subtitles[lang] is not None and not os.path.exists(subtitles[lang]):
+            return False
+    return True
+
+
+class DownloadArchive:
+    """
+    모든 작업 / 출력 폴더가 공유하는 다운로드 기록 (SQLite)
+    - 키: (extractor, video_id) — 기본 키 인덱스로 조회하므로 10만 개 이상에서도 조회 비용이 일정
+    - 값: format_id, 파일 경로, 크기, 내용 해시(SHA-256), 높이 / 저장 형식, 받을 때의 요구 사항(형식 문자열,
+      해상도 상한, 목표 여부), 자막 파일 {언어: 경로}
+    - 기록된 파일이 지워졌거나 크기 / 수정 시각이 달라졌으면 기록을 버리고 다시 받는다.
+    - 내용 해시는 기록할 때 계산하지 않고 백그라운드 스레드가 나중에 채운다. (다운로드 완료를 늦추지 않게)
+      요구 사항에 맞지 않으면(satisfies) 다시 받아 기록을 바꾼다.
+    - claims: 여러 프로세스(작업자 모드)가 같은 영상을 동시에 받지 않도록 받는 중인 영상과 작업자(owner)
+      기록되면(add) 표시도 지운다. 작업자가 죽으면 ttl이 지나 다른 작업자가 가져간다.
+    - wal=False: 여러 컴퓨터가 네트워크 파일 시스템으로 공유할 때 (WAL은 같은 컴퓨터의 프로세스끼리만 안전)
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH, wal=True):
+        self.path = path
+        self._lock = threading.Lock()
+        self._closed = False
+        # 해시를 채우는 백그라운드 스레드 (채울 기록이 없으면 끝난다)
+        self._hasher = None
+        self._hasher_lock = threading.Lock()
+        self._hash_requests = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 다른 프로세스가 쓰는 중이면 잠시 기다린다.
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " extractor TEXT NOT NULL,"
+            " video_id TEXT NOT NULL,"
+            " format_id TEXT,"
+            " filepath TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " sha256 TEXT,"
+            " created REAL NOT NULL,"
+            " PRIMARY KEY (extractor, video_id)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS claims ("
+            " extractor TEXT NOT NULL,"
+            " video_id TEXT NOT NULL,"
+            " owner TEXT NOT NULL,"
+            " expires REAL NOT NULL,"
+            " PRIMARY KEY (extractor, video_id)) WITHOUT ROWID;"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(items)")}
+        for name, kind in _ITEM_COLUMNS.items():
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE items ADD COLUMN {name} {kind}")
+        self._conn.commit()
+
+    # -------------------------------------
+    # 조회 / 기록
+    # -------------------------------------
+    _RECORD_FIELDS = ("format_id", "filepath", "size", "mtime", "sha256", "created", "height", "container",
+                      "format_spec", "max_height", "budgeted", "subtitles")
+
+    def lookup(self, key):
+        """
+        key(extractor, video_id)의 기록 {format_id, filepath, size, mtime, sha256(아직 없으면 None), created,
+        height, container, format_spec, max_height, budgeted, subtitles}. 없거나 파일이 사라졌으면 None
+        """
+        if key is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._RECORD_FIELDS)} FROM items WHERE extractor = ? AND video_id = ?", key
+            ).fetchone()
+        if row is None:
+            return None
+
+        record = dict(zip(self._RECORD_FIELDS, row))
+        try:
+            stat = os.stat(record["filepath"])
+            valid = stat.st_size == record["size"] and record["mtime"] in (None, stat.st_mtime)
+        except OSError:
+            valid = False
+        if not valid:
+            self.remove(key)
+            return None
+        record["budgeted"] = bool(record["budgeted"])
+        record["subtitles"] = json.loads(record["subtitles"]) if record["subtitles"] else {}
+        return record
+
+    def add(self, key, filepath, format_id=None, height=None, container=None, request=None, subtitles=None):
+        """
+        받은 파일을 기록 (같은 key의 이전 기록은 바꾼다)
+        request: 받을 때의 요구 사항(archive_request), subtitles: 함께 받은 자막 {언어: 경로, 없던 언어는 None}
+        """
+        request = request or {}
+        stat = os.stat(filepath)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO items (extractor, video_id, format_id, filepath, size, mtime, sha256, created,"
+                " height, container, format_spec, max_height, budgeted, subtitles)"
+                " VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, format_id, os.path.abspath(filepath), stat.st_size, stat.st_mtime, time.time(), height, container,
+                 request.get("format"), request.get("max_height"), int(bool(request.get("budgeted"))),
+                 json.dumps(subtitles or {}, ensure_ascii=False)),
+            )
+            self._conn.execute("DELETE FROM claims WHERE extractor = ? AND video_id = ?", key)
+            self._conn.commit()
+        self._start_hasher()
+
+    def remove(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM items WHERE extractor = ? AND video_id = ?", key)
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    # -------------------------------------
+    # 내용 해시 (백그라운드)
+    # -------------------------------------
+    def hash_pending(self, limit=None):
+        """
+        해시가 없는 기록의 해시를 채운다. 채운 수 반환
+        해시를 계산하는 동안 파일이 바뀌었으면(크기 / 수정 시각) 그 기록은 건너뛴다.
+        """
+        done = 0
+        skipped = set()
+        while limit is None or done < limit:
+            with self._lock:
+                if self._closed:
+                    break
+                rows = self._conn.execute(
+                    "SELECT extractor, video_id, filepath, size, mtime FROM items WHERE sha256 IS NULL LIMIT ?",
+                    (len(skipped) + 1,)).fetchall()
+            rows = [row for row in rows if row[:2] not in skipped]
+            if not rows:
+                break
+            extractor, video_id, filepath, size, mtime = rows[0]
+            try:
+                sha256 = file_sha256(filepath)
+            except OSError:
+                # 지워진 파일은 다음 lookup이 기록을 버린다.
+                skipped.add((extractor, video_id))
+                continue
+            with self._lock:
+                if self._closed:
+                    break
+                cursor = self._conn.execute(
+                    "UPDATE items SET sha256 = ? WHERE extractor = ? AND video_id = ? AND filepath = ?"
+                    " AND size = ? AND mtime IS ?",
+                    (sha256, extractor, video_id, filepath, size, mtime))
+                self._conn.commit()
+            if cursor.rowcount:
+                done += 1
+            else:
+                skipped.add((extractor, video_id))
+        return done
+
+    def _start_hasher(self):
+        with self._hasher_lock:
+            self._hash_requests += 1
+            if self._hasher is None:
+                self._hasher = threading.Thread(target=self._run_hasher, name="archive-hasher", daemon=True)
+                self._hasher.start()
+
+    def _run_hasher(self):
+        seen = None
+        while True:
+            with self._hasher_lock:
+                # 마지막으로 채운 뒤 새로 기록된 항목이 없으면 끝낸다. (다음 add가 스레드를 다시 시작)
+                if seen == self._hash_requests or self._closed:
+                    self._hasher = None
+                    return
+                seen = self._hash_requests
+            self.hash_pending()
+
+    # -------------------------------------
+    # 받는 중 표시 (작업자 모드)
+    # -------------------------------------
+    def claim(self, key, owner, ttl=DEFAULT_CLAIM_TTL, replacing=None):
+        """
+        key를 owner가 받는 중으로 표시. 이미 기록됐거나 다른 owner가 받는 중(만료 전)이면 False
+        같은 owner가 다시 표시하면 만료 시각만 늘린다.
+        replacing: 요구 사항에 맞지 않아 다시 받을 기록의 created (그보다 새 기록이 생겼을 때만 False)
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO claims (extractor, video_id, owner, expires) SELECT ?, ?, ?, ?"
+                " WHERE NOT EXISTS (SELECT 1 FROM items WHERE extractor = ? AND video_id = ? AND created > ?)"
+                " ON CONFLICT(extractor, video_id) DO UPDATE SET owner = excluded.owner, expires = excluded.expires"
+                " WHERE claims.owner = excluded.owner OR claims.expires < ?",
+                (*key, owner, now + ttl, *key, -1 if replacing is None else replacing, now),
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def release(self, key, owner):
+        """owner의 표시만 지운다. (받기 실패, 다른 작업자가 다시 받을 수 있게)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM claims WHERE extractor = ? AND video_id = ? AND owner = ?", (*key, owner))
+            self._conn.commit()
+
+    def release_claims(self, owner):
+        """작업이 끝날 때 owner의 남은 표시를 모두 지운다."""
+        with self._lock:
+            self._conn.execute("DELETE FROM claims WHERE owner = ?", (owner,))
+            self._conn.commit()
+
+    def refresh_claims(self, owner_prefix, ttl=DEFAULT_CLAIM_TTL):
+        """owner가 owner_prefix로 시작하는 표시의 만료 시각을 늘린다. (작업자 heartbeat)"""
+        with self._lock:
+            self._conn.execute("UPDATE claims SET expires = ? WHERE substr(owner, 1, ?) = ?",
+                               (time.time() + ttl, len(owner_prefix), owner_prefix))
+            self._conn.commit()
+
+    # -------------------------------------
+    # 재사용
+    # -------------------------------------
+    @staticmethod
+    def materialize(record, output_dir, subtitle_langs=()):
+        """
+        기록된 파일(과 subtitle_langs의 자막 파일)을 output_dir에 놓는다. 이미 그 폴더에 있으면 그대로 사용
+        같은 디스크면 하드링크, 아니면 복사. 영상 파일 경로 반환
+        """
+        sources = [record["filepath"]]
+        sources += [record["subtitles"][lang] for lang in subtitle_langs if record["subtitles"].get(lang)]
+        for source in sources:
+            target = os.path.join(output_dir, os.path.basename(source))
+            if os.path.exists(target):
+                continue
+            os.makedirs(output_dir, exist_ok=True)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+        return os.path.join(output_dir, os.path.basename(record["filepath"]))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._conn.close()
+
+
+class ArchivePP(PostProcessor):
+    """
+    후처리가 모두 끝난 뒤(after_move) 최종 파일을 다운로드 기록에 추가한다.
+    request: 작업의 요구 사항(archive_request), 함께 받은 자막은 요청한 언어마다 최종 경로(없던 언어는 None)로 남긴다.
+    """
+
+    def __init__(self, archive: DownloadArchive, downloader=None, request=None):
+        super().__init__(downloader)
+        self.archive = archive
+        self.request = request
+
+    def run(self, info):
+        key = archive_key(info)
+        filepath = info.get("filepath")
+        if key is not None and filepath and os.path.exists(filepath):
+            # 자막은 영상과 함께 최종 폴더로 옮겨지지만 requested_subtitles의 경로는 임시 폴더 그대로다.
+            written = info.get("requested_subtitles") or {}
+            subtitles = {}
+            for lang in (self.request or {}).get("subtitles") or []:
+                sub_path = (written.get(lang) or {}).get("filepath")
+                final_path = os.path.join(os.path.dirname(filepath), os.path.basename(sub_path)) if sub_path else None
+                subtitles[lang] = final_path if final_path and os.path.exists(final_path) else None
+            self.archive.add(key, filepath, info.get("format_id"), height=info.get("height"),
+                             container=info.get("ext"), request=self.request, subtitles=subtitles)
+        return [], info
+
+
+_default_archive = None
+_default_archive_lock = threading.Lock()
+
+
+def get_download_archive() -> DownloadArchive:
+    """프로그램 전체에서 공유하는 기본 다운로드 기록"""
+    global _default_archive
+    with _default_archive_lock:
+        if _default_archive is None:
+            _default_archive = DownloadArchive()
+        return _default_archive
+
+
+def configure_download_archive(path=DEFAULT_ARCHIVE_PATH, wal=True) -> DownloadArchive:
+    """기본 다운로드 기록 위치 변경 (작업자 모드에서 여러 프로세스 / 컴퓨터가 함께 쓰는 경로)"""
+    global _default_archive
+    with _default_archive_lock:
+        if _default_archive is not None:
+            _default_archive.close()
+        _default_archive = DownloadArchive(path, wal=wal)
+        return _default_archive
@@ -0,0 +1,266 @@
+import datetime
+import re
+import threading
+import time
+
+# 이 시간(초) 동안 받은 바이트가 없는 작업(분석 / 병합 / 일시정지 중)은 몫을 나누지 않는다.
+IDLE_AFTER = 2.0
+# 일정 / 유휴 작업을 다시 확인하는 간격 (초)
+RECHECK_INTERVAL = 1.0
+# 제한 중인 연결이 한 번에 앞서 받을 수 있는 양 (초 단위 비율, 최소 바이트)
+BURST_SECONDS = 0.5
+MIN_BURST = 64 * 1024
+# 제한이 있으면 yt-dlp 읽기 단위를 고정 (기본 동작은 최대 4MiB까지 키워 한 번에 몰아서 받음)
+GOVERNED_BUFFER_SIZE = 64 * 1024
+
+_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+_RATE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?(?:/s)?\s*$", re.IGNORECASE)
+_WINDOW = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*=\s*(.+)$")
+
+
+def parse_rate(text):
+    """'500K', '2.5M', '1G', '1048576' -> 바이트/초 (0 = 무제한)"""
+    if isinstance(text, (int, float)):
+        return max(0, int(text))
+    match = _RATE.match(text or "0")
+    if not match:
+        raise ValueError(f"속도 형식이 아닙니다: {text!r} (예: 500K, 2M)")
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+def parse_schedule(items):
+    """
+    ['09:00-18:00=2M', '18:00-09:00=0'] -> [(시작 분, 끝 분, 바이트/초)]
+    끝이 시작보다 이르면 자정을 넘는 구간. 겹치면 앞의 항목 우선, 어느 구간에도 없으면 전체 제한 사용
+    """
+    schedule = []
+    for item in items or []:
+        match = _WINDOW.match(item)
+        if not match:
+            raise ValueError(f"시간대 형식이 아닙니다: {item!r} (예: 09:00-18:00=2M)")
+        start_h, start_m, end_h, end_m, rate = match.groups()
+        start, end = int(start_h) * 60 + int(start_m), int(end_h) * 60 + int(end_m)
+        if start >= 24 * 60 or end > 24 * 60 or int(start_m) >= 60 or int(end_m) >= 60:
+            raise ValueError(f"잘못된 시각입니다: {item!r}")
+        schedule.append((start, end, parse_rate(rate)))
+    return schedule
+
+
+def format_schedule(schedule):
+    return [f"{s // 60:02d}:{s % 60:02d}-{e // 60:02d}:{e % 60:02d}={rate}" for s, e, rate in schedule]
+
+
+def allocate(total, shares):
+    """
+    전체 속도(total)를 작업별 가중치에 비례해 나누되, 작업 상한(cap)을 넘는 몫은 나머지 작업에 다시 나눈다.
+    (가중 max-min 공정 분배) shares: [(key, weight, cap)] -> {key: 바이트/초 또는 None(무제한)}
+    """
+    if not total:
+        return {key: cap or None for key, _, cap in shares}
+    rates = {}
+    remaining = total
+    pending = list(shares)
+    while pending:
+        fair = remaining / sum(weight for _, weight, _ in pending)
+        capped = [s for s in pending if s[2] and s[2] <= fair * s[1]]
+        if not capped:
+            rates.update({key: fair * weight for key, weight, _ in pending})
+            break
+        for share in capped:
+            rates[share[0]] = share[2]
+            remaining -= share[2]
+            pending.remove(share)
+    return rates
+
+
+class TokenBucket:
+    """
+    초당 rate 바이트 토큰 버킷. reserve()는 막지 않고 기다릴 시간을 돌려준다.
+    (토큰이 음수가 되도록 미리 빌려 쓰므로 여러 스레드가 동시에 요청해도 순서대로 간격이 벌어진다)
+    """
+
+    def __init__(self, rate=None, clock=time.monotonic):
+        self._clock = clock
+        self.rate = None
+        self.burst = 0
+        self._tokens = 0.0
+        self._last = clock()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        self._refill(self._clock())
+        self.rate = rate or None
+        self.burst = max(MIN_BURST, (rate or 0) * BURST_SECONDS)
+        self._tokens = min(self._tokens, self.burst)
+
+    def _refill(self, now):
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self, amount, now=None):
+        if not self.rate:
+            return 0.0
+        self._refill(self._clock() if now is None else now)
+        self._tokens -= amount
+        return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class BandwidthShare:
+    """작업 하나의 몫 (BandwidthGovernor.register). 끝나면 close()"""
+
+    def __init__(self, governor, weight=1, cap=0):
+        self.governor = governor
+        self.weight = max(1, weight or 1)
+        self.cap = cap or 0
+        self.bucket = TokenBucket(cap, clock=governor._clock)
+        self.active = False
+        self.last_active = None
+        self.received = 0
+        self._seen = {}  # 파일 -> 마지막으로 본 downloaded_bytes
+
+    @property
+    def rate(self):
+        """지금 배정된 속도 (바이트/초, None이면 무제한)"""
+        return self.bucket.rate
+
+    def consume(self, amount):
+        """amount 바이트를 받았다. 기다려야 할 시간(초) 반환"""
+        return self.governor._consume(self, amount)
+
+    def progress_delay(self, d):
+        """yt-dlp progress_hook의 d로 새로 받은 바이트를 계산해 consume (세그먼트 스레드에서 동시에 호출)"""
+        key = d.get("tmpfilename") or d.get("filename")
+        downloaded = d.get("downloaded_bytes") or 0
+        with self.governor._lock:
+            if d.get("status") != "downloading":
+                self._seen.pop(key, None)
+                return 0.0
+            last = self._seen.get(key)
+            self._seen[key] = max(downloaded, last or 0)
+        # 처음 보는 파일은 이어받은 부분(.part)이 포함될 수 있어 기준점으로만 사용
+        if last is None or downloaded <= last:
+            return 0.0
+        return self.consume(downloaded - last)
+
+    def close(self):
+        self.governor._unregister(self)
+
+
+class BandwidthGovernor:
+    """
+    실행 중인 모든 작업(과 그 세그먼트 연결)이 함께 쓰는 대역폭 제한
+    - limit: 전체 상한 (바이트/초, 0 = 무제한), schedule: 시간대별 전체 상한 (parse_schedule)
+    - 작업마다 register(weight, cap)로 몫을 받고, 받은 바이트만큼 consume()이 돌려준 시간만큼 기다린다.
+      (DownloadEngine.progress_hook에서 호출하므로 읽기를 멈춘 연결은 TCP 수신 창이 차서 서버도 느려진다)
+    - 전체 상한은 바이트를 받고 있는 작업끼리 가중치대로 나누고(상한을 넘는 몫은 나머지에), 작업이 시작 / 끝나거나
+      IDLE_AFTER초 동안 받은 바이트가 없으면 다시 나눈다. 전체 버킷도 함께 적용해 합이 상한을 넘지 않게 한다.
+    """
+
+    def __init__(self, limit=0, schedule=None, clock=time.monotonic, now=datetime.datetime.now):
+        self._clock = clock
+        self._now = now
+        self._lock = threading.Lock()
+        self._shares = []
+        self.limit = limit or 0
+        self.schedule = list(schedule or [])
+        self._global = TokenBucket(clock=clock)
+        self._next_check = 0.0
+        self._rebalance(clock())
+
+    # -------------------------------------
+    # 설정
+    # -------------------------------------
+    def configure(self, limit=None, schedule=None):
+        """전체 상한 / 시간대 변경 (None이면 그대로). 실행 중인 작업에 바로 적용"""
+        with self._lock:
+            if limit is not None:
+                self.limit = limit
+            if schedule is not None:
+                self.schedule = list(schedule)
+            self._rebalance(self._clock())
+
+    def current_limit(self):
+        """지금 시각에 적용되는 전체 상한"""
+        now = self._now()
+        minute = now.hour * 60 + now.minute
+        for start, end, rate in self.schedule:
+            inside = start <= minute < end if start < end else (minute >= start or minute < end)
+            if inside:
+                return rate
+        return self.limit
+
+    def is_limited(self):
+        """전체 / 시간대 제한이 하나라도 설정되어 있는지"""
+        return bool(self.limit or any(rate for _, _, rate in self.schedule))
+
+    def status(self):
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "schedule": format_schedule(self.schedule),
+                "current_limit": self._global.rate or 0,
+                "jobs": [{"weight": s.weight, "cap": s.cap, "rate": round(s.rate) if s.rate else None,
+                          "active": s.active, "received": s.received} for s in self._shares],
+            }
+
+    # -------------------------------------
+    # 작업 등록
+    # -------------------------------------
+    def register(self, weight=1, cap=0) -> BandwidthShare:
+        share = BandwidthShare(self, weight, cap)
+        with self._lock:
+            self._shares.append(share)
+            self._rebalance(self._clock())
+        return share
+
+    def _unregister(self, share):
+        with self._lock:
+            if share in self._shares:
+                self._shares.remove(share)
+                self._rebalance(self._clock())
+
+    # -------------------------------------
+    # 분배
+    # -------------------------------------
+    def _consume(self, share, amount):
+        with self._lock:
+            now = self._clock()
+            share.received += amount
+            share.last_active = now
+            if not share.active:
+                share.active = True
+                self._rebalance(now)
+            elif now >= self._next_check:
+                self._rebalance(now)
+            return max(share.bucket.reserve(amount, now), self._global.reserve(amount, now))
+
+    def _rebalance(self, now):
+        """(lock 안에서) 유휴 작업을 빼고 현재 상한을 다시 나눈다."""
+        for share in self._shares:
+            if share.active and now - share.last_active > IDLE_AFTER:
+                share.active = False
+        total = self.current_limit()
+        if total != self._global.rate:
+            self._global.set_rate(total)
+        active = [s for s in self._shares if s.active]
+        rates = allocate(total, [(id(s), s.weight, s.cap) for s in active])
+        for share in self._shares:
+            # 유휴 작업은 다시 받기 시작할 때 나누므로 그때까지는 자기 상한만 적용
+            rate = rates[id(share)] if share.active else share.cap or None
+            if rate != share.bucket.rate:
+                share.bucket.set_rate(rate)
+        self._next_check = now + RECHECK_INTERVAL
+
+
+_default_governor = None
+_default_governor_lock = threading.Lock()
+
+
+def get_bandwidth_governor() -> BandwidthGovernor:
+    """프로그램 전체에서 공유하는 기본 대역폭 제한 (처음에는 무제한)"""
+    global _default_governor
+    with _default_governor_lock:
+        if _default_governor is None:
+            _default_governor = BandwidthGovernor()
+        return _default_governor
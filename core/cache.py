@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# 스트림 URL은 수 시간 뒤 만료되므로 TTL은 그보다 짧게 잡는다.
+DEFAULT_CACHE_PATH = os.path.join(os.getcwd(), "cache", "metadata.sqlite3")
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# 분석/다운로드에 쓰지 않는 무거운 필드는 저장하지 않는다.
+_DROP_KEYS = {"automatic_captions", "thumbnails", "heatmap", "description", "tags"}
+
+
+def _reject_unserializable(obj):
+    raise TypeError(f"캐시할 수 없는 값: {type(obj).__name__}")
+
+
+def sanitize_info(info: dict) -> dict:
+    """캐시에 저장할 필드만 남긴다. (최상위 '__' 내부 키와 무거운 필드 제거)"""
+    return {
+        k: v for k, v in info.items()
+        if not k.startswith("__") and k not in _DROP_KEYS
+    }
+
+
+class MetadataCache:
+    """
+    추출한 info dict를 디스크(SQLite)에 저장하는 캐시
+    - 키: 정규화된 영상/플레이리스트 ID (analyzer.canonical_key)
+    - 값: 정리된 info dict를 JSON + zlib으로 압축해 저장
+    - TTL이 지난 항목은 조회 시 제거, 전체 크기가 max_bytes를 넘으면 오래 안 쓴 항목부터 제거 (LRU)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed)")
+        self._conn.commit()
+
+    # -------------------------------------
+    # 조회 / 저장
+    # -------------------------------------
+    def get(self, key):
+        if not key:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            data, created = row
+            if now - created > self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(zlib.decompress(data))
+
+    def put(self, key, info) -> bool:
+        """
+        info를 저장한다. JSON으로 직렬화할 수 없는 값(지연 목록, 함수 등)이 있으면 저장하지 않고 False 반환
+        """
+        if not key or not info:
+            return False
+        try:
+            raw = json.dumps(sanitize_info(info), ensure_ascii=False,
+                             separators=(",", ":"), default=_reject_unserializable)
+        except (TypeError, ValueError):
+            return False
+
+        data = zlib.compress(raw.encode("utf-8"))
+        if len(data) > self.max_bytes:
+            return False
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, data, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+        return True
+
+    # -------------------------------------
+    # 무효화 / 정리
+    # -------------------------------------
+    def invalidate(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        """만료 항목 제거 후, 전체 크기가 한도를 넘으면 가장 오래 안 쓴 항목부터 제거 (lock 안에서 호출)"""
+        self._conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """프로그램 전체에서 공유하는 기본 캐시"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = MetadataCache()
+        return _default_cache
@@ -0,0 +1,575 @@
+import functools
+import os
+import sys
+import threading
+import time
+
+from core.analyzer import analyze_url_is_playlist, canonical_key, extract_info, filter_available_subtitles
+from core.archive import ArchivePP, archive_request, get_download_archive
+from core.bandwidth import GOVERNED_BUFFER_SIZE, get_bandwidth_governor, parse_rate
+from core.cache import get_metadata_cache
+from core.formats import FormatBudget, install_selector
+from core.journal import DONE, FAILED, MERGED, get_job_journal
+from core.playlist import DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_FRAGMENTS, download_playlist, fragment_budget, reuse_or_claim
+from core.options import DEFAULT_AUDIO_BITRATE
+from core.postprocess import (
+    FFMPEG_STAGES, AudioConvertPP, FFmpegProgress, JournalFormatPP, MergePool, PipelinedYoutubeDL, TelemetryPP,
+)
+from core.progress import ProgressTracker
+from core.sessions import get_session_pool
+from core.storage import DEFAULT_STAGING_PATH, JobStorage, PreflightPP, parse_size
+from core.subtitles import DEFAULT_SUBTITLE_FORMAT, DEFAULT_SUBTITLE_WORKERS, download_subtitles
+from core.telemetry import JobProfiler, JobTelemetry, get_telemetry_sink
+from core.tuning import FragmentTuningSession, get_fragment_tuner
+
+
+def _ignore(*_):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def default_ffmpeg_location():
+    """기본 ffmpeg 경로 (PyInstaller 빌드 시 자동 탐지, 한 번만 계산)"""
+    if hasattr(sys, "_MEIPASS"):
+        # exe 실행 시 임시폴더(_MEIxxxx)에 풀림
+        return os.path.join(sys._MEIPASS, "ffmpeg")
+    return os.path.join(os.getcwd(), "ffmpeg")  # 개발 중엔 로컬 ffmpeg 폴더 사용
+
+
+class DownloadEngine:
+    """
+    yt_dlp 다운로드 작업 하나를 실행하는 엔진 (Qt 없음)
+    - run()은 호출한 스레드에서 끝날 때까지 실행 (GUI는 DownloadThread, CLI는 일반 스레드에서 호출)
+    - on_progress(percent, status_text): 진행 상황
+    - on_finished(msg): 완료 메시지
+    - on_error(msg): 오류 메시지
+    - 결과는 메시지가 아니라 result("done" / "failed") / failed_entries(플레이리스트에서 실패한 영상 수) / ok로 확인한다.
+      (on_finished 호출 전에 정해진다)
+    콜백은 다운로드 / 워커 스레드에서 호출된다.
+    - telemetry(JobTelemetry): 단계별 시간 / 바이트 / 속도 / 재시도 수 (끝나면 TelemetrySink로 내보냄)
+    - options["profile_path"]가 있으면 작업 전체를 cProfile로 측정해 그 경로에 저장
+    - 받은 바이트는 공유 대역폭 제한(BandwidthGovernor)에 알리고, 필요한 만큼 progress_hook에서 기다린다.
+      (options["rate_limit"]: 작업 상한 바이트/초, options["bandwidth_weight"]: 전체 상한을 나눌 때 가중치)
+    - options["size_budget"] / ["time_budget"]이 있거나 ["smallest_format"]이면 영상마다 포맷 표에서
+      options["max_height"] 이하로 목표에 맞게 고른다. (core.formats, 시간 목표는 최근 작업 속도 기준)
+      없으면 형식 문자열(품질 프리셋)로만 고른다.
+    - options["audio_format"](mp3, m4a, opus)이 있으면 오디오 스트림만 받아 변환한다.
+      (플레이리스트는 변환을 후처리 풀로 넘겨 다음 영상 다운로드와 겹치게)
+    - options["claim_owner"](작업자 모드)가 있으면 받을 영상을 다운로드 기록에 받는 중으로 표시해
+      다른 작업자 프로세스와 같은 영상을 동시에 받지 않는다. (core.workqueue)
+    """
+
+    def __init__(self, options: dict, on_progress=None, on_finished=None, on_error=None):
+        self.options = options
+        self.on_progress = on_progress or _ignore
+        # 결과(done / failed)는 계측 기록용으로 함께 남긴다.
+        self.result = None
+        self.result_message = None
+        self.failed_entries = 0
+        self.on_finished = self._recording("done", on_finished)
+        self.on_error = self._recording("failed", on_error)
+        self.telemetry = JobTelemetry(options.get("url"), options.get("journal_id"))
+        self._is_canceled = False
+        # set 상태면 진행, clear 상태면 progress_hook에서 대기 (일시정지)
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        # 대역폭 제한으로 기다리는 중에도 취소되면 바로 깨운다.
+        self._cancel_event = threading.Event()
+        self._bandwidth = None
+        self.progress = ProgressTracker()
+        self._pp_watchers = []
+        # 작업 기록 (options["journal_id"]가 있을 때만, 비정상 종료 후 재개용)
+        self._journal = None
+        # 전체 다운로드 기록 (이미 받은 영상 건너뛰기, 자막만 모드에서는 사용 안 함)
+        self._archive = None
+        # 세그먼트 수 자동 조절 (max_fragments == 0) 시 (조절기, 상한)
+        self._fragment_tuning = None
+        # 디스크 사용 (스테이징 / 공간 예약, 자막만 모드에서는 사용 안 함)
+        self._storage = None
+        # 오디오만 저장 형식 (mp3, m4a, opus, 자막만 모드에서는 사용 안 함)
+        self._audio_format = None
+        # 포맷 선택 목표 (core.formats, 목표가 없거나 오디오만 / 자막만이면 None)
+        self._format_budget = None
+        self._last_subtitle_emit = 0.0
+
+    @property
+    def ok(self):
+        """완료했고 실패한 영상도 없는지 (플레이리스트 일부 실패도 실패로 본다)"""
+        return self.result == "done" and not self.failed_entries
+
+    def _recording(self, result, callback):
+        callback = callback or _ignore
+
+        def wrapper(msg):
+            self.result, self.result_message = result, msg
+            callback(msg)
+        return wrapper
+
+    # -------------------------------------
+    # 내부 메서드
+    # -------------------------------------
+    def progress_hook(self, d):
+        # 일시정지 중이면 다운로드 스레드를 여기서 멈춘다. (재개 시 이어서 진행)
+        self._resume_event.wait()
+        if self._is_canceled:
+            raise Exception("사용자에 의해 다운로드 취소됨.")
+        if self._bandwidth is not None:
+            delay = self._bandwidth.progress_delay(d)
+            if delay > 0:
+                self.telemetry.add_phase("throttle", delay)
+                if self._cancel_event.wait(delay):
+                    raise Exception("사용자에 의해 다운로드 취소됨.")
+
+        # 바이트 기준으로 상태만 갱신하고, UI 시그널은 일정 간격(10Hz) 또는 파일 완료 시에만 보낸다.
+        if self.progress.update(d):
+            self._emit_progress()
+
+    def postprocess_progress(self, stage, stage_percent, info):
+        """ffmpeg 후처리(병합/자막 변환/리먹스)의 실제 진행률 (FFmpegProgress 콜백)"""
+        percent, _, _ = self.progress.snapshot()
+        title = info.get("title") or self.progress.title
+        self.on_progress(percent, f"{stage} 중... {stage_percent:.0f}% : {title}")
+
+        index = info.get("playlist_index")
+        if self._journal is not None and index is not None \
+                and stage == FFMPEG_STAGES["merger"] and stage_percent >= 100:
+            self._journal.set_entry_state(index, MERGED)
+
+    def _on_merge_done(self, info, error):
+        """후처리 풀에서 병합이 끝난 영상을 작업 기록에 반영 (MergePool 콜백)"""
+        index = info.get("playlist_index")
+        if self._journal is None or index is None:
+            return
+        if error is None:
+            self._journal.set_entry_state(index, DONE, filepath=info.get("filepath"))
+        else:
+            self._journal.set_entry_state(index, FAILED, error=error)
+
+    def _new_ydl(self, ydl_opts, merge_pool=None):
+        """
+        YoutubeDL 생성 (인스턴스마다 ffmpeg 진행률 파일을 따로 둔다)
+        - merge_pool이 있으면 병합을 풀로 넘기고 바로 다음 다운로드로 진행
+        """
+        watcher = FFmpegProgress(self.postprocess_progress)
+        self._pp_watchers.append(watcher)
+        params = {
+            **ydl_opts,
+            "postprocessor_args": watcher.postprocessor_args(),
+            "postprocessor_hooks": [watcher.hook, self.telemetry.postprocessor_hook],
+            "retry_sleep_functions": self.telemetry.retry_sleep_functions(),
+        }
+        session = None
+        if self._fragment_tuning is not None:
+            # 인스턴스마다 측정기를 두고 (워커별로 받는 파일이 다름) 호스트별 기록은 공유
+            session = FragmentTuningSession(*self._fragment_tuning)
+            params.update({
+                "progress_hooks": [*ydl_opts["progress_hooks"], session.hook],
+                "retry_sleep_functions": self.telemetry.retry_sleep_functions(session.retry_sleep_functions()),
+            })
+        ydl = self._acquire_ydl(params, merge_pool)
+        if self._format_budget is not None and ydl_opts.get("format"):
+            install_selector(ydl, self._format_budget, ydl_opts["format"])
+        if session is not None:
+            session.attach(ydl)
+        # 자동 조절 후처리기가 값을 정한 다음에 기록
+        ydl.add_post_processor(TelemetryPP(self.telemetry, ydl), when="before_dl")
+        if self._storage is not None:
+            ydl.add_post_processor(PreflightPP(self._storage, ydl), when="before_dl")
+        if self._audio_format:
+            ydl.add_post_processor(AudioConvertPP(
+                ydl, self._audio_format, self.options.get("audio_bitrate") or DEFAULT_AUDIO_BITRATE))
+        if self._journal is not None:
+            ydl.add_post_processor(JournalFormatPP(self._journal, ydl), when="before_dl")
+        if self._archive is not None:
+            ydl.add_post_processor(ArchivePP(self._archive, ydl, archive_request(self.options)), when="after_move")
+        return ydl
+
+    def _acquire_ydl(self, params, merge_pool=None):
+        """
+        작업 / 워커가 쓸 YoutubeDL. 기본은 세션 풀에서 받아 이전 작업의 연결 / 쿠키 / 추출기 상태를 재사용하고,
+        close()하면 풀로 돌아간다. (options["reuse_sessions"]가 False면 매번 새로 만든다)
+        """
+        if not self.options.get("reuse_sessions", True):
+            return PipelinedYoutubeDL(params, merge_pool=merge_pool, storage=self._storage)
+        ydl = get_session_pool().acquire(params, merge_pool=merge_pool, storage=self._storage)
+        self.telemetry.session_acquired(reused=ydl.jobs > 1)
+        return ydl
+
+    def _link_speed(self):
+        """시간 목표에 쓸 속도: options["link_speed"] 또는 최근 작업 속도, 대역폭 제한이 더 낮으면 그 값"""
+        rates = [self.options.get("link_speed") or get_telemetry_sink().link_speed(),
+                 self._bandwidth.cap, get_bandwidth_governor().current_limit()]
+        rates = [rate for rate in rates if rate]
+        return min(rates) if rates else None
+
+    def _emit_progress(self):
+        percent, speed, _ = self.progress.snapshot()
+        self.telemetry.sample_speed(speed)
+        self.on_progress(percent, self.progress.status_text())
+
+    def _on_playlist_entry_done(self, index):
+        self.progress.entry_finished(index)
+        self._emit_progress()
+
+    def _reuse_archived_video(self, info, out_dir):
+        """단일 영상이 다운로드 기록에 있고 작업의 화질 / 저장 형식 / 자막에 맞으면 기존 파일을 out_dir에 놓고 작업을 끝낸다."""
+        if self._archive is None:
+            return False
+        filepath = reuse_or_claim(self._archive, info, out_dir, self.options.get("claim_owner"),
+                                  lambda: self._is_canceled, request=archive_request(self.options))
+        if filepath is None:
+            return False
+        self.on_progress(100, "이미 받은 영상입니다.")
+        self.on_finished(f"이미 받은 영상입니다. 기존 파일을 사용합니다 ✅\n{filepath}")
+        return True
+
+    def _on_playlist_entry(self, index, title):
+        percent, _, _ = self.progress.snapshot()
+        self.on_progress(percent, f"플레이리스트 {index}번째 영상 분석 중... : {title}")
+
+    # -------------------------------------
+    # 메인 실행 로직
+    # -------------------------------------
+    def run(self):
+        """
+        작업 실행 후 계측 결과를 기록 (options["profile_path"]가 있으면 cProfile 측정)
+        어떤 예외도 밖으로 내보내지 않고 on_finished / on_error 중 하나로 끝난다. (호출한 스레드가 작업을 정리하게)
+        """
+        sink = get_telemetry_sink()
+        sink.job_started()
+        profiler = None
+        try:
+            self._bandwidth = get_bandwidth_governor().register(
+                weight=self.options.get("bandwidth_weight", 1), cap=parse_rate(self.options.get("rate_limit") or 0))
+            profiler = JobProfiler(self.options["profile_path"]) if self.options.get("profile_path") else None
+            if profiler is not None and not profiler.start():
+                profiler = None  # 다른 작업을 측정 중
+            self._run()
+        except Exception as e:
+            # 다운로드 전 준비(옵션 해석, 폴더 / 기록 열기, 후처리 풀 등)나 정리 중 오류
+            if self.result is None:
+                self.on_error(f"다운로드 준비 중 오류 발생: {e}")
+        finally:
+            if self._archive is not None and self.options.get("claim_owner"):
+                # 받지 못한 영상의 받는 중 표시를 지워 다른 작업자가 받게
+                self._archive.release_claims(self.options["claim_owner"])
+            if self._bandwidth is not None:
+                self._bandwidth.close()
+            self.telemetry.finish()
+            summary = self.telemetry.summary(
+                "canceled" if self._is_canceled else self.result,
+                self.result_message if self.result == "failed" else None)
+            if profiler is not None:
+                summary["profile"] = profiler.stop()
+            sink.record(summary)
+
+    def _run(self):
+        url = self.options["url"]
+        fmt = self.options["format"]
+        out_dir = self.options["output_path"]
+        fragments = self.options["max_fragments"]
+        # self.container = self.options.get("container", "mp4")
+        subtitle_only = self.options.get("subtitle_only", False)
+        subtitle_enabled = self.options.get("subtitle", False)
+        audio_format = self._audio_format = None if subtitle_only else self.options.get("audio_format")
+        is_playlist = analyze_url_is_playlist(url)
+        # 플레이리스트 동시 다운로드 수 (워커 × 세그먼트가 전체 연결 한도를 넘지 않게 세그먼트 수 조정)
+        workers = max(1, self.options.get("playlist_workers", 1)) if is_playlist else 1
+        max_connections = self.options.get("max_connections", DEFAULT_MAX_CONNECTIONS)
+        journal_id = self.options.get("journal_id")
+        self._journal = get_job_journal().job(journal_id) if journal_id else None
+        # 다운로드 기록은 영상 ID당 파일 하나라 오디오만 받은 파일과 섞이지 않게 오디오만 모드에서는 쓰지 않는다.
+        if not subtitle_only and not audio_format and self.options.get("use_archive", True):
+            self._archive = get_download_archive()
+        # 세그먼트 수 0 = 자동: 측정한 속도 / 재시도에 맞춰 파일마다 조절 (상한은 연결 한도 내)
+        if not fragments:
+            fragments = fragment_budget(workers, DEFAULT_MAX_FRAGMENTS, max_connections)
+            self._fragment_tuning = (get_fragment_tuner(), fragments)
+        if not subtitle_only:
+            staging_path = self.options.get("staging_path")
+            self._storage = JobStorage(
+                out_dir,
+                # None = 기본 스테이징 폴더, "" = 저장 폴더에 바로 쓰기
+                staging_dir=DEFAULT_STAGING_PATH if staging_path is None else staging_path,
+                io_buffer_size=parse_size(self.options.get("io_buffer_size") or 0),
+                preallocate=self.options.get("preallocate", False),
+                fsync=self.options.get("fsync", "final"),
+                disk_full=self.options.get("disk_full", "fail"),
+                is_canceled=lambda: self._is_canceled,
+                on_wait=lambda message: self.on_progress(self.progress.snapshot()[0], message),
+            )
+
+        if not subtitle_only and not audio_format and any(
+                self.options.get(key) for key in ("smallest_format", "size_budget", "time_budget")):
+            self._format_budget = FormatBudget(
+                max_height=self.options.get("max_height"),
+                size_budget=parse_size(self.options.get("size_budget") or 0),
+                time_budget=self.options.get("time_budget") or 0,
+                link_speed=self._link_speed(),
+                prefer_fps=self.options.get("prefer_fps", False),
+            )
+
+        ffmpeg_path = self._get_ffmpeg_path()
+
+        # 진행 상태 초기화
+        self.on_progress(0, "플레이리스트 감지 중..." if is_playlist else "영상 분석 중...")
+
+        # -------------------------------------
+        # yt_dlp 옵션 구성
+        # -------------------------------------
+        ydl_opts = {
+            # 제목이 같은 다른 영상과 겹치지 않도록 ID를 붙인다. (paths 기준 상대 경로)
+            "outtmpl": "%(title)s [%(id)s].%(ext)s",
+            "paths": {"home": out_dir},
+            "quiet": True,
+            "noprogress": True,
+            "progress_hooks": [self.progress_hook, self.telemetry.progress_hook],
+            "noplaylist": not is_playlist,
+            "ffmpeg_location": ffmpeg_path,
+            # 중단된 다운로드는 남아 있는 .part / 세그먼트(.ytdl)부터 이어받는다.
+            "continuedl": True,
+            # API 기본값은 재시도 0회라 일시적인 5xx에도 세그먼트가 빠진다. (CLI 기본값과 동일하게)
+            "retries": 10,
+            "fragment_retries": 10,
+        }
+        if self._storage is not None:
+            # 받는 중인 파일은 스테이징 폴더(temp)에, 끝난 파일만 저장 폴더(home)로
+            ydl_opts.update(self._storage.ydl_params())
+        if self._bandwidth.cap or get_bandwidth_governor().is_limited():
+            # 제한 중에는 읽기 단위를 고정해 짧은 간격으로 고르게 받는다.
+            ydl_opts.update({"buffersize": GOVERNED_BUFFER_SIZE, "noresizebuffer": True})
+
+        # 자막만 다운 시
+        if subtitle_only:
+            ydl_opts["skip_download"] = True
+        else:
+            ydl_opts.update({
+                "format": fmt,
+                "concurrent_fragment_downloads": fragment_budget(workers, fragments, max_connections),
+            })
+            if audio_format:
+                # 변환 후 파일이 이미 있으면 다시 받지 않는다.
+                ydl_opts["final_ext"] = audio_format
+
+        # 플레이리스트는 병합 / 오디오 변환을 별도 후처리 풀(CPU 코어 수)에서 실행해 다음 영상 다운로드와 겹치게 한다.
+        pipelined = not subtitle_only and self.options.get("pipelined_merge", True)
+
+        def new_merge_pool():
+            return MergePool(lambda: self._new_ydl(ydl_opts), on_done=self._on_merge_done,
+                             defer_all=bool(audio_format))
+
+        merge_pool = new_merge_pool() if is_playlist and pipelined else None
+
+        # -------------------------------------
+        # 다운로드 실행
+        # - 메타데이터는 작업당 한 번만 추출하고, 자막 필터링과 다운로드가 같은 info를 재사용한다.
+        # -------------------------------------
+        try:
+            # URL만으로 영상 ID를 알 수 있으면(YouTube) 분석 전에 다운로드 기록부터 확인
+            if not is_playlist:
+                extractor, _, video_id = canonical_key(url).partition(":")
+                if extractor != "url" and self._reuse_archived_video({"ie_key": extractor, "id": video_id}, out_dir):
+                    return
+
+            cache = get_metadata_cache()
+            with self._new_ydl(ydl_opts, merge_pool) as ydl:
+                # 목록을 끝까지 기록해 둔 플레이리스트는 다시 조회하지 않고 남은 영상만 처리
+                if self._journal is not None and self._journal.is_enumerated():
+                    info = {**self._journal.playlist_info(), "entries": []}
+                else:
+                    with self.telemetry.span("extract"):
+                        info = extract_info(ydl, url, cache=cache)
+                if not info:
+                    self.on_error("영상 정보를 가져올 수 없습니다.")
+                    return
+                if not is_playlist and self._reuse_archived_video(info, out_dir):
+                    return
+
+                # 자막만: 포맷 선택 / yt-dlp 다운로드 과정 없이 자막 파이프라인으로 처리
+                if subtitle_only:
+                    self._download_subtitles_only(ydl, ydl_opts, info, out_dir, cache)
+                    return
+
+                # -------------------------------------
+                # 자막 필터링
+                # -------------------------------------
+                valid_langs = []
+                if subtitle_enabled:
+                    requested_langs = self.options.get("subtitle_langs", [])
+                    if is_playlist:
+                        valid_langs = requested_langs
+                    else:
+                        # 단일 영상은 실제 자막 존재 여부 확인
+                        with self.telemetry.span("subtitle_filter"):
+                            valid_langs = filter_available_subtitles(info, requested_langs)
+
+                    if not valid_langs:
+                        self.on_progress(0, "선택한 자막 언어는 제공되지 않습니다. (영상만 다운로드)")
+                    elif not is_playlist:
+                        self.on_progress(0, f"자막 다운로드 가능 언어: {', '.join(valid_langs)}")
+
+                # 자막 존재 시 (params는 다운로드 시점에 읽히므로 추출 후 갱신해도 적용된다)
+                if valid_langs:
+                    ydl.params.update({
+                        "writesubtitles": True,
+                        "subtitleslangs": valid_langs,
+                        "skip_auto_subtitle": True,
+                    })
+
+                if info.get("_type") in ("playlist", "multi_video"):
+                    if merge_pool is None and pipelined:
+                        # URL만으로는 플레이리스트인지 몰랐던 경우 (RSS 등)
+                        merge_pool = ydl.merge_pool = new_merge_pool()
+                    # 플레이리스트는 목록을 지연 순회하며 영상별로 바로 다운로드
+                    if self._journal is not None:
+                        self._journal.save_playlist_info(info)
+                        finished = self._journal.entry_counts().get(DONE, 0)
+                    else:
+                        finished = 0
+                    self.progress.set_total_entries(info.get("playlist_count"), finished)
+                    if self._format_budget is not None and info.get("playlist_count"):
+                        # 시간 목표를 남은 영상에 나눈다.
+                        self._format_budget.set_entries(info["playlist_count"] - finished)
+                    self.telemetry.mode = "playlist"
+                    with self.telemetry.span("download"):
+                        _, _, failed = download_playlist(
+                            ydl, info,
+                            requested_langs=valid_langs,
+                            cache=cache,
+                            on_entry=self._on_playlist_entry,
+                            is_canceled=lambda: self._is_canceled,
+                            workers=workers,
+                            make_ydl=lambda: self._new_ydl(ydl_opts, merge_pool),
+                            on_entry_done=self._on_playlist_entry_done,
+                            journal=self._journal,
+                            archive=self._archive,
+                            output_dir=out_dir,
+                            telemetry=self.telemetry,
+                            claim_owner=self.options.get("claim_owner"),
+                            archive_request=archive_request(self.options),
+                        )
+                else:
+                    failed = []
+                    with self.telemetry.span("download"):
+                        ydl.process_ie_result(info, download=True)
+
+            # 풀에서 진행 중인 병합이 모두 끝나야 완료
+            if merge_pool is not None:
+                self.on_progress(self.progress.snapshot()[0],
+                                 f"남은 {'오디오 변환' if audio_format else '병합'} 작업 마무리 중...")
+                with self.telemetry.span("merge_wait"):
+                    merge_pool.wait()
+                failed += merge_pool.failed
+
+            self.failed_entries = self.telemetry.failed_entries = len(failed)
+            self.on_finished("다운로드 완료 ✅" + self._failed_message(failed))
+
+        except Exception as e:
+            if "취소됨" in str(e):
+                self.on_error("사용자가 다운로드를 취소했습니다.")
+            else:
+                self.on_error(f"다운로드 중 오류 발생: {e}")
+        finally:
+            if merge_pool is not None:
+                merge_pool.shutdown(cancel=self._is_canceled)
+            for watcher in self._pp_watchers:
+                watcher.close()
+            self._pp_watchers.clear()
+            if self._storage is not None:
+                self._storage.close()
+
+    def _download_subtitles_only(self, ydl, ydl_opts, info, out_dir, cache):
+        """자막만 모드 (core.subtitles): 영상별 자막을 동시에 받아 프로세스 안에서 변환"""
+        langs = self.options.get("subtitle_langs", []) if self.options.get("subtitle", False) else []
+        if not langs:
+            self.on_progress(0, "선택한 자막 언어가 없습니다.")
+            self.on_finished("자막만 다운로드 모드 — 종료")
+            return
+
+        is_playlist = info.get("_type") in ("playlist", "multi_video")
+        self.progress.kind = "자막"
+        self.telemetry.mode = "subtitles"
+        if is_playlist:
+            finished = 0
+            if self._journal is not None:
+                self._journal.save_playlist_info(info)
+                finished = self._journal.entry_counts().get(DONE, 0)
+            self.progress.set_total_entries(info.get("playlist_count"), finished)
+
+        with self.telemetry.span("subtitles"):
+            files, skipped, failed = download_subtitles(
+                ydl, info, langs, out_dir,
+                fmt=self.options.get("subtitle_format", DEFAULT_SUBTITLE_FORMAT),
+                cache=cache,
+                is_canceled=lambda: self._is_canceled,
+                workers=self.options.get("subtitle_workers", DEFAULT_SUBTITLE_WORKERS) if is_playlist else 1,
+                # 자막만 받으므로 후처리기 / 진행률 감시 없는 YoutubeDL로 충분
+                make_ydl=lambda: self._acquire_ydl(dict(ydl_opts)),
+                on_entry=self._on_subtitle_entry,
+                on_entry_done=self._on_subtitle_entry_done,
+                journal=self._journal,
+                telemetry=self.telemetry,
+            )
+        self.telemetry.files += files
+        self.failed_entries = self.telemetry.failed_entries = len(failed)
+        if self._is_canceled:
+            raise Exception("사용자에 의해 다운로드 취소됨.")
+        if not files and not failed:
+            self.on_progress(100, "선택한 자막 언어는 제공되지 않습니다.")
+            self.on_finished("자막만 다운로드 모드 — 종료")
+            return
+
+        msg = f"자막 다운로드 완료 ✅ ({files}개 파일)"
+        if is_playlist and skipped:
+            msg += f"\n선택한 자막이 없는 영상 {skipped}개는 건너뜀"
+        self.on_finished(msg + self._failed_message(failed))
+
+    def _on_subtitle_entry(self, index, title):
+        self.progress.title = title
+
+    def _on_subtitle_entry_done(self, index):
+        # 영상마다 보내면 초당 수십 번이 되므로 진행률 간격(10Hz)으로 제한
+        self.progress.entry_finished(index)
+        now = time.monotonic()
+        if now - self._last_subtitle_emit >= self.progress.interval:
+            self._last_subtitle_emit = now
+            self._emit_progress()
+
+    @staticmethod
+    def _failed_message(failed):
+        if not failed:
+            return ""
+        return f"\n실패한 영상 {len(failed)}개:\n" + "\n".join(
+            f"{index}. {title}" for index, title, _ in failed[:10])
+
+    # -------------------------------------
+    # 다운로드 취소
+    # -------------------------------------
+    def cancel(self):
+        """다운로드 중단"""
+        self._is_canceled = True
+        self._cancel_event.set()
+        self._resume_event.set()
+
+    # -------------------------------------
+    # 일시정지 / 재개
+    # -------------------------------------
+    def pause(self):
+        self._resume_event.clear()
+
+    def resume(self):
+        self._resume_event.set()
+
+    def is_paused(self):
+        return not self._resume_event.is_set()
+
+    def _get_ffmpeg_path(self):
+        """ffmpeg 경로 (options["ffmpeg_location"] 우선)"""
+        return self.options.get("ffmpeg_location") or default_ffmpeg_location()
+
+    @staticmethod
+    def _extract_lang_code(label):
+        """'한국어(ko)' → 'ko'"""
+        if "(" in label and ")" in label:
+            return label[label.find("(") + 1: label.find(")")]
+        return label
\ No newline at end of file
@@ -0,0 +1,194 @@
+import threading
+import time
+
+# 같은 해상도에서 크기가 비슷하면(이 비율 이내) 호환성이 좋은 코덱을 고른다.
+SIZE_TOLERANCE = 0.05
+# 코덱 호환성 순위 (높을수록 우선, 크기가 비슷할 때만)
+CODEC_RANK = {"avc1": 3, "vp9": 2, "av1": 1, "hevc": 0}
+# mp4에 담을 수 있는 영상 코덱 (m4a 음성과 병합), 그 외(vp9)는 webm 음성 우선
+MP4_CODECS = ("avc1", "av1", "hevc")
+# 이 값 이상이면 고프레임 (prefer_fps일 때만 우대)
+HIGH_FPS = 50
+# 이 해상도 미만은 mp4(영상) + m4a(음성)만 고른다. (품질 프리셋과 같은 "mp4(4k이하) 또는 webm(4k)" 저장 형식)
+WEBM_MIN_HEIGHT = 2160
+
+
+def codec_name(vcodec):
+    """'avc1.640028' -> 'avc1', 'vp09.00.40.08' -> 'vp9', 'av01.0.08M.08' -> 'av1'"""
+    name = (vcodec or "").split(".")[0].lower()
+    return {"vp09": "vp9", "vp8": "vp8", "av01": "av1", "hev1": "hevc", "hvc1": "hevc", "h264": "avc1"}.get(name, name)
+
+
+def format_size(f, duration=None):
+    """포맷 하나의 크기 (filesize / filesize_approx, 없으면 tbr × 길이), 모르면 None"""
+    size = f.get("filesize") or f.get("filesize_approx")
+    if size:
+        return int(size)
+    tbr = f.get("tbr") or (f.get("vbr") or 0) + (f.get("abr") or 0)
+    if tbr and duration:
+        return int(tbr * 1000 / 8 * duration)
+    return None
+
+
+def format_table(formats, duration=None):
+    """
+    yt-dlp 포맷 목록을 선택에 필요한 값만 남긴 표로 (캐시된 info나 YoutubeDL 포맷 선택 ctx에서)
+    행: {id, kind(video, audio, av), height, fps, codec, ext, size}
+    """
+    table = []
+    for f in formats or []:
+        vcodec, acodec = f.get("vcodec"), f.get("acodec")
+        if vcodec == "none" and acodec in (None, "none") or f.get("ext") == "mhtml":
+            continue  # 스토리보드 등
+        if vcodec == "none":
+            kind = "audio"
+        elif acodec == "none":
+            kind = "video"
+        else:
+            kind = "av"
+        table.append({
+            "id": f.get("format_id"),
+            "kind": kind,
+            "height": f.get("height"),
+            "fps": f.get("fps"),
+            "codec": codec_name(vcodec) if kind != "audio" else codec_name(acodec),
+            "ext": f.get("ext"),
+            "size": format_size(f, duration),
+        })
+    return table
+
+
+def _pick_audio(audios, video_codec):
+    """영상 코덱에 맞는 음성 (mp4 계열이면 m4a, vp9면 webm/opus 우선), 같은 종류 중 가장 큰 것"""
+    wanted = "m4a" if video_codec in MP4_CODECS else "webm"
+    return max(audios, key=lambda a: (a["ext"] == wanted, a["size"] or 0), default=None)
+
+
+def candidates(table):
+    """받을 수 있는 조합 [{format_id, height, fps, codec, size, mp4}] (영상 + 음성 병합 또는 음성 포함 포맷)"""
+    audios = [f for f in table if f["kind"] == "audio"]
+    result = []
+    for f in table:
+        if f["kind"] == "audio" or not f["height"]:
+            continue
+        audio = _pick_audio(audios, f["codec"]) if f["kind"] == "video" else None
+        if f["kind"] == "video" and audio is None:
+            continue
+        size = f["size"]
+        if audio is not None:
+            size = size + audio["size"] if size and audio["size"] else None
+        result.append({
+            "format_id": f"{f['id']}+{audio['id']}" if audio else f["id"],
+            "height": f["height"],
+            "fps": f["fps"] or 0,
+            "codec": f["codec"],
+            "size": size,
+            "mp4": f["ext"] == "mp4" and (audio is None or audio["ext"] == "m4a"),
+        })
+    return result
+
+
+def choose(table, max_height=None, max_bytes=None, prefer_fps=False):
+    """
+    표에서 목표에 맞는 조합 하나 (없으면 None)
+    - max_height 이하 중 가장 높은 해상도, 같은 해상도면 가장 작은 파일 (비슷하면 호환성 좋은 코덱)
+      prefer_fps가 아니면 60fps도 30fps와 같은 화질로 본다. (크기가 작은 쪽)
+    - max_bytes가 있으면 그 안에 들어가는 것 중에서, 하나도 없으면 가장 작은 것
+    - WEBM_MIN_HEIGHT 미만은 mp4 + m4a 조합만 (없으면 None, 형식 문자열 프리셋으로 고름)
+    """
+    found = [c for c in candidates(table) if c["mp4"] or c["height"] >= WEBM_MIN_HEIGHT]
+    if not found:
+        return None
+    if max_height:
+        under = [c for c in found if c["height"] <= max_height]
+        found = under or [min(found, key=lambda c: c["height"])]
+    if max_bytes:
+        fitting = [c for c in found if c["size"] and c["size"] <= max_bytes]
+        if not fitting:
+            sized = [c for c in found if c["size"]]
+            return min(sized, key=lambda c: c["size"]) if sized else None
+        found = fitting
+
+    def quality(c):
+        return c["height"], prefer_fps and c["fps"] >= HIGH_FPS
+
+    top = max(quality(c) for c in found)
+    best = [c for c in found if quality(c) == top]
+    smallest = min((c["size"] for c in best if c["size"]), default=None)
+    if smallest:
+        # 가장 작은 것과 비슷한 크기 중 호환성 좋은 코덱
+        best = [c for c in best if c["size"] and c["size"] <= smallest * (1 + SIZE_TOLERANCE)]
+    return max(best, key=lambda c: (CODEC_RANK.get(c["codec"], -1), -(c["size"] or 0)))
+
+
+class FormatBudget:
+    """
+    작업 하나의 포맷 목표 (여러 YoutubeDL / 플레이리스트 워커가 함께 씀)
+    - max_height: 화질 상한, size_budget: 영상 하나의 최대 크기 (바이트)
+    - time_budget: 작업 전체를 이 시간(초) 안에 끝내도록 link_speed(바이트/초)로 남은 영상에 크기를 나눈다.
+    """
+
+    def __init__(self, max_height=None, size_budget=0, time_budget=0, link_speed=None, prefer_fps=False,
+                 entries=1, clock=time.monotonic):
+        self.max_height = max_height
+        self.size_budget = size_budget or 0
+        self.time_budget = time_budget or 0
+        self.link_speed = link_speed
+        self.prefer_fps = prefer_fps
+        self.entries = max(1, entries or 1)
+        self._clock = clock
+        self._start = clock()
+        self._lock = threading.Lock()
+        self.selected = 0
+        self.bytes = 0
+
+    def set_entries(self, entries):
+        """플레이리스트 영상 수 (목록을 받은 뒤, 모르면 그대로)"""
+        if entries:
+            self.entries = max(1, entries)
+
+    def entry_bytes(self):
+        """다음 영상 하나에 쓸 수 있는 크기 (None = 제한 없음)"""
+        limits = []
+        if self.size_budget:
+            limits.append(self.size_budget)
+        if self.time_budget and self.link_speed:
+            with self._lock:
+                remaining = max(0.0, self.time_budget - (self._clock() - self._start))
+                left = max(1, self.entries - self.selected)
+            limits.append(int(self.link_speed * remaining / left))
+        return min(limits) if limits else None
+
+    def choose(self, table):
+        choice = choose(table, self.max_height, self.entry_bytes(), self.prefer_fps)
+        if choice is not None:
+            with self._lock:
+                self.selected += 1
+                self.bytes += choice["size"] or 0
+        return choice
+
+
+class BudgetFormatSelector:
+    """
+    YoutubeDL.format_selector 자리에 넣는 선택기 (yt-dlp가 포맷 선택 ctx로 호출)
+    표에서 고른 조합(format_id 'v+a')을 yt-dlp 선택기로 풀어 병합 정보까지 만든다.
+    높이 정보가 없는 포맷 목록(일부 사이트)은 fallback 형식 문자열로 고른다.
+    duration: 선택 중인 영상의 길이 (크기가 없는 포맷(HLS 등)은 tbr × 길이로 추정,
+    PipelinedYoutubeDL.process_video_result가 영상마다 넣는다)
+    """
+
+    def __init__(self, ydl, budget: FormatBudget, fallback):
+        self.ydl = ydl
+        self.budget = budget
+        self.fallback = fallback
+        self.duration = None
+
+    def __call__(self, ctx):
+        choice = self.budget.choose(format_table(ctx["formats"], self.duration))
+        spec = choice["format_id"] if choice is not None else self.fallback
+        return self.ydl.build_format_selector(spec)(ctx)
+
+
+def install_selector(ydl, budget: FormatBudget, fallback):
+    """ydl(세션 풀에서 받은 것 포함)의 포맷 선택을 budget 기준으로 (params['format']은 fallback 그대로)"""
+    ydl.format_selector = BudgetFormatSelector(ydl, budget, fallback)
@@ -0,0 +1,257 @@
+import heapq
+import itertools
+from core import journal as job_journal
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"
+DONE = "done"
+FAILED = "failed"
+CANCELED = "canceled"
+
+# 작업 기록에 남기는 종료 상태
+_JOURNAL_STATES = {
+    DONE: job_journal.JOB_DONE,
+    FAILED: job_journal.JOB_FAILED,
+    CANCELED: job_journal.JOB_CANCELED,
+}
+
+STATE_LABELS = {
+    QUEUED: "대기 중",
+    RUNNING: "다운로드 중",
+    PAUSED: "일시정지",
+    DONE: "완료",
+    FAILED: "실패",
+    CANCELED: "취소됨",
+}
+
+DEFAULT_MAX_CONCURRENT = 2
+
+
+class DownloadJob:
+    """다운로드 작업 하나의 상태"""
+
+    def __init__(self, job_id: int, options: dict, priority: int = 0):
+        self.id = job_id
+        self.options = options
+        self.priority = priority
+        self.state = QUEUED
+        self.percent = 0.0
+        self.status_text = "대기 중..."
+        self.thread = None
+        self._heap_seq = None  # 큐에 들어간 최신 항목 (우선순위 변경 시 이전 항목 무시)
+
+    @property
+    def url(self):
+        return self.options.get("url", "")
+
+    def is_finished(self):
+        return self.state in (DONE, FAILED, CANCELED)
+
+    def to_dict(self):
+        """제어 API로 보내는 상태"""
+        return {
+            "id": self.id,
+            "url": self.url,
+            "state": self.state,
+            "percent": round(self.percent, 1),
+            "status": self.status_text,
+            "priority": self.priority,
+        }
+
+
+class JobScheduler:
+    """
+    여러 다운로드 작업을 우선순위 큐로 관리한다. (Qt 없음, 시그널 연결은 ui.job_manager.DownloadManager)
+    - 동시에 실행되는 작업 수를 max_concurrent로 제한하고, 끝나면 다음 작업을 바로 시작
+    - 작업별 일시정지 / 재개 / 취소 / 우선순위 변경
+    - 상태 변화는 _job_added(job_id) / _job_updated(job_id)로 알림 (하위 클래스에서 구현)
+    - 작업 실행은 _create_thread(job)가 만든 스레드에 맡긴다.
+      스레드는 start / pause / resume / cancel / wait(timeout_ms)를 제공하고,
+      진행 / 종료를 _on_progress / _on_finished / _on_error로 돌려준 뒤 _thread_exited로 알려야 한다.
+    - journal(JobJournal)이 있으면 작업을 기록해, 끝나지 않은 작업을 다음 실행 때 restore_unfinished()로 이어서 진행
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT, journal=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_concurrent = max_concurrent
+        self.journal = journal
+        # 프로그램 종료로 중단된 작업은 취소로 기록하지 않는다. (다음 실행 때 재개)
+        self._shutting_down = False
+        self.jobs = {}
+        self._queue = []
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        # 종료 알림 이후에도 스레드가 끝날 때까지 참조를 유지한다.
+        self._threads = set()
+
+    # -------------------------------------
+    # 작업 등록 / 설정
+    # -------------------------------------
+    def submit(self, options: dict, priority: int = 0) -> int:
+        """작업을 큐에 넣고 job_id를 반환 (priority가 클수록 먼저 실행)"""
+        if self.journal is not None and "journal_id" not in options:
+            options = {**options, "journal_id": self.journal.create_job(options)}
+        job = DownloadJob(next(self._ids), options, priority)
+        self.jobs[job.id] = job
+        self._push(job)
+        self._job_added(job.id)
+        self._schedule()
+        return job.id
+
+    def restore_unfinished(self):
+        """이전 실행에서 끝나지 않은 작업을 다시 큐에 넣는다. 복원한 작업 수 반환"""
+        if self.journal is None:
+            return 0
+        unfinished = self.journal.unfinished_jobs()
+        for journal_id, options in unfinished:
+            self.submit({**options, "journal_id": journal_id})
+        return len(unfinished)
+
+    def set_max_concurrent(self, count: int):
+        self.max_concurrent = max(1, count)
+        self._schedule()
+
+    def set_priority(self, job_id: int, priority: int):
+        job = self.jobs.get(job_id)
+        if job is None or job.state != QUEUED:
+            return
+        job.priority = priority
+        self._push(job)
+        self._job_updated(job_id)
+
+    # -------------------------------------
+    # 작업 제어
+    # -------------------------------------
+    def pause(self, job_id: int):
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in (QUEUED, RUNNING):
+            return
+        if job.thread is not None:
+            job.thread.pause()
+        job.state = PAUSED
+        self._job_updated(job_id)
+        # 일시정지한 작업은 동시 실행 슬롯을 차지하지 않는다.
+        self._schedule()
+
+    def resume(self, job_id: int):
+        """
+        큐로 돌려보낸다. 이미 시작한 작업도 동시 실행 수가 남아 있을 때만 이어서 진행
+        (일시정지 중 다른 작업이 슬롯을 가져갔으면 자리가 날 때까지 대기)
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.state != PAUSED:
+            return
+        job.state = QUEUED
+        if job.thread is not None:
+            job.status_text = "재개 대기 중..."
+        self._push(job)
+        self._job_updated(job_id)
+        self._schedule()
+
+    def cancel(self, job_id: int):
+        job = self.jobs.get(job_id)
+        if job is None or job.is_finished():
+            return
+        if job.thread is not None:
+            job.thread.cancel()
+        job.state = CANCELED
+        job.status_text = "다운로드가 취소되었습니다."
+        self._record(job)
+        self._job_updated(job_id)
+        self._schedule()
+
+    def cancel_all(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def shutdown(self, timeout_ms: int = 5000):
+        """프로그램 종료 시: 모든 작업 중단 후 스레드 종료 대기 (작업 기록에는 미완료로 남음)"""
+        self._shutting_down = True
+        self.cancel_all()
+        for thread in list(self._threads):
+            thread.wait(timeout_ms)
+
+    def running_count(self):
+        return sum(1 for job in self.jobs.values() if job.state == RUNNING)
+
+    # -------------------------------------
+    # 하위 클래스 구현 (알림 / 스레드 생성)
+    # -------------------------------------
+    def _job_added(self, job_id):
+        pass
+
+    def _job_updated(self, job_id):
+        pass
+
+    def _create_thread(self, job):
+        raise NotImplementedError
+
+    def _thread_exited(self, thread):
+        self._threads.discard(thread)
+
+    # -------------------------------------
+    # 내부 스케줄링
+    # -------------------------------------
+    def _record(self, job):
+        """작업 기록에 종료 상태 반영"""
+        journal_id = job.options.get("journal_id")
+        if self.journal is None or journal_id is None or self._shutting_down:
+            return
+        self.journal.set_job_state(journal_id, _JOURNAL_STATES[job.state])
+
+    def _push(self, job):
+        job._heap_seq = next(self._seq)
+        heapq.heappush(self._queue, (-job.priority, job._heap_seq, job.id))
+
+    def _schedule(self):
+        while self._queue and self.running_count() < self.max_concurrent:
+            _, seq, job_id = heapq.heappop(self._queue)
+            job = self.jobs.get(job_id)
+            if job is None or job.state != QUEUED or seq != job._heap_seq:
+                continue
+            self._start(job)
+
+    def _start(self, job):
+        if job.thread is not None:
+            # 일시정지했던 작업: 멈춘 스레드를 이어서 실행
+            job.state = RUNNING
+            job.thread.resume()
+            self._job_updated(job.id)
+            return
+        thread = self._create_thread(job)
+        self._threads.add(thread)
+
+        job.thread = thread
+        job.state = RUNNING
+        job.status_text = "다운로드 준비 중..."
+        self._job_updated(job.id)
+        thread.start()
+
+    def _on_progress(self, job_id, percent, text):
+        job = self.jobs[job_id]
+        if job.is_finished():
+            return
+        job.percent = percent
+        job.status_text = text
+        self._job_updated(job_id)
+
+    def _on_finished(self, job_id, msg):
+        self._finish(job_id, DONE, msg)
+
+    def _on_error(self, job_id, msg):
+        self._finish(job_id, FAILED, msg)
+
+    def _finish(self, job_id, state, msg):
+        job = self.jobs[job_id]
+        job.thread = None
+        if job.state != CANCELED:
+            job.state = state
+            job.status_text = msg
+            if state == DONE:
+                job.percent = 100
+            self._record(job)
+        self._job_updated(job_id)
+        self._schedule()
+
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_JOURNAL_PATH = os.path.join(os.getcwd(), "data", "journal.sqlite3")
+
+# 작업 상태
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELED = "canceled"
+
+# 플레이리스트 영상(entry) 상태
+PENDING = "pending"
+DOWNLOADING = "downloading"
+MERGED = "merged"
+DONE = "done"
+FAILED = "failed"
+
+# flat entry에서 재개에 필요한 필드만 저장
+_ENTRY_FIELDS = ("_type", "url", "ie_key", "id", "title")
+
+
+class JobJournal:
+    """
+    다운로드 작업 진행 기록 (SQLite, WAL)
+    - 작업: 옵션과 상태를 기록해 프로그램이 비정상 종료돼도 다음 실행 때 이어서 진행
+    - 플레이리스트 영상: pending / downloading / merged / done / failed 상태, 선택된 format_id, 파일 경로
+    - 목록을 끝까지 기록한 작업은 재개 시 목록 조회 없이 남은 영상만 바로 처리한다.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " options TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " playlist TEXT,"
+            " enumerated INTEGER NOT NULL DEFAULT 0,"
+            " created REAL NOT NULL,"
+            " updated REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " job_id TEXT NOT NULL,"
+            " idx INTEGER NOT NULL,"
+            " entry TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " format_id TEXT,"
+            " filepath TEXT,"
+            " error TEXT,"
+            " updated REAL NOT NULL,"
+            " PRIMARY KEY (job_id, idx));"
+            "CREATE INDEX IF NOT EXISTS idx_entries_state ON entries(job_id, state);"
+        )
+        self._conn.commit()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # -------------------------------------
+    # 작업
+    # -------------------------------------
+    def create_job(self, options: dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (job_id, options, state, created, updated) VALUES (?, ?, ?, ?, ?)",
+            (job_id, json.dumps(options, ensure_ascii=False), JOB_RUNNING, now, now),
+        )
+        return job_id
+
+    def set_job_state(self, job_id, state):
+        self._execute("UPDATE jobs SET state = ?, updated = ? WHERE job_id = ?", (state, time.time(), job_id))
+
+    def unfinished_jobs(self):
+        """이전 실행에서 끝나지 않은 작업 [(job_id, options)] (생성 순)"""
+        rows = self._query("SELECT job_id, options FROM jobs WHERE state = ? ORDER BY created", (JOB_RUNNING,))
+        return [(job_id, json.loads(options)) for job_id, options in rows]
+
+    def job(self, job_id):
+        return JournalJob(self, job_id)
+
+
+class JournalJob:
+    """작업 하나에 대한 기록 (download_playlist에 전달)"""
+
+    def __init__(self, journal: JobJournal, job_id: str):
+        self.journal = journal
+        self.job_id = job_id
+
+    # -------------------------------------
+    # 목록
+    # -------------------------------------
+    def is_enumerated(self):
+        rows = self.journal._query("SELECT enumerated FROM jobs WHERE job_id = ?", (self.job_id,))
+        return bool(rows and rows[0][0])
+
+    def playlist_info(self):
+        """기록해 둔 플레이리스트 정보 (entries 제외)"""
+        rows = self.journal._query("SELECT playlist FROM jobs WHERE job_id = ?", (self.job_id,))
+        return json.loads(rows[0][0]) if rows and rows[0][0] else None
+
+    def save_playlist_info(self, playlist: dict):
+        fields = {k: playlist.get(k) for k in ("_type", "id", "title", "playlist_count",
+                                                "webpage_url", "original_url", "extractor", "extractor_key")}
+        self.journal._execute("UPDATE jobs SET playlist = ? WHERE job_id = ?",
+                              (json.dumps(fields, ensure_ascii=False), self.job_id))
+
+    def iter_entries(self, entries):
+        """
+        처리할 영상만 (index, entry, 기록된 format_id)로 돌려준다.
+        - 목록을 끝까지 기록한 작업이면 entries를 순회하지 않고 기록에서 남은 영상만 꺼낸다.
+        - 아니면 entries를 순회하며 새 영상은 pending으로 기록하고 완료된 영상은 건너뛴다.
+        """
+        if self.is_enumerated():
+            rows = self.journal._query(
+                "SELECT idx, entry, format_id FROM entries WHERE job_id = ? AND state != ? ORDER BY idx",
+                (self.job_id, DONE),
+            )
+            for index, entry, format_id in rows:
+                yield index, json.loads(entry), format_id
+            return
+
+        known = {
+            index: (state, format_id)
+            for index, state, format_id in self.journal._query(
+                "SELECT idx, state, format_id FROM entries WHERE job_id = ?", (self.job_id,))
+        }
+        for index, entry in entries:
+            state, format_id = known.get(index, (None, None))
+            if state is None:
+                fields = {k: entry.get(k) for k in _ENTRY_FIELDS if entry.get(k) is not None}
+                self.journal._execute(
+                    "INSERT OR IGNORE INTO entries (job_id, idx, entry, state, updated) VALUES (?, ?, ?, ?, ?)",
+                    (self.job_id, index, json.dumps(fields, ensure_ascii=False), PENDING, time.time()),
+                )
+            if state == DONE:
+                continue
+            yield index, entry, format_id
+
+        self.journal._execute("UPDATE jobs SET enumerated = 1 WHERE job_id = ?", (self.job_id,))
+
+    # -------------------------------------
+    # 영상 상태
+    # -------------------------------------
+    def set_entry_state(self, index, state, format_id=None, filepath=None, error=None):
+        self.journal._execute(
+            "UPDATE entries SET state = ?, format_id = COALESCE(?, format_id),"
+            " filepath = COALESCE(?, filepath), error = ?, updated = ? WHERE job_id = ? AND idx = ?",
+            (state, format_id, filepath, error, time.time(), self.job_id, index),
+        )
+
+    def set_entry_format(self, index, format_id):
+        self.journal._execute(
+            "UPDATE entries SET format_id = ?, updated = ? WHERE job_id = ? AND idx = ?",
+            (format_id, time.time(), self.job_id, index),
+        )
+
+    def entry_counts(self):
+        return dict(self.journal._query(
+            "SELECT state, COUNT(*) FROM entries WHERE job_id = ? GROUP BY state", (self.job_id,)))
+
+
+_default_journal = None
+_default_journal_lock = threading.Lock()
+
+
+def get_job_journal() -> JobJournal:
+    """프로그램 전체에서 공유하는 기본 작업 기록"""
+    global _default_journal
+    with _default_journal_lock:
+        if _default_journal is None:
+            _default_journal = JobJournal()
+        return _default_journal
@@ -0,0 +1,83 @@
+import os
+
+# 화면에 표시할 품질 라벨 -> yt-dlp format (팝업과 CLI 공용)
+QUALITY_PRESETS = {
+    "4K (2160p)": "bestvideo[height<=2160]+bestaudio/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]",
+    "1440p (QHD)": "bestvideo[height<=1440][ext=mp4]+bestaudio[ext=m4a]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]",
+    "1080p (Full HD)": "bestvideo[height<=1080]+bestaudio[ext=m4a]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]",
+    "720p (HD)": "bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]",
+    "480p (SD)": "bestvideo[height<=480][ext=mp4]+bestaudio[ext=m4a]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]"
+}
+
+# 세로 해상도 -> 품질 라벨 (CLI의 --quality)
+QUALITY_HEIGHTS = {2160: "4K (2160p)", 1440: "1440p (QHD)", 1080: "1080p (Full HD)", 720: "720p (HD)", 480: "480p (SD)"}
+# 품질 라벨 -> 세로 해상도 상한 (포맷 선택의 max_height)
+QUALITY_LABEL_HEIGHTS = {label: height for height, label in QUALITY_HEIGHTS.items()}
+
+DEFAULT_CONTAINER = "mp4(4k이하) 또는 webm(4k)"
+# 오디오만 받을 때 저장 형식 -> 화면 표시 이름
+AUDIO_FORMATS = {"mp3": "MP3 (오디오)", "m4a": "M4A / AAC (오디오)", "opus": "Opus (오디오)"}
+# 저장 형식과 코덱이 같은 오디오 스트림을 먼저 고른다. (변환 없이 스트림 복사)
+AUDIO_PRESETS = {
+    "mp3": "bestaudio[acodec=mp3]/bestaudio/best",
+    "m4a": "bestaudio[ext=m4a]/bestaudio[acodec^=mp4a]/bestaudio/best",
+    "opus": "bestaudio[acodec=opus]/bestaudio/best",
+}
+# 변환할 때 비트레이트 (kbps)
+AUDIO_BITRATES = (128, 192, 256, 320)
+DEFAULT_AUDIO_BITRATE = 192
+DEFAULT_OUTPUT_PATH = os.path.join(os.getcwd(), "downloads")
+
+
+DEFAULT_QUALITY = "4K (2160p)"
+# 자막 저장 형식 (core.subtitles.SUBTITLE_FORMATS와 같음, yt_dlp 없이 쓰도록 따로 둔다)
+SUBTITLE_FORMAT_LABELS = {"srt": "SRT", "txt": "텍스트(대사만)", "vtt": "VTT(원본)"}
+# 디스크 사용 설정 (core.storage에서 사용, yt_dlp 없이 쓰도록 여기에 둔다)
+# 다운로드 / 병합 중인 파일을 두는 로컬 폴더 (끝난 파일만 저장 폴더로 옮긴다)
+DEFAULT_STAGING_PATH = os.path.join(os.getcwd(), "data", "staging")
+# fsync: none = 운영체제에 맡김, final = 옮긴 파일과 폴더를 디스크에 기록한 뒤 완료 처리
+FSYNC_POLICIES = ("none", "final")
+# 공간이 부족할 때: fail = 받기 전에 실패, wait = 공간이 생길 때까지 대기
+DISK_FULL_POLICIES = ("fail", "wait")
+
+
+def build_options(url, fmt=QUALITY_PRESETS[DEFAULT_QUALITY], subtitle_langs=None, subtitle_only=False,
+                  max_fragments=0, playlist_workers=3, output_path=DEFAULT_OUTPUT_PATH, subtitle_format="srt",
+                  rate_limit=0, bandwidth_weight=1, staging_path=None, io_buffer_size=0, preallocate=False,
+                  fsync="final", disk_full="fail", audio_format=None, audio_bitrate=DEFAULT_AUDIO_BITRATE,
+                  max_height=None, size_budget=0, time_budget=0, prefer_fps=False, smallest_format=False):
+    """
+    DownloadPopup.result_data와 같은 형식의 작업 옵션 (rate_limit: 작업 속도 상한 바이트/초, 0 = 무제한)
+    디스크: staging_path None = 기본 스테이징 폴더, "" = 저장 폴더에 바로 쓰기 / fsync: none, final / disk_full: fail, wait
+    오디오만: audio_format(mp3, m4a, opus)이 있으면 fmt 대신 그 형식의 오디오 프리셋, 변환 시 audio_bitrate kbps
+    포맷 선택 (core.formats): size_budget(영상 하나 바이트) / time_budget(작업 전체 초)이 있거나 smallest_format이면
+    영상마다 포맷 표에서 max_height 이하로 목표에 맞는 가장 작은 조합을 고른다. (fmt는 표로 고를 수 없는 사이트용)
+    셋 다 없으면 fmt(품질 프리셋 형식 문자열)로만 고른다.
+    """
+    subtitle_langs = list(subtitle_langs or [])
+    return {
+        "url": url,
+        "format": AUDIO_PRESETS[audio_format] if audio_format else fmt,
+        "container": DEFAULT_CONTAINER,
+        "subtitle_only": subtitle_only,
+        "subtitle": bool(subtitle_langs),
+        "max_fragments": max_fragments,
+        "playlist_workers": playlist_workers,
+        "output_path": output_path,
+        "subtitle_langs": subtitle_langs,
+        "subtitle_format": subtitle_format,
+        "rate_limit": rate_limit,
+        "bandwidth_weight": bandwidth_weight,
+        "staging_path": staging_path,
+        "io_buffer_size": io_buffer_size,
+        "preallocate": preallocate,
+        "fsync": fsync,
+        "disk_full": disk_full,
+        "audio_format": audio_format,
+        "audio_bitrate": audio_bitrate,
+        "max_height": max_height,
+        "size_budget": size_budget,
+        "time_budget": time_budget,
+        "prefer_fps": prefer_fps,
+        "smallest_format": smallest_format,
+    }
@@ -0,0 +1,288 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.analyzer import canonical_key, extract_info, filter_available_subtitles
+from core.archive import DownloadArchive, archive_key, satisfies
+from core.journal import DONE, DOWNLOADING, FAILED
+from core.telemetry import telemetry_span
+
+# 동시 영상 수 × 영상당 세그먼트 수의 전체 상한 (동시 HTTP 연결 수)
+DEFAULT_MAX_CONNECTIONS = 32
+# 영상 하나의 세그먼트 동시 다운로드 수 상한
+DEFAULT_MAX_FRAGMENTS = 32
+# 다른 작업자가 받는 중인 영상의 완료를 확인하는 간격 (초)
+CLAIM_POLL_INTERVAL = 1.0
+
+
+def iter_playlist_entries(info, cache=None):
+    """
+    플레이리스트 entries를 필요한 만큼만 꺼내는 제너레이터. (index, entry) 순서로 반환
+    - extract_info(process=False)의 entries는 페이지 단위로 지연 로딩되므로
+      전체 목록을 기다리지 않고 첫 영상부터 바로 처리할 수 있다.
+    - 끝까지 순회하면 가벼운 flat 목록을 캐시에 저장해 재시도 시 목록 조회를 건너뛴다.
+    """
+    entries = info.get("entries") or []
+    collect = cache is not None and not isinstance(entries, list)
+    collected = []
+
+    for index, entry in enumerate(entries, start=1):
+        if collect:
+            collected.append(entry)
+        if entry:
+            yield index, entry
+
+    if collect:
+        cache.put(canonical_key(info.get("original_url") or info.get("webpage_url")),
+                  {**info, "entries": collected})
+
+
+def resolve_entry(ydl, entry, cache=None):
+    """flat entry(url 참조)를 다운로드 직전에 전체 메타데이터(포맷/자막)로 해석한다."""
+    entry_type = entry.get("_type", "video")
+    if entry_type not in ("url", "url_transparent"):
+        return entry
+
+    info = extract_info(ydl, entry["url"], cache=cache)
+    if info and entry_type == "url_transparent":
+        # 임베드 페이지에서 온 정보(제목 등)를 우선 적용
+        exempted = {"_type", "url", "ie_key", "id", "extractor", "extractor_key"}
+        info = {**info, **{k: v for k, v in entry.items() if v is not None and k not in exempted}}
+    return info
+
+
+def playlist_extra_info(playlist, index):
+    """각 영상 info에 붙일 플레이리스트 필드 (outtmpl 등에서 사용)"""
+    return {
+        "playlist": playlist.get("title") or playlist.get("id"),
+        "playlist_id": playlist.get("id"),
+        "playlist_title": playlist.get("title"),
+        "playlist_count": playlist.get("playlist_count"),
+        "playlist_index": index,
+        "playlist_autonumber": index,
+    }
+
+
+def fragment_budget(workers, fragments, max_connections=DEFAULT_MAX_CONNECTIONS):
+    """동시 영상 수 × 영상당 세그먼트 수가 전체 연결 한도를 넘지 않도록 세그먼트 수를 줄인다."""
+    return max(1, min(fragments, max_connections // max(1, workers)))
+
+
+def _download_entry(ydl, playlist, index, entry, requested_langs, subtitle_only, cache, on_entry,
+                    format_id=None, telemetry=None):
+    """
+    영상 하나를 해석 후 다운로드한다. 다운로드한 info를 반환하고, 건너뛰었으면 None
+    - format_id: 이전 실행에서 받던 포맷. 같은 포맷을 우선 선택해 남아 있는 .part 파일을 이어받는다.
+    """
+    with telemetry_span(telemetry, "extract"):
+        info = resolve_entry(ydl, entry, cache=cache)
+    if not info:
+        return None
+
+    if on_entry:
+        on_entry(index, info.get("title") or entry.get("title") or "")
+
+    if requested_langs:
+        with telemetry_span(telemetry, "subtitle_filter"):
+            valid_langs = filter_available_subtitles(info, requested_langs)
+        ydl.params.update({
+            "writesubtitles": bool(valid_langs),
+            "subtitleslangs": valid_langs,
+        })
+        if subtitle_only and not valid_langs:
+            return None
+
+    extra_info = playlist_extra_info(playlist, index)
+    selector = ydl.params.get("format")
+    if not format_id or not isinstance(selector, str):
+        return ydl.process_ie_result(info, download=True, extra_info=extra_info)
+
+    # 포맷 선택기는 YoutubeDL 생성 시 만들어지므로 이 영상 동안만 교체 (워커별 YoutubeDL이라 안전)
+    default_selector = ydl.format_selector
+    ydl.format_selector = ydl.build_format_selector(f"{format_id}/{selector}")
+    try:
+        return ydl.process_ie_result(info, download=True, extra_info=extra_info)
+    finally:
+        ydl.format_selector = default_selector
+
+
+def _reuse_record(archive, info, output_dir, request):
+    """(기존 파일 경로 또는 None, 다시 받아야 할 기록의 created 또는 None)"""
+    record = archive.lookup(archive_key(info))
+    if record is None:
+        return None, None
+    if not satisfies(record, request):
+        return None, record["created"]
+    langs = request["subtitles"] if request else ()
+    try:
+        return DownloadArchive.materialize(record, output_dir or os.path.dirname(record["filepath"]), langs), None
+    except OSError:
+        return None, record["created"]
+
+
+def reuse_archived(archive, info, output_dir, request=None):
+    """
+    다운로드 기록에 있고 요구 사항(archive_request)에 맞는 영상이면 기존 파일을 output_dir에 놓고 그 경로를 반환
+    (없거나 맞지 않으면 None, 새로 받으면 ArchivePP가 기록을 바꾼다)
+    flat entry의 ie_key / id만으로 확인하므로 포맷 해석이나 네트워크 요청이 필요 없다.
+    """
+    return _reuse_record(archive, info, output_dir, request)[0]
+
+
+def reuse_or_claim(archive, info, output_dir, owner=None, is_canceled=None, poll=CLAIM_POLL_INTERVAL,
+                   request=None):
+    """
+    reuse_archived + 받는 중 표시 (owner가 있을 때만, 작업자 모드)
+    - 쓸 수 있는 기록이 있으면 기존 파일 경로, owner가 받아야 하면 표시한 뒤 None
+    - 다른 작업자가 받는 중이면 끝날 때까지 기다렸다가 그 파일을 쓴다. (그 작업자가 실패 / 종료하면 owner가 받음)
+    """
+    key = archive_key(info)
+    while True:
+        filepath, replacing = _reuse_record(archive, info, output_dir, request)
+        if filepath is not None or owner is None or key is None or archive.claim(key, owner, replacing=replacing):
+            return filepath
+        if is_canceled is not None and is_canceled():
+            return None
+        time.sleep(poll)
+
+
+def _merge_deferred(result):
+    """병합이 후처리 풀로 넘어가 아직 끝나지 않았는지"""
+    return any(d.get("__merge_deferred") for d in result.get("requested_downloads") or [])
+
+
+def _downloaded_path(result):
+    if not result:
+        return None
+    downloads = result.get("requested_downloads") or [{}]
+    return downloads[0].get("filepath") or result.get("filepath")
+
+
+def download_playlist(ydl, playlist, requested_langs=None, subtitle_only=False,
+                      cache=None, on_entry=None, is_canceled=None, workers=1, make_ydl=None,
+                      on_entry_done=None, journal=None, archive=None, output_dir=None, telemetry=None,
+                      claim_owner=None, archive_request=None):
+    """
+    플레이리스트를 스트리밍 방식으로 다운로드한다.
+    - 목록은 지연 순회, 각 영상의 포맷은 다운로드 직전에 해석, 끝난 영상의 info는 바로 버린다.
+      (메모리와 첫 바이트까지의 시간이 플레이리스트 길이와 무관하게 유지된다)
+    - 영상마다 실제 존재하는 자막만 요청한다. 자막만 모드에서 자막이 없는 영상은 건너뛴다.
+    - workers > 1 이면 make_ydl()로 만든 워커별 YoutubeDL로 여러 영상을 동시에 받는다.
+      (YoutubeDL은 스레드 간 공유할 수 없으므로 워커마다 하나씩 사용)
+    - 한 영상의 실패는 기록만 하고 나머지 영상은 계속 진행한다. (취소는 즉시 중단)
+    - on_entry(index, title): 각 영상 처리 시작 시 호출 (워커 스레드에서 호출될 수 있음)
+    - on_entry_done(index): 각 영상이 끝났을 때 호출 (성공/건너뜀/실패 모두)
+    - journal(JournalJob): 영상별 상태를 기록하고, 이전 실행에서 끝난 영상은 건너뛴다.
+      병합이 후처리 풀로 넘어간 영상은 풀에서 병합이 끝날 때 완료로 기록한다.
+    - archive(DownloadArchive): 이미 받은 영상은 해석 전에 건너뛰고 기존 파일을 output_dir에 하드링크/복사
+      archive_request(core.archive.archive_request)에 맞지 않는 기록은 다시 받는다.
+      claim_owner가 있으면 다른 작업자가 받는 중인 영상은 기다렸다가 그 파일을 쓴다. (reuse_or_claim)
+    - telemetry(JobTelemetry): 영상별 분석(extract) / 자막 확인 시간 기록
+    반환: (다운로드한 영상 수, 건너뛴 영상 수(이미 받은 영상 포함), 실패 목록[(index, title, 오류)])
+    """
+    canceled = is_canceled or (lambda: False)
+    counts = {"done": 0, "skipped": 0}
+    failed = []
+    lock = threading.Lock()
+
+    def record_failure(index, entry, error):
+        if journal is not None:
+            journal.set_entry_state(index, FAILED, error=str(error))
+        with lock:
+            failed.append((index, entry.get("title") or entry.get("url") or "", str(error)))
+        if on_entry_done:
+            on_entry_done(index)
+
+    def run_entry(entry_ydl, index, entry, format_id):
+        if archive is not None:
+            filepath = reuse_or_claim(archive, entry, output_dir, claim_owner, canceled, request=archive_request)
+            if filepath is not None:
+                if journal is not None:
+                    journal.set_entry_state(index, DONE, filepath=filepath)
+                with lock:
+                    counts["skipped"] += 1
+                if on_entry_done:
+                    on_entry_done(index)
+                return
+
+        if journal is not None:
+            journal.set_entry_state(index, DOWNLOADING)
+        try:
+            result = _download_entry(entry_ydl, playlist, index, entry,
+                                     requested_langs, subtitle_only, cache, on_entry, format_id, telemetry)
+        except Exception as e:
+            if claim_owner is not None and archive_key(entry) is not None:
+                archive.release(archive_key(entry), claim_owner)
+            # 취소된 영상은 downloading으로 남겨 다음 실행 때 .part부터 이어받는다.
+            if canceled():
+                raise
+            record_failure(index, entry, e)
+            return
+        if journal is not None and not (result and _merge_deferred(result)):
+            journal.set_entry_state(index, DONE, filepath=_downloaded_path(result))
+        with lock:
+            counts["skipped" if result is None else "done"] += 1
+        if on_entry_done:
+            on_entry_done(index)
+
+    entries = iter_playlist_entries(playlist, cache=cache)
+    if journal is not None:
+        entries = journal.iter_entries(entries)
+    else:
+        entries = ((index, entry, None) for index, entry in entries)
+
+    if workers <= 1 or make_ydl is None:
+        for index, entry, format_id in entries:
+            if canceled():
+                break
+            run_entry(ydl, index, entry, format_id)
+        return counts["done"], counts["skipped"], failed
+
+    # -------------------------------------
+    # 병렬 모드: 목록은 현재 스레드에서 지연 순회하고, 실행 중인 영상 수는 workers개로 제한
+    # -------------------------------------
+    local = threading.local()
+    worker_ydls = []
+    slots = threading.BoundedSemaphore(workers)
+
+    def worker(index, entry, format_id):
+        try:
+            if not hasattr(local, "ydl"):
+                # 워커용 YoutubeDL을 만들지 못하면 이 영상만 실패로 기록 (다음 영상에서 다시 시도)
+                try:
+                    entry_ydl = make_ydl()
+                except Exception as e:
+                    if canceled():
+                        raise
+                    record_failure(index, entry, e)
+                    return
+                local.ydl = entry_ydl
+                with lock:
+                    worker_ydls.append(entry_ydl)
+            run_entry(local.ydl, index, entry, format_id)
+        finally:
+            slots.release()
+
+    futures = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for index, entry, format_id in entries:
+                slots.acquire()
+                if canceled():
+                    slots.release()
+                    break
+                pending = []
+                for future in futures:
+                    if future.done():
+                        future.result()  # 취소 예외는 바로 전달
+                    else:
+                        pending.append(future)
+                futures = pending + [pool.submit(worker, index, entry, format_id)]
+        for future in futures:
+            future.result()
+    finally:
+        for worker_ydl in worker_ydls:
+            worker_ydl.close()
+
+    return counts["done"], counts["skipped"], failed
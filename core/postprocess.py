@@ -0,0 +1,273 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import yt_dlp
+from yt_dlp.postprocessor import FFmpegExtractAudioPP, FFmpegMergerPP, PostProcessor
+from yt_dlp.postprocessor.movefilesafterdownload import MoveFilesAfterDownloadPP
+
+from core.formats import BudgetFormatSelector
+from core.storage import AtomicMoveFilesPP
+
+# 진행률을 추적할 yt-dlp ffmpeg 후처리기 (pp_key 소문자) -> 화면 표시 이름
+FFMPEG_STAGES = {
+    "merger": "병합",
+    "subtitlesconvertor": "자막 변환",
+    "videoremuxer": "리먹스",
+    "videoconvertor": "변환",
+    "extractaudio": "오디오 변환",
+}
+
+
+def parse_out_time(text):
+    """ffmpeg -progress 출력에서 마지막 out_time_us(마이크로초)를 찾는다."""
+    for line in reversed(text.splitlines()):
+        key, _, value = line.partition("=")
+        if key in ("out_time_us", "out_time_ms") and value.strip().isdigit():
+            return int(value)
+    return None
+
+
+class FFmpegProgress:
+    """
+    yt-dlp가 실행하는 ffmpeg의 실제 진행률을 읽는다.
+    - postprocessor_args로 ffmpeg에 '-progress <파일>'을 붙이고
+    - postprocessor_hooks의 started/finished에 맞춰 감시 스레드가 그 파일의 out_time을 읽어
+      callback(stage, percent, info_dict)로 (출력 시각 / 영상 길이) 비율을 알려준다.
+    ffmpeg가 동시에 여러 개 돌면 파일이 섞이므로 YoutubeDL 인스턴스마다 하나씩 만든다.
+    """
+
+    def __init__(self, callback, interval=0.25):
+        self.callback = callback
+        self.interval = interval
+        fd, self.path = tempfile.mkstemp(prefix="ytd-ffmpeg-", suffix=".progress")
+        os.close(fd)
+        self._stop = None
+        self._thread = None
+
+    def postprocessor_args(self):
+        args = ["-progress", self.path, "-nostats"]
+        return {f"{stage}+ffmpeg_o": args for stage in FFMPEG_STAGES}
+
+    # -------------------------------------
+    # postprocessor_hooks
+    # -------------------------------------
+    def hook(self, d):
+        stage = FFMPEG_STAGES.get((d.get("postprocessor") or "").lower())
+        if stage is None:
+            return
+        info = d.get("info_dict") or {}
+        if d["status"] == "started":
+            self._start(stage, info)
+        elif d["status"] == "finished":
+            self._stop_watch()
+            self.callback(stage, 100.0, info)
+
+    def _start(self, stage, info):
+        self._stop_watch()
+        # 이전 단계의 출력이 남아 있지 않도록 비운다.
+        open(self.path, "w").close()
+        self.callback(stage, 0.0, info)
+
+        duration = info.get("duration")
+        if not duration:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._watch, args=(stage, info, duration, self._stop), daemon=True)
+        self._thread.start()
+
+    def _watch(self, stage, info, duration, stop):
+        offset = 0
+        last = None
+        while not stop.wait(self.interval):
+            try:
+                with open(self.path, encoding="utf-8", errors="ignore") as f:
+                    if os.fstat(f.fileno()).st_size < offset:
+                        offset = 0  # ffmpeg가 새로 실행되며 파일을 다시 씀
+                    f.seek(offset)
+                    chunk = f.read()
+                    offset = f.tell()
+            except OSError:
+                continue
+            out_time = parse_out_time(chunk)
+            if out_time is None or out_time == last:
+                continue
+            last = out_time
+            self.callback(stage, min(out_time / (duration * 1e6) * 100, 99.9), info)
+
+    def _stop_watch(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self._stop_watch()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class MergePool:
+    """
+    병합이 필요한 영상의 후처리(ffmpeg 병합 + 이후 후처리기)를 다운로드 스레드와 분리해 실행하는 풀
+    - defer_all이면 병합이 없는 영상의 후처리도 넘긴다. (오디오만 모드의 오디오 변환)
+    - 기본 크기는 CPU 코어 수 (스레드마다 ffmpeg 프로세스를 하나씩 실행)
+    - 스레드마다 make_ydl()로 만든 별도 YoutubeDL을 쓴다. (ffmpeg 진행률 파일 / 후처리기 설정이 겹치지 않게)
+    - 한 영상의 병합 실패는 failed 목록에 기록만 하고 나머지는 계속 진행
+    - on_done(info, error): 영상 하나의 후처리가 끝날 때 호출 (성공 시 error는 None, 풀 스레드에서 호출)
+    """
+
+    def __init__(self, make_ydl, workers=None, on_done=None, defer_all=False):
+        self.make_ydl = make_ydl
+        self.on_done = on_done
+        self.defer_all = defer_all
+        self.failed = []
+        self._pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._ydls = []
+        self._futures = []
+
+    def submit(self, filename, info, files_to_move=None):
+        future = self._pool.submit(self._post_process, filename, info, files_to_move)
+        with self._lock:
+            self._futures = [f for f in self._futures if not f.done()] + [future]
+
+    def _post_process(self, filename, info, files_to_move):
+        if not hasattr(self._local, "ydl"):
+            self._local.ydl = self.make_ydl()
+            with self._lock:
+                self._ydls.append(self._local.ydl)
+        ydl = self._local.ydl
+
+        # 다운로드 쪽 YoutubeDL에 묶인 병합기는 이 스레드의 YoutubeDL 것으로 교체
+        # 나머지(fixup 등 영상별 후처리기)도 이 스레드의 YoutubeDL에 다시 묶는다.
+        # (다운로드 쪽 세션은 이미 풀로 돌아가 비워졌거나 다른 작업의 옵션으로 바뀌었을 수 있다)
+        others = [pp for pp in info.get("__postprocessors") or [] if not isinstance(pp, FFmpegMergerPP)]
+        for pp in others:
+            pp._progress_hooks = []
+            pp.set_downloader(ydl)
+        info["__postprocessors"] = [FFmpegMergerPP(ydl), *others] if info.get("__files_to_merge") else others
+        try:
+            info = yt_dlp.YoutubeDL.post_process(ydl, filename, info, files_to_move)
+        except Exception as e:
+            with self._lock:
+                self.failed.append((info.get("playlist_index"), info.get("title") or filename, str(e)))
+            if self.on_done:
+                self.on_done(info, str(e))
+        else:
+            if self.on_done:
+                self.on_done(info, None)
+
+    def wait(self):
+        """제출된 병합이 모두 끝날 때까지 대기"""
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            if not future.cancelled():
+                future.result()
+
+    def shutdown(self, cancel=False):
+        self._pool.shutdown(wait=True, cancel_futures=cancel)
+        for ydl in self._ydls:
+            ydl.close()
+
+
+class PipelinedYoutubeDL(yt_dlp.YoutubeDL):
+    """
+    병합이 필요한 영상은 병합을 merge_pool로 넘기고 곧바로 다음 영상 다운로드로 넘어가는 YoutubeDL
+    (다운로드와 병합이 겹쳐서 진행된다)
+    storage(JobStorage)가 있으면 끝난 파일을 스테이징 폴더에서 저장 폴더로 원자적으로 옮긴다.
+    """
+
+    def __init__(self, params=None, merge_pool=None, storage=None, **kwargs):
+        super().__init__(params, **kwargs)
+        self.merge_pool = merge_pool
+        self.storage = storage
+
+    def process_video_result(self, info_dict, download=True):
+        # 포맷 표 선택기는 yt-dlp가 포맷 목록만 넘기므로 영상 길이를 따로 알려 준다. (크기 없는 포맷의 추정용)
+        if isinstance(self.format_selector, BudgetFormatSelector):
+            self.format_selector.duration = info_dict.get("duration")
+        return super().process_video_result(info_dict, download)
+
+    def run_pp(self, pp, infodict):
+        if self.storage is not None and type(pp) is MoveFilesAfterDownloadPP:
+            pp = AtomicMoveFilesPP(self.storage, self, pp._downloaded)
+        return super().run_pp(pp, infodict)
+
+    def post_process(self, filename, info, files_to_move=None):
+        if self.merge_pool is None or not (info.get("__files_to_merge") or self.merge_pool.defer_all):
+            return super().post_process(filename, info, files_to_move)
+        info["filepath"] = filename
+        info["__merge_deferred"] = True
+        # 다운로드 스레드가 이후 info를 계속 수정하므로 복사본을 넘긴다.
+        self.merge_pool.submit(filename, dict(info), files_to_move)
+        return info
+
+
+def audio_codec_name(acodec):
+    """포맷 정보의 acodec('mp4a.40.2', 'opus' 등)을 ffprobe가 알려 주는 코덱 이름으로. 모르면 None"""
+    if not acodec or acodec == "none":
+        return None
+    name = acodec.split(".")[0].lower()
+    if name == "mp4a":
+        return "aac"
+    return name if name in ("aac", "mp3", "opus", "vorbis", "flac", "alac") else None
+
+
+class AudioConvertPP(FFmpegExtractAudioPP):
+    """
+    오디오만 모드의 변환 (post_process, 플레이리스트는 MergePool 스레드에서 실행)
+    - 코덱이 저장 형식과 같으면 스트림 복사만 하고, 확장자도 같으면 ffmpeg를 실행하지 않는다. (FFmpegExtractAudioPP)
+    - 받은 포맷의 acodec을 알면 ffprobe를 실행하지 않는다.
+    """
+
+    def __init__(self, downloader=None, preferredcodec=None, preferredquality=None):
+        super().__init__(downloader, preferredcodec, preferredquality)
+        self._known_codec = None
+
+    @classmethod
+    def pp_key(cls):
+        # ffmpeg 인자(-progress) / 진행률 단계 이름을 FFmpegExtractAudioPP와 같게
+        return "ExtractAudio"
+
+    def run(self, information):
+        self._known_codec = audio_codec_name(information.get("acodec"))
+        try:
+            return super().run(information)
+        finally:
+            self._known_codec = None
+
+    def get_audio_codec(self, path):
+        return self._known_codec or super().get_audio_codec(path)
+
+
+class JournalFormatPP(PostProcessor):
+    """다운로드 직전(before_dl)에 선택된 format_id를 기록한다. (재개 시 같은 포맷의 .part를 이어받기 위해)"""
+
+    def __init__(self, journal_job, downloader=None):
+        super().__init__(downloader)
+        self.journal_job = journal_job
+
+    def run(self, info):
+        index = info.get("playlist_index")
+        if index is not None and info.get("format_id"):
+            self.journal_job.set_entry_format(index, info["format_id"])
+        return [], info
+
+
+class TelemetryPP(PostProcessor):
+    """다운로드 직전(before_dl)에 실제로 쓸 세그먼트 동시 다운로드 수를 기록 (자동 조절 후처리기 다음에 추가)"""
+
+    def __init__(self, telemetry, downloader=None):
+        super().__init__(downloader)
+        self.telemetry = telemetry
+
+    def run(self, info):
+        self.telemetry.fragment_concurrency(self._downloader.params.get("concurrent_fragment_downloads"))
+        return [], info
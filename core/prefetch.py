@@ -0,0 +1,170 @@
+import functools
+import threading
+from collections import OrderedDict
+
+from core.analyzer import analyze_url_is_playlist, canonical_key, extract_info
+from core.formats import format_table
+
+# 마지막 이동 후 이 시간(초) 동안 머물러야 추출 시작 (빠르게 넘겨 보는 페이지는 건너뜀)
+DEFAULT_DELAY = 0.8
+# 메모리에 보관할 요약 수
+MAX_SUMMARIES = 32
+
+
+def _format_size(f):
+    if not f:
+        return None
+    return f.get("filesize") or f.get("filesize_approx")
+
+
+def summarize_info(info):
+    """
+    팝업에 보여줄 요약 (추출한 원본 info에서 계산, 네트워크 없음)
+    - heights: {세로 해상도: 예상 크기(바이트, 영상+음성) 또는 None}
+    - formats: 포맷 선택용 표 (core.formats.format_table, 팝업에서 목표별 예상 크기 계산)
+    - subtitles: [(언어 코드, 표시 이름)] (자동 생성 자막 제외)
+    """
+    formats = info.get("formats") or []
+    audio = [f for f in formats if f.get("vcodec") == "none" and f.get("acodec") not in (None, "none")]
+    # 프리셋이 m4a 음성을 우선 고르므로 크기 계산도 같게
+    best_audio = max(audio, key=lambda f: (f.get("ext") == "m4a", f.get("tbr") or 0), default=None)
+    audio_size = _format_size(best_audio) or 0
+
+    heights = {}
+    for f in formats:
+        height = f.get("height")
+        if not height or f.get("vcodec") == "none":
+            continue
+        size = _format_size(f)
+        if size and f.get("acodec") == "none":
+            size += audio_size
+        heights[height] = max(heights.get(height) or 0, size or 0) or None
+
+    subtitles = []
+    for code, tracks in (info.get("subtitles") or {}).items():
+        if code == "live_chat":
+            continue
+        name = next((t.get("name") for t in tracks or [] if t.get("name")), code)
+        subtitles.append((code, name))
+
+    return {
+        "title": info.get("title"),
+        "playlist": info.get("_type") in ("playlist", "multi_video"),
+        "count": info.get("playlist_count"),
+        "heights": heights,
+        "formats": format_table(formats, info.get("duration")),
+        "subtitles": subtitles,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _cancellable_ydl_class():
+    """다음 네트워크 요청 때 취소를 확인하는 YoutubeDL (yt_dlp는 처음 쓸 때 import)"""
+    import yt_dlp
+    from yt_dlp.utils import DownloadCancelled
+
+    class CancellableYoutubeDL(yt_dlp.YoutubeDL):
+        def __init__(self, params, canceled):
+            super().__init__(params)
+            self.canceled = canceled
+
+        def urlopen(self, req):
+            if self.canceled.is_set():
+                raise DownloadCancelled("미리 분석 취소됨")
+            return super().urlopen(req)
+
+    return CancellableYoutubeDL
+
+
+class Prefetcher:
+    """
+    보고 있는 영상 / 플레이리스트 페이지의 메타데이터를 다운로드 버튼을 누르기 전에 추출한다.
+    - request(url): delay초 동안 다른 주소로 이동하지 않으면 백그라운드 스레드에서 추출 (디바운스)
+    - 다른 주소로 이동하면 대기 중인 요청은 취소하고, 진행 중인 추출은 다음 네트워크 요청에서 중단
+    - 추출 결과는 MetadataCache에 저장되어 다운로드 작업이 다시 추출하지 않는다. (단일 영상)
+    - 요약(summarize_info)은 메모리에 보관하고 on_ready(key)로 알린다. (prefetch 스레드에서 호출)
+    """
+
+    def __init__(self, cache=None, delay=DEFAULT_DELAY, on_ready=None, ydl_opts=None):
+        self.cache = cache
+        self.delay = delay
+        self.on_ready = on_ready
+        self.ydl_opts = ydl_opts or {}
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+        self._timer = None
+        self._canceled = None
+        self._key = None
+
+    def request(self, url, delay=None):
+        """url 분석 예약 (영상 / 플레이리스트 주소가 아니거나 이미 분석했으면 무시)"""
+        key = canonical_key(url)
+        if key is None or key.startswith("url:"):
+            self.cancel()
+            return
+        with self._lock:
+            if key in self._summaries or key == self._key:
+                return
+        self.cancel()
+
+        canceled = threading.Event()
+        timer = threading.Timer(self.delay if delay is None else delay, self._run, args=(url, key, canceled))
+        timer.daemon = True
+        with self._lock:
+            self._timer, self._canceled, self._key = timer, canceled, key
+        timer.start()
+
+    def summary(self, url):
+        """분석이 끝난 url의 요약, 아직이면 None"""
+        key = canonical_key(url)
+        with self._lock:
+            return self._summaries.get(key)
+
+    def is_pending(self, url):
+        with self._lock:
+            return self._key is not None and self._key == canonical_key(url)
+
+    def cancel(self):
+        """대기 중 / 진행 중인 분석 취소"""
+        with self._lock:
+            timer, canceled = self._timer, self._canceled
+            self._timer = self._canceled = self._key = None
+        if timer is not None:
+            timer.cancel()
+            canceled.set()
+
+    def shutdown(self):
+        self.cancel()
+
+    def _run(self, url, key, canceled):
+        try:
+            from core.cache import get_metadata_cache
+
+            cache = self.cache if self.cache is not None else get_metadata_cache()
+            params = {
+                "quiet": True,
+                "no_warnings": True,
+                "skip_download": True,
+                "noplaylist": not analyze_url_is_playlist(url),
+                **self.ydl_opts,
+            }
+            with _cancellable_ydl_class()(params, canceled) as ydl:
+                info = extract_info(ydl, url, cache=cache)
+            if not info or canceled.is_set():
+                return
+            summary = summarize_info(info)
+        except Exception:
+            # 미리 분석은 실패해도 다운로드 시 다시 추출하므로 무시 (취소 포함)
+            return
+        finally:
+            with self._lock:
+                if self._canceled is canceled:
+                    self._timer = self._canceled = self._key = None
+
+        with self._lock:
+            self._summaries[key] = summary
+            self._summaries.move_to_end(key)
+            while len(self._summaries) > MAX_SUMMARIES:
+                self._summaries.popitem(last=False)
+        if self.on_ready is not None:
+            self.on_ready(key)
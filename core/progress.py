@@ -0,0 +1,145 @@
+import threading
+import time
+
+# UI로 진행률을 보내는 최소 간격 (초) — 10Hz
+DEFAULT_EMIT_INTERVAL = 0.1
+
+
+def format_bytes(num):
+    if not num:
+        return "0B"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if num < 1024:
+            return f"{num:.1f}{unit}" if unit != "B" else f"{int(num)}B"
+        num /= 1024
+    return f"{num:.1f}TiB"
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+class ProgressTracker:
+    """
+    yt_dlp progress_hook 정보를 모아 작업 전체의 진행률 / 속도 / ETA를 계산한다.
+    - 문자열(_percent_str)이 아니라 downloaded_bytes / total_bytes(_estimate)로 계산
+    - 파일(영상/오디오 스트림, 세그먼트 묶음)별 최신 값만 유지하고, 플레이리스트는 영상 단위로 합산
+    - update()는 가볍게 상태만 갱신하고, UI로 보낼 시점(간격 경과 또는 파일 완료)일 때만 True 반환
+    여러 다운로드 스레드(세그먼트, 병렬 워커)에서 동시에 호출될 수 있다.
+    """
+
+    def __init__(self, interval=DEFAULT_EMIT_INTERVAL, clock=time.monotonic):
+        self.interval = interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_emit = float("-inf")
+
+        self.total_entries = 1
+        self.finished_entries = 0
+        self._finished_bytes = 0
+        # entry(플레이리스트 순번, 단일 영상은 None) -> {filename: [downloaded, total, speed]}
+        self._active = {}
+        # entry -> 완료된 파일 바이트 합
+        self._entry_done_bytes = {}
+
+        self.title = ""
+        self.kind = "영상"
+
+    # -------------------------------------
+    # 상태 갱신
+    # -------------------------------------
+    def set_total_entries(self, count, finished=0):
+        """finished: 이전 실행에서 이미 끝난 영상 수 (작업 재개 시)"""
+        with self._lock:
+            self.total_entries = count or None
+            self.finished_entries = finished
+
+    def update(self, d) -> bool:
+        """progress_hook의 d를 반영한다. UI로 보낼 차례면 True"""
+        status = d.get("status")
+        info = d.get("info_dict") or {}
+        entry = info.get("playlist_index")
+        filename = d.get("tmpfilename") or d.get("filename")
+        force = False
+
+        with self._lock:
+            files = self._active.setdefault(entry, {})
+            if status == "downloading":
+                total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
+                files[filename] = [d.get("downloaded_bytes") or 0, total, d.get("speed") or 0]
+            elif status == "finished":
+                last = files.pop(filename, None) or files.pop(d.get("filename"), None)
+                size = d.get("total_bytes") or d.get("downloaded_bytes") or (last[0] if last else 0)
+                self._entry_done_bytes[entry] = self._entry_done_bytes.get(entry, 0) + size
+                force = True
+
+            if status in ("downloading", "finished"):
+                self.kind = "자막" if info.get("ext") in ("vtt", "srt", "ass") else "영상"
+                self.title = info.get("title") or self.title
+
+            now = self._clock()
+            if force or now - self._last_emit >= self.interval:
+                self._last_emit = now
+                return True
+        return False
+
+    def entry_finished(self, entry):
+        """플레이리스트 영상 하나가 끝났을 때 (성공/건너뜀/실패 모두)"""
+        with self._lock:
+            self._active.pop(entry, None)
+            self._finished_bytes += self._entry_done_bytes.pop(entry, 0)
+            self.finished_entries += 1
+            self._last_emit = self._clock()
+
+    # -------------------------------------
+    # 계산
+    # -------------------------------------
+    def _entry_fraction(self, entry):
+        done = self._entry_done_bytes.get(entry, 0)
+        files = self._active.get(entry, {})
+        downloaded = done + sum(f[0] for f in files.values())
+        total = done + sum(max(f[1], f[0]) for f in files.values())
+        return downloaded / total if total else 0.0, total - downloaded
+
+    def snapshot(self):
+        """(전체 진행률 %, 속도 B/s, 남은 시간 초 또는 None)"""
+        with self._lock:
+            fractions = []
+            remaining = 0
+            for entry in self._active:
+                fraction, left = self._entry_fraction(entry)
+                fractions.append(fraction)
+                remaining += left
+            speed = sum(f[2] for files in self._active.values() for f in files.values())
+
+            if self.total_entries:
+                percent = (self.finished_entries + sum(fractions)) / self.total_entries * 100
+                # 아직 시작 안 한 영상은 지금까지 완료한 영상의 평균 크기로 추정
+                not_started = max(0, self.total_entries - self.finished_entries - len(fractions))
+                if not_started and self.finished_entries:
+                    remaining += not_started * self._finished_bytes / self.finished_entries
+            else:
+                percent = sum(fractions) / len(fractions) * 100 if fractions else 0.0
+
+        eta = remaining / speed if speed else None
+        return min(percent, 100.0), speed, eta
+
+    def status_text(self, max_len=50):
+        """진행률 창에 표시할 문구"""
+        percent, speed, eta = self.snapshot()
+        title = self.title or "알 수 없는 영상"
+        if len(title) > max_len:
+            title = title[:max_len] + "\n" + title[max_len:]
+
+        counter = ""
+        if self.total_entries and self.total_entries > 1:
+            counter = f" ({self.finished_entries}/{self.total_entries})"
+        elif not self.total_entries:
+            counter = f" ({self.finished_entries}개 완료)"
+        return (f"{self.kind} 다운로드 중{counter} : {title}\n"
+                f"{format_bytes(speed)}/s · 남은 시간 {format_eta(eta)}")
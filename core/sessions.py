@@ -0,0 +1,173 @@
+import threading
+import time
+
+import yt_dlp
+
+from core.postprocess import PipelinedYoutubeDL
+
+# 요청 처리기(연결 풀) / 쿠키 저장소를 만들 때 쓰는 옵션. 값이 같은 작업끼리만 세션을 나눠 쓴다.
+NETWORK_PARAMS = (
+    "proxy", "http_headers", "cookiefile", "cookiesfrombrowser", "nocheckcertificate", "source_address",
+    "socket_timeout", "legacyserverconnect", "enable_file_urls", "impersonate", "client_certificate",
+    "client_certificate_key", "client_certificate_password", "debug_printtraffic", "compat_opts",
+)
+# 쉬고 있는 세션 최대 개수 / 유지 시간 (초, 서버가 keep-alive 연결을 닫을 즈음 정리)
+DEFAULT_MAX_IDLE = 8
+DEFAULT_IDLE_TIMEOUT = 120.0
+
+
+def session_key(params):
+    """같은 연결 / 쿠키를 써도 되는 옵션끼리 같은 키"""
+    key = []
+    for name in NETWORK_PARAMS:
+        value = params.get(name)
+        if isinstance(value, dict):
+            value = tuple(sorted((str(k).lower(), str(v)) for k, v in value.items()))
+        elif isinstance(value, (list, set)):
+            value = tuple(sorted(map(str, value)))
+        key.append(value or None)
+    return tuple(key)
+
+
+class YoutubeDLSession(PipelinedYoutubeDL):
+    """
+    여러 작업에 걸쳐 재사용하는 YoutubeDL (SessionPool.acquire로 받고 close()하면 풀로 돌아간다)
+    작업마다 옵션 / 훅 / 후처리기는 새로 설정하고, 요청 처리기(keep-alive 연결 풀, TLS 세션) /
+    쿠키 / 추출기 인스턴스(플레이어 JS 등 캐시)는 유지한다.
+    """
+
+    def __init__(self, params=None, merge_pool=None, storage=None, pool=None):
+        # YoutubeDL.__init__이 params를 고치기(http_headers 기본값 등) 전의 값으로 계산
+        self.key = session_key(params or {})
+        super().__init__(params, merge_pool=merge_pool, storage=storage)
+        self.allowed_extractors = self.params.get("allowed_extractors")
+        self.pool = pool
+        self.jobs = 1
+        self.idle_since = None
+
+    def reconfigure(self, params, merge_pool=None, storage=None):
+        """작업 하나의 옵션으로 다시 초기화 (같은 session_key의 옵션만)"""
+        ies, extractors = self._ies, self._ies_instances
+        # cached_property(_request_director, cookiejar, proxies)는 인스턴스 __dict__에 남아 그대로 쓰인다.
+        # 추출기 목록은 허용 목록이 같으면 그대로 쓴다. (새로 만들면 CPU로 0.1초가량 걸려 동시 작업끼리 GIL을 다툼)
+        same_ies = (params or {}).get("allowed_extractors") == self.allowed_extractors
+        yt_dlp.YoutubeDL.__init__(self, params, auto_init=not same_ies)
+        if same_ies:
+            self._ies = ies
+        self._ies_instances = extractors
+        self.allowed_extractors = self.params.get("allowed_extractors")
+        self.merge_pool = merge_pool
+        self.storage = storage
+        self.jobs += 1
+        self.idle_since = None
+
+    def detach(self):
+        """풀로 돌아갈 때 작업(엔진 / 진행률 훅)을 참조하지 않도록 비운다."""
+        self.save_cookies()
+        self.params = {name: self.params[name] for name in NETWORK_PARAMS if name in self.params}
+        self._pps = {when: [] for when in self._pps}
+        self._progress_hooks = []
+        self._postprocessor_hooks = []
+        self._post_hooks = []
+        self.merge_pool = None
+        self.storage = None
+        self.idle_since = time.monotonic()
+
+    def close(self):
+        if self.pool is not None and self.idle_since is not None:
+            return  # 이미 풀로 돌아감
+        if self.pool is None or not self.pool.release(self):
+            self.pool = None
+            super().close()
+
+
+class SessionPool:
+    """
+    YoutubeDL 세션 풀 (프로그램 전체에서 하나, get_session_pool)
+    - acquire(params): 같은 네트워크 옵션으로 쉬고 있는 세션이 있으면 작업 옵션만 바꿔서, 없으면 새로 만든다.
+      (가장 최근에 쓴 세션부터: 연결이 살아 있을 가능성이 높다)
+    - 세션 하나는 한 번에 한 스레드만 쓴다. 작업 / 플레이리스트 워커 / 병합 풀이 각자 받아서 close()로 돌려준다.
+    - 쉬는 세션은 max_idle개까지, idle_timeout초가 지나면 닫는다.
+    """
+
+    def __init__(self, max_idle=DEFAULT_MAX_IDLE, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._idle = []
+        self._closed = False
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, params, merge_pool=None, storage=None) -> YoutubeDLSession:
+        key = session_key(params)
+        session = None
+        with self._lock:
+            expired = self._expire()
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i].key == key:
+                    session = self._idle.pop(i)
+                    break
+            if session is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        for old in expired:
+            old.close()
+        if session is None:
+            return YoutubeDLSession(params, merge_pool=merge_pool, storage=storage, pool=self)
+        session.reconfigure(params, merge_pool=merge_pool, storage=storage)
+        return session
+
+    def release(self, session):
+        """세션을 쉬는 목록에 넣는다. 넣지 않았으면(풀이 닫혔거나 가득 참) False -> 호출한 쪽이 닫는다."""
+        session.detach()
+        with self._lock:
+            if self._closed or self.max_idle <= 0:
+                return False
+            self._idle.append(session)
+            overflow = self._idle[:-self.max_idle] if len(self._idle) > self.max_idle else []
+            del self._idle[:len(overflow)]
+        for old in overflow:
+            old.pool = None
+            old.close()
+        return True
+
+    def _expire(self):
+        """(lock 안에서) idle_timeout이 지난 세션을 목록에서 빼서 돌려준다."""
+        now = time.monotonic()
+        expired = [s for s in self._idle if now - s.idle_since > self.idle_timeout]
+        for session in expired:
+            self._idle.remove(session)
+            session.pool = None
+        return expired
+
+    def status(self):
+        with self._lock:
+            return {"idle": len(self._idle), "created": self.created, "reused": self.reused}
+
+    def clear(self):
+        """쉬고 있는 세션을 모두 닫는다. (연결 / 쿠키를 새로 시작)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            session.pool = None
+            session.close()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self.clear()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """프로그램 전체에서 공유하는 YoutubeDL 세션 풀"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SessionPool()
+        return _default_pool
@@ -0,0 +1,66 @@
+import sys
+import threading
+import time
+
+
+class StartupTimer:
+    """
+    프로그램 시작부터 단계별 경과 시간 (main.py --startup-report)
+    - mark(name): 현재까지 경과 시간 기록 (echo면 표준 에러로 바로 출력)
+    - 출력은 'startup: <단계> <ms>' 형식 (bench.startup이 -X importtime 출력과 함께 읽는다)
+    """
+
+    def __init__(self, start=None, echo=False):
+        self.start = time.perf_counter() if start is None else start
+        self.echo = echo
+        self.marks = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        elapsed = time.perf_counter() - self.start
+        with self._lock:
+            self.marks[name] = elapsed
+        if self.echo:
+            print(f"startup: {name} {elapsed * 1000:.1f}ms", file=sys.stderr, flush=True)
+        return elapsed
+
+    def report(self):
+        with self._lock:
+            return {name: round(elapsed * 1000, 1) for name, elapsed in self.marks.items()}
+
+
+def prewarm(timer=None, on_done=None):
+    """
+    첫 화면 이후 백그라운드 스레드에서 다운로드 모듈을 미리 로드한다.
+    - yt_dlp와 다운로드 엔진 import
+    - YoutubeDL 생성과 YouTube 추출기 로드
+    - 기본 ffmpeg 경로의 버전 확인 (yt-dlp가 경로별로 캐시하므로 첫 병합 때 다시 실행하지 않는다)
+    끝나면 on_done() 호출 (prewarm 스레드에서)
+    """
+    thread = threading.Thread(target=_prewarm, args=(timer, on_done), name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def _prewarm(timer, on_done):
+    mark = timer.mark if timer is not None else (lambda name: None)
+    try:
+        import yt_dlp
+        from yt_dlp.postprocessor import FFmpegPostProcessor
+
+        from core import engine
+        mark("prewarm_import")
+
+        with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True,
+                               "ffmpeg_location": engine.default_ffmpeg_location()}) as ydl:
+            for ie_key in ("Youtube", "YoutubeTab"):
+                ydl.get_info_extractor(ie_key)
+            mark("prewarm_extractors")
+            FFmpegPostProcessor.get_versions(ydl)
+            mark("prewarm_ffmpeg")
+    except Exception as e:
+        # 미리 로드하지 못해도 첫 다운로드 때 다시 로드되므로 실행에는 문제 없다.
+        print(f"prewarm 실패: {e}", file=sys.stderr)
+    finally:
+        if on_done is not None:
+            on_done()
@@ -0,0 +1,305 @@
+import errno
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+from yt_dlp.postprocessor import PostProcessor
+from yt_dlp.postprocessor.movefilesafterdownload import MoveFilesAfterDownloadPP
+from yt_dlp.utils import PostProcessingError
+
+from core.bandwidth import parse_rate
+from core.options import DEFAULT_STAGING_PATH, DISK_FULL_POLICIES, FSYNC_POLICIES
+
+# 스테이징 폴더에서 저장 폴더로 복사할 때의 쓰기 단위 (네트워크 공유에서는 클수록 유리)
+DEFAULT_IO_BUFFER = 8 * 1024 * 1024
+# 꽉 차지 않도록 남겨 둘 공간
+MIN_FREE_BYTES = 256 * 1024 * 1024
+SPACE_POLL_INTERVAL = 5.0
+
+
+def parse_size(text):
+    """'8M', '512K' -> 바이트 (core.bandwidth.parse_rate와 같은 단위)"""
+    return parse_rate(text)
+
+
+def estimate_size(info):
+    """선택된 포맷(병합이면 영상+음성)의 예상 크기. filesize -> filesize_approx -> tbr × 길이, 모르면 None"""
+    total = 0
+    for f in info.get("requested_formats") or [info]:
+        size = f.get("filesize") or f.get("filesize_approx")
+        if not size and f.get("tbr") and info.get("duration"):
+            size = f["tbr"] * 1000 / 8 * info["duration"]
+        if not size:
+            return None
+        total += size
+    return int(total)
+
+
+def _device(path):
+    os.makedirs(path, exist_ok=True)
+    return os.stat(path).st_dev
+
+
+def _format_size(size):
+    return f"{size / 1024 ** 3:.1f}GB" if size >= 1024 ** 3 else f"{size / 1024 ** 2:.0f}MB"
+
+
+class InsufficientSpaceError(PostProcessingError):
+    pass
+
+
+class DiskSpace:
+    """
+    파일시스템별 빈 공간 예약 (프로그램 전체에서 하나, get_disk_space)
+    동시에 실행 중인 작업이 같은 빈 공간을 두 번 계산하지 않도록, 받기 전에 예상 크기만큼 예약하고
+    파일을 옮긴 뒤 해제한다. (받는 중에는 이미 쓴 만큼도 빈 공간에서 빠지므로 보수적으로 계산됨)
+    """
+
+    def __init__(self, min_free=MIN_FREE_BYTES, usage=shutil.disk_usage):
+        self.min_free = min_free
+        self._usage = usage
+        self._lock = threading.Lock()
+        self._reserved = {}  # st_dev -> 바이트
+
+    def try_reserve(self, needs):
+        """
+        needs: {폴더: 바이트}. 모두 들어가면 예약하고 (True, 예약), 아니면 (False, (폴더, 필요, 여유))
+        같은 파일시스템의 폴더는 합산한다.
+        """
+        by_device = {}
+        for path, size in needs.items():
+            device = _device(path)
+            path_, total = by_device.get(device, (path, 0))
+            by_device[device] = (path_, total + size)
+        with self._lock:
+            for device, (path, size) in by_device.items():
+                available = self._usage(path).free - self._reserved.get(device, 0) - self.min_free
+                if size > available:
+                    return False, (path, size, max(0, available))
+            for device, (_, size) in by_device.items():
+                self._reserved[device] = self._reserved.get(device, 0) + size
+        return True, {device: size for device, (_, size) in by_device.items()}
+
+    def release(self, reservation):
+        with self._lock:
+            for device, size in reservation.items():
+                self._reserved[device] = max(0, self._reserved.get(device, 0) - size)
+
+
+def finalize_file(source, target, buffer_size=DEFAULT_IO_BUFFER, preallocate=False, fsync="final"):
+    """
+    source를 target으로 원자적으로 옮긴다. (target에는 완성된 파일만 보인다)
+    - 같은 파일시스템: os.replace
+    - 다른 파일시스템: target 옆 임시 파일에 buffer_size 단위로 복사 (preallocate면 먼저 크기만큼 할당) 후 os.replace
+    - fsync == "final"이면 파일과 폴더를 디스크에 기록한 뒤 반환
+    """
+    target_dir = os.path.dirname(os.path.abspath(target))
+    os.makedirs(target_dir, exist_ok=True)
+    if os.stat(source).st_dev == os.stat(target_dir).st_dev:
+        os.replace(source, target)
+    else:
+        tmp = target + ".ytd-move"
+        try:
+            _copy(source, tmp, buffer_size, preallocate, fsync == "final")
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        os.remove(source)
+    if fsync == "final":
+        _fsync_dir(target_dir)
+
+
+def _copy(source, target, buffer_size, preallocate, sync):
+    size = os.path.getsize(source)
+    buffer = memoryview(bytearray(max(64 * 1024, buffer_size)))
+    with open(source, "rb", buffering=0) as src, open(target, "wb", buffering=0) as dst:
+        if preallocate and size and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(dst.fileno(), 0, size)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    raise
+                # 지원하지 않는 파일시스템은 그냥 복사
+        while True:
+            n = src.readinto(buffer)
+            if not n:
+                break
+            view = buffer[:n]
+            while view:
+                view = view[dst.write(view):]
+        if sync:
+            os.fsync(dst.fileno())
+    shutil.copystat(source, target)
+
+
+def _fsync_dir(path):
+    # 이름 변경(rename)까지 기록되도록 폴더도 fsync (Windows는 폴더를 열 수 없어 생략)
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JobStorage:
+    """
+    작업 하나의 디스크 사용
+    - staging_dir가 있으면 yt-dlp가 세그먼트 / .part / 병합 파일을 그 폴더(paths.temp)에 쓰고,
+      끝난 파일만 output_dir로 원자적으로 옮긴다. (finalize_file, 느린 네트워크 공유에는 한 번만 쓴다)
+    - preflight(info): 선택된 포맷의 예상 크기로 받기 전에 공간을 확인 / 예약 (disk_full: fail / wait)
+    - io_buffer_size: 옮길 때의 쓰기 단위, 스테이징 없이 바로 쓸 때는 yt-dlp 읽기/쓰기 단위
+    """
+
+    def __init__(self, output_dir, staging_dir=DEFAULT_STAGING_PATH, io_buffer_size=0, preallocate=False,
+                 fsync="final", disk_full="fail", space=None, is_canceled=None, on_wait=None):
+        self.output_dir = output_dir
+        self.staging_dir = os.path.join(staging_dir, _staging_name(output_dir)) if staging_dir else None
+        self.io_buffer_size = io_buffer_size or 0
+        self.preallocate = preallocate
+        self.fsync = fsync if fsync in FSYNC_POLICIES else "final"
+        self.disk_full = disk_full if disk_full in DISK_FULL_POLICIES else "fail"
+        self.space = space or get_disk_space()
+        self.is_canceled = is_canceled or (lambda: False)
+        self.on_wait = on_wait
+        self._lock = threading.Lock()
+        self._reservations = {}
+
+    def ydl_params(self):
+        """yt_dlp 옵션 (outtmpl은 paths 기준 상대 경로여야 한다)"""
+        paths = {"home": self.output_dir}
+        if self.staging_dir:
+            os.makedirs(self.staging_dir, exist_ok=True)
+            paths["temp"] = self.staging_dir
+        params = {"paths": paths}
+        if self.io_buffer_size and not self.staging_dir:
+            params.update({"buffersize": self.io_buffer_size, "noresizebuffer": True})
+        return params
+
+    # -------------------------------------
+    # 공간 확인
+    # -------------------------------------
+    def needs(self, size, merge):
+        """받기 / 병합 / 옮기기에 필요한 폴더별 공간"""
+        # 병합하면 영상+음성 스트림과 병합 결과가 잠시 함께 있다.
+        working = size * 2 if merge else size
+        # 같은 파일시스템이면 옮길 때 추가 공간이 필요 없다.
+        if not self.staging_dir or _device(self.staging_dir) == _device(self.output_dir):
+            return {self.staging_dir or self.output_dir: working}
+        return {self.staging_dir: working, self.output_dir: size}
+
+    def preflight(self, info):
+        size = estimate_size(info)
+        if not size:
+            return  # 크기를 모르면 확인하지 않는다.
+        needs = self.needs(size, merge=len(info.get("requested_formats") or []) > 1)
+        while True:
+            ok, result = self.space.try_reserve(needs)
+            if ok:
+                with self._lock:
+                    old = self._reservations.pop(_key(info), None)
+                    self._reservations[_key(info)] = result
+                if old:
+                    self.space.release(old)
+                return
+            path, need, available = result
+            message = f"디스크 공간 부족: {path} (필요 {_format_size(need)}, 여유 {_format_size(available)})"
+            if self.disk_full != "wait":
+                raise InsufficientSpaceError(message)
+            if self.on_wait:
+                self.on_wait(message + " — 공간이 생길 때까지 대기 중...")
+            deadline = time.monotonic() + SPACE_POLL_INTERVAL
+            while time.monotonic() < deadline:
+                if self.is_canceled():
+                    raise PostProcessingError("사용자에 의해 다운로드 취소됨.")
+                time.sleep(0.2)
+
+    def release(self, info):
+        with self._lock:
+            reservation = self._reservations.pop(_key(info), None)
+        if reservation:
+            self.space.release(reservation)
+
+    def close(self):
+        with self._lock:
+            reservations, self._reservations = list(self._reservations.values()), {}
+        for reservation in reservations:
+            self.space.release(reservation)
+
+    # -------------------------------------
+    # 옮기기
+    # -------------------------------------
+    def move(self, source, target):
+        finalize_file(source, target, self.io_buffer_size or DEFAULT_IO_BUFFER, self.preallocate, self.fsync)
+
+
+def _staging_name(output_dir):
+    # 저장 폴더가 다른 작업끼리 같은 파일 이름을 쓰지 않도록 폴더별로 나눈다.
+    return hashlib.sha1(os.path.abspath(output_dir).encode("utf-8")).hexdigest()[:12]
+
+
+def _key(info):
+    return info.get("extractor_key") or info.get("ie_key"), info.get("id")
+
+
+class PreflightPP(PostProcessor):
+    """다운로드 직전(before_dl)에 선택된 포맷이 들어갈 공간이 있는지 확인 / 예약"""
+
+    def __init__(self, storage: JobStorage, downloader=None):
+        super().__init__(downloader)
+        self.storage = storage
+
+    def run(self, info):
+        self.storage.preflight(info)
+        return [], info
+
+
+class AtomicMoveFilesPP(MoveFilesAfterDownloadPP):
+    """yt-dlp MoveFilesAfterDownloadPP와 같지만 JobStorage.move()로 원자적으로 옮기고 공간 예약을 해제한다."""
+
+    def __init__(self, storage: JobStorage, downloader=None, downloaded=True):
+        super().__init__(downloader, downloaded)
+        self.storage = storage
+
+    def run(self, info):
+        dl_path, dl_name = os.path.split(info["filepath"])
+        finaldir = info.get("__finaldir", dl_path)
+        finalpath = os.path.join(finaldir, dl_name)
+        if self._downloaded:
+            info["__files_to_move"][info["filepath"]] = finalpath
+
+        for oldfile, newfile in info["__files_to_move"].items():
+            newfile = newfile or os.path.join(finaldir, os.path.basename(oldfile))
+            if os.path.abspath(oldfile) == os.path.abspath(newfile):
+                continue
+            if not os.path.exists(oldfile):
+                self.report_warning(f'File "{oldfile}" cannot be found')
+                continue
+            if os.path.exists(newfile) and not self.get_param("overwrites", True):
+                self.report_warning(f'Cannot move "{oldfile}" since "{newfile}" already exists.')
+                continue
+            self.storage.move(oldfile, newfile)
+
+        info["filepath"] = finalpath
+        self.storage.release(info)
+        return [], info
+
+
+_default_space = None
+_default_space_lock = threading.Lock()
+
+
+def get_disk_space() -> DiskSpace:
+    """프로그램 전체에서 공유하는 공간 예약"""
+    global _default_space
+    with _default_space_lock:
+        if _default_space is None:
+            _default_space = DiskSpace()
+        return _default_space
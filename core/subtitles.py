@@ -0,0 +1,305 @@
+import html
+import http.client
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+from yt_dlp.networking import Request
+from yt_dlp.utils import sanitize_filename
+
+from core.analyzer import filter_available_subtitles
+from core.journal import DONE, DOWNLOADING, FAILED
+from core.playlist import iter_playlist_entries, resolve_entry
+from core.telemetry import telemetry_span
+
+# 저장 형식: srt / txt(대사만) / vtt(원본)
+SUBTITLE_FORMATS = ("srt", "txt", "vtt")
+DEFAULT_SUBTITLE_FORMAT = "srt"
+# 자막만 모드의 동시 처리 영상 수 (파일이 작아 영상 다운로드보다 많이)
+DEFAULT_SUBTITLE_WORKERS = 16
+
+_TIMING = re.compile(
+    r"(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{3})\s+-->\s+(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{3})")
+_TAG = re.compile(r"<[^>]*>")
+_MAX_REDIRECTS = 5
+
+
+# -------------------------------------
+# VTT 변환 (ffmpeg 없이)
+# -------------------------------------
+def _ms(hours, minutes, seconds, millis):
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis)
+
+
+def parse_vtt(text):
+    """WebVTT -> [(시작 ms, 끝 ms, 대사)] (태그 / 위치 설정 / NOTE / STYLE 블록 제거)"""
+    cues = []
+    for block in re.split(r"\r?\n\s*\r?\n", text.lstrip("﻿")):
+        lines = block.strip("\r\n").splitlines()
+        for i, line in enumerate(lines):
+            match = _TIMING.match(line.strip())
+            if match:
+                break
+        else:
+            continue  # WEBVTT 헤더, NOTE, STYLE, REGION
+        body = []
+        for line in lines[i + 1:]:
+            line = html.unescape(_TAG.sub("", line)).replace("\xa0", " ").strip()
+            if line:
+                body.append(line)
+        if body:
+            groups = match.groups()
+            cues.append((_ms(*groups[:4]), _ms(*groups[4:]), "\n".join(body)))
+    return cues
+
+
+def merge_cues(cues):
+    """같은 대사가 이어지는 큐를 하나로 합친다. (YouTube 자막에서 흔함)"""
+    merged = []
+    for start, end, text in cues:
+        if merged and merged[-1][2] == text and start <= merged[-1][1] + 50:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]), text)
+        else:
+            merged.append((start, end, text))
+    return merged
+
+
+def _srt_time(ms):
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+
+def cues_to_srt(cues):
+    return "".join(f"{n}\n{_srt_time(start)} --> {_srt_time(end)}\n{text}\n\n"
+                   for n, (start, end, text) in enumerate(cues, start=1))
+
+
+def cues_to_text(cues):
+    """대사만 (이전 줄과 같은 줄은 한 번만)"""
+    lines = []
+    for _, _, text in cues:
+        for line in text.splitlines():
+            if not lines or lines[-1] != line:
+                lines.append(line)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def convert_vtt(text, fmt):
+    if fmt == "vtt":
+        return text
+    cues = merge_cues(parse_vtt(text))
+    return cues_to_srt(cues) if fmt == "srt" else cues_to_text(cues)
+
+
+# -------------------------------------
+# 자막 파일 받기
+# -------------------------------------
+class ConnectionPool:
+    """
+    호스트별 keep-alive 연결 (http.client, 스레드마다 따로)
+    자막 파일은 작아서 요청마다 새로 연결(TCP/TLS)하는 비용이 대부분이므로 연결을 재사용한다.
+    """
+
+    def __init__(self, timeout=20):
+        self.timeout = timeout
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _connection(self, scheme, netloc):
+        conns = self._local.__dict__.setdefault("conns", {})
+        conn = conns.get((scheme, netloc))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conns[(scheme, netloc)] = cls(netloc, timeout=self.timeout)
+            with self._lock:
+                self._all.append(conn)
+        return conn
+
+    def _drop(self, scheme, netloc):
+        conn = self._local.__dict__.get("conns", {}).pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def get(self, url, headers=None):
+        for _ in range(_MAX_REDIRECTS):
+            parts = urlsplit(url)
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+            for attempt in range(2):
+                conn = self._connection(parts.scheme, parts.netloc)
+                try:
+                    conn.request("GET", target, headers={"Accept-Encoding": "identity", **(headers or {})})
+                    response = conn.getresponse()
+                    body = response.read()
+                    break
+                except (http.client.HTTPException, OSError):
+                    # 서버가 닫은 keep-alive 연결이면 새 연결로 한 번 더
+                    self._drop(parts.scheme, parts.netloc)
+                    if attempt:
+                        raise
+            if response.will_close:
+                self._drop(parts.scheme, parts.netloc)
+            if response.status in (301, 302, 303, 307, 308) and response.getheader("Location"):
+                url = urljoin(url, response.getheader("Location"))
+                continue
+            if response.status >= 400:
+                raise OSError(f"HTTP Error {response.status}: {response.reason}")
+            return body
+        raise OSError("리다이렉트가 너무 많습니다.")
+
+    def close(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
+
+
+def pick_track(tracks):
+    """언어 하나의 자막 트랙 중 변환할 수 있는 vtt 우선"""
+    tracks = [t for t in tracks or [] if t.get("url") or t.get("data")]
+    return next((t for t in tracks if t.get("ext") == "vtt"), tracks[0] if tracks else None)
+
+
+def subtitle_path(output_dir, info, lang, ext):
+    """영상과 같은 이름 규칙: '<제목> [<ID>].<언어>.<확장자>'"""
+    name = sanitize_filename(f"{info.get('title') or info.get('id')} [{info.get('id')}]")
+    return os.path.join(output_dir, f"{name}.{lang}.{ext}")
+
+
+def _write_atomic(path, text):
+    tmp = path + ".part"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def fetch_subtitles(ydl, info, langs, output_dir, fmt=DEFAULT_SUBTITLE_FORMAT, pool=None):
+    """
+    영상 하나의 자막을 받아 변환 후 저장한다. 저장한 파일 경로 목록 반환
+    - 이미 받은 메타데이터(info)의 자막 목록에서 실제로 있는 언어만 요청
+    - 같은 이름의 파일이 있으면 다시 받지 않는다.
+    - pool(ConnectionPool)이 있으면 연결을 재사용 (프록시 설정 시에는 yt-dlp 네트워크 사용)
+    """
+    paths = []
+    for lang in filter_available_subtitles(info, langs):
+        track = pick_track(info["subtitles"][lang])
+        if track is None:
+            continue
+        ext = fmt if track.get("ext") == "vtt" else track.get("ext") or "sub"
+        path = subtitle_path(output_dir, info, lang, ext)
+        if os.path.exists(path):
+            paths.append(path)
+            continue
+
+        if track.get("data") is not None:
+            data = track["data"]
+        else:
+            headers = {**(info.get("http_headers") or {}), **(track.get("http_headers") or {})}
+            if pool is not None and not ydl.params.get("proxy"):
+                raw = pool.get(track["url"], headers)
+            else:
+                with ydl.urlopen(Request(track["url"], headers=headers)) as response:
+                    raw = response.read()
+            data = raw.decode("utf-8", errors="replace")
+        _write_atomic(path, convert_vtt(data, fmt) if track.get("ext") == "vtt" else data)
+        paths.append(path)
+    return paths
+
+
+def download_subtitles(ydl, info, langs, output_dir, fmt=DEFAULT_SUBTITLE_FORMAT, cache=None,
+                       is_canceled=None, workers=DEFAULT_SUBTITLE_WORKERS, make_ydl=None,
+                       on_entry=None, on_entry_done=None, journal=None, telemetry=None):
+    """
+    자막만 모드 (영상 / 플레이리스트 공통, 포맷 선택과 yt-dlp 다운로드 과정 없음)
+    - 플레이리스트 목록은 flat으로 지연 순회하고, 영상별 메타데이터는 캐시를 먼저 확인
+    - workers개 영상을 동시에 처리, 자막 파일은 ConnectionPool로 연결을 재사용해 받는다.
+    - VTT는 프로세스 안에서 fmt(srt / txt / vtt)로 변환 (ffmpeg 사용 안 함)
+    - on_entry(index, title), on_entry_done(index), journal, telemetry는 download_playlist와 같다.
+    반환: (저장한 자막 파일 수, 자막이 없어 건너뛴 영상 수, 실패 목록[(index, title, 오류)])
+    """
+    canceled = is_canceled or (lambda: False)
+    os.makedirs(output_dir, exist_ok=True)
+    counts = {"files": 0, "skipped": 0}
+    failed = []
+    lock = threading.Lock()
+    pool = ConnectionPool()
+    local = threading.local()
+    worker_ydls = []
+
+    def worker_ydl():
+        if make_ydl is None or workers <= 1:
+            return ydl
+        if not hasattr(local, "ydl"):
+            local.ydl = make_ydl()
+            with lock:
+                worker_ydls.append(local.ydl)
+        return local.ydl
+
+    def run_entry(index, entry):
+        title = entry.get("title") or entry.get("url") or ""
+        try:
+            if canceled():
+                return
+            entry_ydl = worker_ydl()
+            with telemetry_span(telemetry, "extract"):
+                video = resolve_entry(entry_ydl, entry, cache=cache)
+            if not video:
+                raise ValueError("영상 정보를 가져올 수 없습니다.")
+            title = video.get("title") or title
+            if on_entry:
+                on_entry(index, title)
+            if journal is not None and index is not None:
+                journal.set_entry_state(index, DOWNLOADING)
+            with telemetry_span(telemetry, "fetch"):
+                paths = fetch_subtitles(entry_ydl, video, langs, output_dir, fmt, pool)
+        except Exception as e:
+            if canceled():
+                return
+            if journal is not None and index is not None:
+                journal.set_entry_state(index, FAILED, error=str(e))
+            with lock:
+                failed.append((index, title, str(e)))
+        else:
+            if journal is not None and index is not None:
+                journal.set_entry_state(index, DONE, filepath=paths[0] if paths else None)
+            with lock:
+                counts["files"] += len(paths)
+                counts["skipped"] += not paths
+        finally:
+            if on_entry_done:
+                on_entry_done(index)
+
+    if info.get("_type") in ("playlist", "multi_video"):
+        entries = iter_playlist_entries(info, cache=cache)
+        if journal is not None:
+            entries = ((index, entry) for index, entry, _ in journal.iter_entries(entries))
+    else:
+        entries = iter([(None, info)])
+
+    slots = threading.BoundedSemaphore(max(1, workers))
+
+    def task(index, entry):
+        try:
+            run_entry(index, entry)
+        finally:
+            slots.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for index, entry in entries:
+                slots.acquire()
+                if canceled():
+                    slots.release()
+                    break
+                executor.submit(task, index, entry)
+    finally:
+        pool.close()
+        for entry_ydl in worker_ydls:
+            entry_ydl.close()
+    return counts["files"], counts["skipped"], failed
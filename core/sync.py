@@ -0,0 +1,315 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_SYNC_PATH = os.path.join(os.getcwd(), "data", "sync.sqlite3")
+# 소스를 다시 확인하는 기본 간격 (초)
+DEFAULT_SYNC_INTERVAL = 24 * 3600
+# 동시에 확인하는 소스 수 (목록 첫 페이지만 받으므로 대부분 네트워크 대기)
+DEFAULT_SYNC_WORKERS = 16
+# 이미 아는 영상이 이만큼 연달아 나오면 목록 순회를 멈춘다. (고정 영상 / 순서가 조금 바뀐 경우 여유)
+STOP_AFTER_KNOWN = 5
+# 실패한 영상을 다음 동기화 때 다시 받는 최대 횟수
+MAX_ATTEMPTS = 3
+# 목록만 가볍게 (영상별 추출 없이 flat entry, 페이지는 순회하는 만큼만 요청)
+SYNC_YDL_OPTS = {"quiet": True, "no_warnings": True, "extract_flat": "in_playlist", "lazy_playlist": True}
+
+# 영상 상태
+KNOWN = "known"  # 구독 전부터 있던 영상 (backfill=False, 받지 않음)
+QUEUED = "queued"
+DONE = "done"
+FAILED = "failed"
+
+
+def entry_key(entry):
+    """flat entry의 고유 키: '<extractor>:<id>', id가 없으면 'url:<url>'"""
+    extractor = entry.get("ie_key") or entry.get("extractor_key")
+    if extractor and entry.get("id"):
+        return f"{extractor.lower()}:{entry['id']}"
+    return f"url:{entry.get('url') or entry.get('webpage_url')}"
+
+
+def entry_url(entry):
+    return entry.get("webpage_url") or entry.get("url")
+
+
+def scan_source(ydl, url, known, stop_after=STOP_AFTER_KNOWN):
+    """
+    소스(채널 / 플레이리스트)의 목록을 앞에서부터 순회하며 known에 없는 영상을 찾는다.
+    - 아는 영상이 stop_after개 연달아 나오면 멈춘다. (최신순 목록은 첫 페이지에서 끝남)
+    - 목록이 전체 개수(playlist_count)를 알려 주고 아직 못 본 영상이 남아 있으면 끝까지 순회한다.
+      (뒤에 추가되는 플레이리스트)
+    (새 영상 [(키, URL, 제목, 위치)], 순회한 항목 수) 반환
+    """
+    info = ydl.extract_info(url, download=False, process=False)
+    if not info:
+        raise ValueError("목록을 가져올 수 없습니다.")
+    if info.get("_type") not in ("playlist", "multi_video"):
+        entries = [info]
+    else:
+        entries = info.get("entries") or []
+    total = info.get("playlist_count")
+
+    new = []
+    run = 0
+    scanned = 0
+    for position, entry in enumerate(entries, start=1):
+        scanned = position
+        if not entry or not entry_url(entry):
+            continue
+        key = entry_key(entry)
+        if key not in known:
+            run = 0
+            new.append((key, entry_url(entry), entry.get("title"), position))
+            continue
+        run += 1
+        if run >= stop_after and (total is None or total <= len(known) + len(new)):
+            break
+    return new, scanned
+
+
+class SyncStore:
+    """
+    구독 소스와 소스별 영상 목록 스냅샷 (SQLite)
+    - sources: URL, 작업 옵션(build_options 형식, url 제외), 확인 간격, 마지막 확인 결과
+    - entries: 소스별로 본 영상의 키 / URL / 제목 / 목록 위치 / 상태(known, queued, done, failed)
+    """
+
+    def __init__(self, path=DEFAULT_SYNC_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            " url TEXT PRIMARY KEY,"
+            " options TEXT NOT NULL,"
+            " interval REAL NOT NULL,"
+            " backfill INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_checked REAL,"
+            " last_changed REAL,"
+            " last_new INTEGER NOT NULL DEFAULT 0,"
+            " last_error TEXT);"
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " source TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " url TEXT NOT NULL,"
+            " title TEXT,"
+            " position INTEGER,"
+            " state TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " first_seen REAL NOT NULL,"
+            " PRIMARY KEY (source, key)) WITHOUT ROWID;"
+        )
+        self._conn.commit()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # -------------------------------------
+    # 소스
+    # -------------------------------------
+    def add_source(self, url, options=None, interval=DEFAULT_SYNC_INTERVAL, backfill=True):
+        """
+        구독 추가 (이미 있으면 옵션 / 간격만 변경)
+        backfill이 False면 첫 확인 때 있던 영상은 받지 않고 이후 새 영상만 받는다.
+        """
+        options = {k: v for k, v in (options or {}).items() if k != "url"}
+        self._execute(
+            "INSERT INTO sources (url, options, interval, backfill, created) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT(url) DO UPDATE SET options = excluded.options, interval = excluded.interval",
+            (url, json.dumps(options, ensure_ascii=False), interval, int(backfill), time.time()))
+
+    def remove_source(self, url):
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM sources WHERE url = ?", (url,)).rowcount
+            self._conn.execute("DELETE FROM entries WHERE source = ?", (url,))
+            self._conn.commit()
+        return bool(removed)
+
+    def sources(self):
+        rows = self._query(
+            "SELECT s.url, s.options, s.interval, s.backfill, s.last_checked, s.last_changed, s.last_new, s.last_error,"
+            " (SELECT COUNT(*) FROM entries e WHERE e.source = s.url) FROM sources s ORDER BY s.created")
+        return [{
+            "url": url,
+            "options": json.loads(options),
+            "interval": interval,
+            "backfill": bool(backfill),
+            "last_checked": last_checked,
+            "last_changed": last_changed,
+            "last_new": last_new,
+            "last_error": last_error,
+            "entries": entries,
+        } for url, options, interval, backfill, last_checked, last_changed, last_new, last_error, entries in rows]
+
+    def due_sources(self, now=None):
+        """확인 간격이 지난 (또는 한 번도 확인하지 않은) 소스"""
+        now = time.time() if now is None else now
+        return [s for s in self.sources() if s["last_checked"] is None or now - s["last_checked"] >= s["interval"]]
+
+    # -------------------------------------
+    # 영상 목록
+    # -------------------------------------
+    def known_keys(self, source):
+        return {key for key, in self._query("SELECT key FROM entries WHERE source = ?", (source,))}
+
+    def retry_entries(self, source):
+        """실패했고 재시도 횟수가 남은 영상 [(키, URL)]"""
+        return self._query(
+            "SELECT key, url FROM entries WHERE source = ? AND state = ? AND attempts < ? ORDER BY position",
+            (source, FAILED, MAX_ATTEMPTS))
+
+    def record_scan(self, source, new, state, error=None):
+        """확인 결과 기록. new: scan_source의 새 영상 목록, state: 새 영상의 상태 (queued 또는 known)"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entries (source, key, url, title, position, state, first_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(source, key, url, title, position, state, now) for key, url, title, position in new])
+            self._conn.execute(
+                "UPDATE sources SET last_checked = ?, last_new = ?, last_error = ?,"
+                " last_changed = CASE WHEN ? > 0 THEN ? ELSE last_changed END WHERE url = ?",
+                (now, len(new), error, len(new), now, source))
+            self._conn.commit()
+
+    def set_entry_state(self, source, key, state):
+        """queued로 바꿀 때마다 시도 횟수 증가"""
+        self._execute(
+            "UPDATE entries SET state = ?, attempts = attempts + ? WHERE source = ? AND key = ?",
+            (state, int(state == QUEUED), source, key))
+
+    def entry_counts(self, source):
+        return dict(self._query("SELECT state, COUNT(*) FROM entries WHERE source = ? GROUP BY state", (source,)))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SyncRunner:
+    """
+    구독 소스를 동시에 확인하고 새 영상을 작업으로 등록한다.
+    - submit(options): 작업 등록 (DownloadManager / CLI). options에 sync_source / sync_entry가 들어 있어
+      작업이 끝나면 job_finished(options, ok)로 결과를 알려 준다. (실패한 영상은 다음 확인 때 다시 등록)
+    - 확인은 workers개 스레드에서 동시에, 스레드마다 세션 풀의 YoutubeDL로 목록만 가볍게 받는다.
+    """
+
+    def __init__(self, store: SyncStore, submit, workers=DEFAULT_SYNC_WORKERS, stop_after=STOP_AFTER_KNOWN,
+                 make_ydl=None):
+        self.store = store
+        self.submit = submit
+        self.workers = workers
+        self.stop_after = stop_after
+        self.make_ydl = make_ydl or _session_ydl
+        self._lock = threading.Lock()  # 한 번에 한 번만 동기화
+
+    def sync(self, urls=None, force=False):
+        """
+        urls(없으면 모든 소스) 중 확인 간격이 지난 소스를 확인 (force면 모두)
+        소스별 결과 [{url, new, queued, scanned, seconds, error}] 반환
+        """
+        with self._lock:
+            sources = self.store.sources() if force else self.store.due_sources()
+            if urls is not None:
+                sources = [s for s in sources if s["url"] in urls]
+            if not sources:
+                return []
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(sources)))) as pool:
+                return list(pool.map(self._sync_source, sources))
+
+    def _sync_source(self, source):
+        url = source["url"]
+        start = time.monotonic()
+        result = {"url": url, "new": 0, "queued": 0, "scanned": 0, "error": None}
+        try:
+            known = self.store.known_keys(url)
+            with self.make_ydl() as ydl:
+                new, result["scanned"] = scan_source(ydl, url, known, self.stop_after)
+        except Exception as e:
+            result["error"] = str(e)
+            self.store.record_scan(url, [], QUEUED, error=str(e))
+            result["seconds"] = round(time.monotonic() - start, 4)
+            return result
+
+        # 구독 후 첫 확인에서 backfill이 아니면 지금 있는 영상은 기준으로만 기록
+        baseline = not known and source["last_checked"] is None and not source["backfill"]
+        self.store.record_scan(url, new, KNOWN if baseline else QUEUED)
+        result["new"] = len(new)
+        pending = [] if baseline else [(key, video_url) for key, video_url, _, _ in new]
+        pending += self.store.retry_entries(url)
+        for key, video_url in pending:
+            self.store.set_entry_state(url, key, QUEUED)
+            self.submit({**source["options"], "url": video_url, "sync_source": url, "sync_entry": key})
+            result["queued"] += 1
+        result["seconds"] = round(time.monotonic() - start, 4)
+        return result
+
+    def job_finished(self, options, ok):
+        """동기화로 등록한 작업이 끝났을 때 (다른 작업이면 무시)"""
+        if options.get("sync_source") and options.get("sync_entry"):
+            self.store.set_entry_state(options["sync_source"], options["sync_entry"], DONE if ok else FAILED)
+
+
+def _session_ydl():
+    # yt_dlp는 실제로 확인할 때 로드
+    from core.sessions import get_session_pool
+    return get_session_pool().acquire(dict(SYNC_YDL_OPTS))
+
+
+class SyncScheduler:
+    """check_interval초마다 확인 간격이 지난 소스를 동기화하는 백그라운드 스레드 (시작하자마자 한 번)"""
+
+    def __init__(self, runner: SyncRunner, check_interval=60.0, on_result=None):
+        self.runner = runner
+        self.check_interval = check_interval
+        self.on_result = on_result
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sync-scheduler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                results = self.runner.sync()
+            except Exception:
+                results = []
+            if results and self.on_result:
+                self.on_result(results)
+            self._stop.wait(self.check_interval)
+
+    def stop(self, timeout=None):
+        """확인 중이면 timeout초까지 기다린다. (daemon 스레드라 못 끝내도 종료는 막지 않음)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_sync_store() -> SyncStore:
+    """프로그램 전체에서 공유하는 구독 목록"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = SyncStore()
+        return _default_store
@@ -0,0 +1,402 @@
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import sys
+import statistics
+import threading
+import time
+from collections import deque
+
+DEFAULT_TELEMETRY_PATH = os.path.join(os.getcwd(), "data", "telemetry", "jobs.jsonl")
+# 작업 기록 파일이 이 크기를 넘으면 .1로 옮기고 새로 시작
+DEFAULT_MAX_LOG_BYTES = 16 * 1024 * 1024
+
+# 회선 속도 추정: 최근 작업 수 / 이보다 적게 받은 작업은 제외 (연결 준비 시간이 대부분)
+LINK_SPEED_JOBS = 10
+LINK_SPEED_MIN_BYTES = 1024 * 1024
+
+# 후처리기(pp_key 소문자) -> 단계 이름 (나머지 후처리기는 "postprocess")
+_PP_PHASES = {"merger": "merge"}
+
+
+class JobTelemetry:
+    """
+    작업 하나의 계측 (DownloadEngine이 만들고 끝날 때 TelemetrySink.record()로 내보낸다)
+    - span(name): 단계별 시간 (extract / subtitle_filter / download / merge_wait / subtitles ...)
+      대역폭 제한으로 기다린 시간은 throttle
+      여러 스레드에서 겹쳐 실행되면 스레드별 시간의 합이므로 전체 시간보다 클 수 있다.
+    - progress_hook: 받은 바이트 / 파일 / 세그먼트 수, 실제 전송 구간 기준 평균 속도
+    - postprocessor_hook: 병합(merge) 등 후처리기 실행 시간
+    - retry_sleep_functions(): yt-dlp 재시도 횟수 (http / fragment)
+    - sample_speed(speed): 작업 전체 속도 최댓값 (진행률을 보낼 때마다 호출)
+    - fragment_concurrency(value): 영상마다 실제로 쓴 세그먼트 동시 다운로드 수 (postprocess.TelemetryPP)
+    """
+
+    def __init__(self, url=None, job_id=None, clock=time.monotonic):
+        self.url = url
+        self.job_id = job_id
+        self.mode = "video"
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._start = clock()
+        self._end = None
+
+        self.phases = {}  # name -> [횟수, 초]
+        self.bytes = 0
+        self.files = 0
+        self.fragments = 0
+        self.peak_speed = 0.0
+        self.retries = {"http": 0, "fragment": 0}
+        self.concurrency = {}  # 세그먼트 동시 다운로드 수 -> 영상 수
+        self.failed_entries = 0
+        self.sessions = {"new": 0, "reused": 0}  # 이 작업이 받은 YoutubeDL 세션 (core.sessions)
+        self._first_byte = None
+        self._last_byte = None
+        self._fragment_counts = {}  # filename -> 세그먼트 수
+        self._pp_started = {}  # (스레드, pp_key) -> 시작 시각
+
+    # -------------------------------------
+    # 단계 시간
+    # -------------------------------------
+    def add_phase(self, name, seconds):
+        with self._lock:
+            phase = self.phases.setdefault(name, [0, 0.0])
+            phase[0] += 1
+            phase[1] += seconds
+
+    @contextlib.contextmanager
+    def span(self, name):
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.add_phase(name, self._clock() - start)
+
+    # -------------------------------------
+    # yt-dlp 훅
+    # -------------------------------------
+    def progress_hook(self, d):
+        status = d.get("status")
+        now = self._clock()
+        filename = d.get("filename")
+        with self._lock:
+            if status == "downloading":
+                if self._first_byte is None and d.get("downloaded_bytes"):
+                    self._first_byte = now
+                if d.get("fragment_count"):
+                    self._fragment_counts[filename] = d["fragment_count"]
+            elif status == "finished":
+                self.bytes += d.get("total_bytes") or d.get("downloaded_bytes") or 0
+                self.files += 1
+                self.fragments += self._fragment_counts.pop(filename, 0)
+                if self._first_byte is None:
+                    self._first_byte = now - (d.get("elapsed") or 0)
+                self._last_byte = now
+
+    def postprocessor_hook(self, d):
+        key = (d.get("postprocessor") or "").lower()
+        slot = (threading.get_ident(), key)
+        if d.get("status") == "started":
+            with self._lock:
+                self._pp_started[slot] = self._clock()
+        elif d.get("status") == "finished":
+            with self._lock:
+                start = self._pp_started.pop(slot, None)
+            if start is not None:
+                self.add_phase(_PP_PHASES.get(key, "postprocess"), self._clock() - start)
+
+    def retry_sleep_functions(self, inner=None):
+        """재시도 수를 센 뒤 inner(있으면)의 대기 시간을 따른다. (없으면 yt-dlp 기본값처럼 바로 재시도)"""
+        inner = inner or {}
+
+        def counter(kind):
+            def sleep(n):
+                with self._lock:
+                    self.retries[kind] += 1
+                return inner[kind](n) if kind in inner else 0
+            return sleep
+
+        return {kind: counter(kind) for kind in self.retries}
+
+    def sample_speed(self, speed):
+        if speed and speed > self.peak_speed:
+            self.peak_speed = speed
+
+    def fragment_concurrency(self, value):
+        if value:
+            with self._lock:
+                self.concurrency[value] = self.concurrency.get(value, 0) + 1
+
+    def session_acquired(self, reused):
+        with self._lock:
+            self.sessions["reused" if reused else "new"] += 1
+
+    # -------------------------------------
+    # 결과
+    # -------------------------------------
+    def finish(self):
+        if self._end is None:
+            self._end = self._clock()
+
+    def summary(self, result=None, error=None):
+        """JSON으로 내보낼 작업 기록"""
+        end = self._end if self._end is not None else self._clock()
+        with self._lock:
+            transfer = (self._last_byte - self._first_byte) if self._first_byte is not None \
+                and self._last_byte is not None else 0
+            return {
+                "event": "job",
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started_at)),
+                "job_id": self.job_id,
+                "url": self.url,
+                "mode": self.mode,
+                "result": result,
+                "error": error,
+                "duration_s": round(end - self._start, 4),
+                # 시작부터 첫 바이트까지 (분석 + 연결 준비)
+                "first_byte_s": round(self._first_byte - self._start, 4) if self._first_byte is not None else None,
+                "phases": {name: {"count": count, "seconds": round(seconds, 4)}
+                           for name, (count, seconds) in self.phases.items()},
+                "bytes": self.bytes,
+                "files": self.files,
+                "fragments": self.fragments,
+                "average_speed": round(self.bytes / transfer) if transfer > 0 else None,
+                "peak_speed": round(self.peak_speed) or None,
+                "retries": dict(self.retries),
+                "fragment_concurrency": {str(k): v for k, v in sorted(self.concurrency.items())},
+                "failed_entries": self.failed_entries,
+                "sessions": dict(self.sessions),
+            }
+
+
+def telemetry_span(telemetry, name):
+    """telemetry(JobTelemetry)가 있으면 단계 시간 측정, 없으면 아무것도 하지 않는다."""
+    return telemetry.span(name) if telemetry is not None else contextlib.nullcontext()
+
+
+class TelemetrySink:
+    """
+    끝난 작업의 계측 결과를 모아 내보낸다. (프로그램 전체에서 하나, get_telemetry_sink)
+    - path: 작업마다 JSON 한 줄씩 추가 (None이면 파일 기록 안 함)
+    - textfile_path: Prometheus node_exporter textfile 형식으로 누적 지표를 작업이 끝날 때마다 갱신
+    - prometheus_text(): 같은 지표 문자열 (제어 API의 GET /metrics)
+    - link_speed(): 최근 작업 평균 속도의 중앙값 (포맷 선택의 시간 목표에 사용)
+    """
+
+    def __init__(self, path=DEFAULT_TELEMETRY_PATH, textfile_path=None, max_bytes=DEFAULT_MAX_LOG_BYTES):
+        self.path = path
+        self.textfile_path = textfile_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.running = 0
+        self.jobs = {}  # result -> 작업 수
+        self.duration = 0.0
+        self.phases = {}  # name -> [횟수, 초]
+        self.bytes = 0
+        self.files = 0
+        self.fragments = 0
+        self.retries = {}
+        self.sessions = {}
+        self.last_job = None
+        self._speeds = None  # 최근 작업 평균 속도 (처음 필요할 때 기록 파일에서 읽음)
+
+    def job_started(self):
+        with self._lock:
+            self.running += 1
+
+    def record(self, summary):
+        with self._lock:
+            self.running = max(0, self.running - 1)
+            result = summary.get("result") or "unknown"
+            self.jobs[result] = self.jobs.get(result, 0) + 1
+            self.duration += summary["duration_s"]
+            for name, phase in summary["phases"].items():
+                total = self.phases.setdefault(name, [0, 0.0])
+                total[0] += phase["count"]
+                total[1] += phase["seconds"]
+            self.bytes += summary["bytes"]
+            self.files += summary["files"]
+            self.fragments += summary["fragments"]
+            for kind, count in summary["retries"].items():
+                self.retries[kind] = self.retries.get(kind, 0) + count
+            for kind, count in summary["sessions"].items():
+                self.sessions[kind] = self.sessions.get(kind, 0) + count
+            self.last_job = summary
+            if self._speeds is not None and summary["bytes"] >= LINK_SPEED_MIN_BYTES and summary["average_speed"]:
+                self._speeds.append(summary["average_speed"])
+            self._append(summary)
+            if self.textfile_path:
+                self._write_textfile()
+
+    def link_speed(self):
+        """최근 작업들의 평균 속도 중앙값 (바이트/초, 기록이 없으면 None)"""
+        with self._lock:
+            if self._speeds is None:
+                self._speeds = deque(self._load_speeds(), maxlen=LINK_SPEED_JOBS)
+            return statistics.median(self._speeds) if self._speeds else None
+
+    def _load_speeds(self):
+        """(lock 안에서) 작업 기록 파일 끝부분의 평균 속도"""
+        if not self.path:
+            return []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(max(0, os.path.getsize(self.path) - 256 * 1024))
+                lines = f.read().decode("utf-8", errors="ignore").splitlines()
+        except OSError:
+            return []
+        speeds = []
+        for line in lines:
+            try:
+                summary = json.loads(line)
+            except ValueError:
+                continue  # 잘린 첫 줄
+            if (summary.get("bytes") or 0) >= LINK_SPEED_MIN_BYTES and summary.get("average_speed"):
+                speeds.append(summary["average_speed"])
+        return speeds[-LINK_SPEED_JOBS:]
+
+    def _append(self, summary):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+
+    def _write_textfile(self):
+        # node_exporter가 쓰는 중인 파일을 읽지 않도록 임시 파일에 쓰고 교체
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.textfile_path)), exist_ok=True)
+            tmp = self.textfile_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self._prometheus_text())
+            os.replace(tmp, self.textfile_path)
+        except OSError:
+            pass
+
+    def prometheus_text(self):
+        with self._lock:
+            return self._prometheus_text()
+
+    def _prometheus_text(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        last = self.last_job or {}
+        metric("ytd_jobs_running", "gauge", "실행 중인 다운로드 작업 수", [({}, self.running)])
+        metric("ytd_jobs_total", "counter", "끝난 다운로드 작업 수",
+               [({"result": result}, count) for result, count in sorted(self.jobs.items())])
+        metric("ytd_job_duration_seconds_total", "counter", "끝난 작업의 걸린 시간 합", [({}, round(self.duration, 4))])
+        metric("ytd_phase_seconds_total", "counter", "단계별 시간 합 (스레드별 합계)",
+               [({"phase": name}, round(seconds, 4)) for name, (_, seconds) in sorted(self.phases.items())])
+        metric("ytd_phase_runs_total", "counter", "단계 실행 횟수",
+               [({"phase": name}, count) for name, (count, _) in sorted(self.phases.items())])
+        metric("ytd_downloaded_bytes_total", "counter", "받은 바이트", [({}, self.bytes)])
+        metric("ytd_downloaded_files_total", "counter", "받은 파일 수 (영상 / 음성 스트림, 자막)", [({}, self.files)])
+        metric("ytd_fragments_total", "counter", "받은 세그먼트 수", [({}, self.fragments)])
+        metric("ytd_retries_total", "counter", "yt-dlp 재시도 횟수",
+               [({"kind": kind}, count) for kind, count in sorted(self.retries.items())])
+        metric("ytd_sessions_total", "counter", "작업이 받은 YoutubeDL 세션 (new = 새로 만듦, reused = 재사용)",
+               [({"kind": kind}, count) for kind, count in sorted(self.sessions.items())])
+        metric("ytd_last_job_first_byte_seconds", "gauge", "마지막 작업의 시작부터 첫 바이트까지 시간",
+               [({}, last.get("first_byte_s") or 0)])
+        metric("ytd_last_job_average_speed_bytes", "gauge", "마지막 작업의 평균 속도 (B/s)",
+               [({}, last.get("average_speed") or 0)])
+        metric("ytd_last_job_peak_speed_bytes", "gauge", "마지막 작업의 최고 속도 (B/s)",
+               [({}, last.get("peak_speed") or 0)])
+        return "\n".join(lines) + "\n"
+
+
+# -------------------------------------
+# cProfile
+# -------------------------------------
+_profile_lock = threading.Lock()
+
+
+class JobProfiler:
+    """
+    작업 하나를 cProfile로 측정해 path에 pstats 형식으로 저장 (python -m pstats <path>로 확인)
+    - 작업 스레드와 측정 중에 시작한 스레드(플레이리스트 워커, 병합 풀 등)를 함께 측정한다.
+    - threading.setprofile은 프로세스 전체 설정이므로 한 번에 한 작업만 측정한다. (start()가 False 반환)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._main = cProfile.Profile()
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._active = False
+
+    def start(self):
+        if not _profile_lock.acquire(blocking=False):
+            return False
+        self._active = True
+        threading.setprofile(self._profile_thread)
+        self._main.enable()
+        return True
+
+    def _profile_thread(self, frame, event, arg):
+        # 새 스레드의 첫 이벤트에서 그 스레드 전용 프로파일러로 교체
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def stop(self):
+        """측정을 끝내고 저장한 경로를 반환 (측정하지 않았으면 None)"""
+        if not self._active:
+            return None
+        self._main.disable()
+        threading.setprofile(None)
+        self._active = False
+        _profile_lock.release()
+        try:
+            stats = pstats.Stats(self._main)
+            with self._lock:
+                profiles = list(self._profiles)
+            for profile in profiles:
+                try:
+                    stats.add(profile)
+                except TypeError:
+                    pass  # 아무 함수도 기록하지 않은 스레드
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            stats.dump_stats(self.path)
+        except OSError:
+            return None
+        return self.path
+
+
+_default_sink = None
+_default_sink_lock = threading.Lock()
+
+
+def get_telemetry_sink() -> TelemetrySink:
+    """프로그램 전체에서 공유하는 기본 sink"""
+    global _default_sink
+    with _default_sink_lock:
+        if _default_sink is None:
+            _default_sink = TelemetrySink()
+        return _default_sink
+
+
+def configure_telemetry(path=DEFAULT_TELEMETRY_PATH, textfile_path=None) -> TelemetrySink:
+    """기본 sink 설정 변경 (path=None이면 작업 기록 파일을 쓰지 않음)"""
+    sink = get_telemetry_sink()
+    with sink._lock:
+        sink.path = path
+        sink.textfile_path = textfile_path
+    return sink
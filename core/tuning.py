@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from yt_dlp.postprocessor import PostProcessor
+
+DEFAULT_TUNING_PATH = os.path.join(os.getcwd(), "data", "fragment_tuning.json")
+
+# 처음 보는 사이트의 시작 값
+DEFAULT_INITIAL = 8
+# 파일 하나에서 세그먼트 재시도 비율이 이 값을 넘으면 과부하로 보고 절반으로 줄인다.
+RETRY_RATE_LIMIT = 0.05
+# 속도 변화가 이 비율 이내면 같은 속도로 본다.
+RATE_TOLERANCE = 0.05
+# 속도는 그대로인데 세그먼트당 시간이 이만큼 늘면 연결만 늘어난 것으로 보고 줄인다.
+LATENCY_TOLERANCE = 0.25
+# 같은 값에서 이만큼 연속으로 안정적이면 한 단계 올려 본다. (회선 상태 변화 확인)
+PROBE_AFTER = 3
+# 재시도 대기 시간 (지수 증가, 초)
+RETRY_BACKOFF = 0.1
+RETRY_BACKOFF_MAX = 5.0
+
+
+def url_host(info):
+    """다운로드할 스트림의 호스트 (병합 포맷이면 첫 스트림 기준)"""
+    formats = info.get("requested_formats") or [info]
+    return urlsplit(formats[0].get("url") or "").hostname
+
+
+class FragmentTuner:
+    """
+    호스트별 세그먼트 동시 다운로드 수(concurrent_fragment_downloads) 자동 조절
+    - 파일(스트림) 하나가 끝날 때마다 속도 / 재시도 비율 / 세그먼트당 시간을 보고 다음 값을 정한다.
+      · 재시도(5xx/타임아웃 등)가 많으면 절반으로 줄이고, 그 값을 해당 호스트의 상한으로 기억
+      · 속도가 오르면 같은 방향으로 계속, 떨어지면 지금까지 가장 빨랐던 값으로 돌아가 방향을 바꾼다.
+    - 호스트별 결과는 파일에 저장해 이후 작업이 바로 그 값에서 시작한다.
+    yt-dlp는 파일을 받기 시작할 때 한 번 이 값을 읽으므로 조절 단위는 파일(영상/오디오 스트림)이다.
+    """
+
+    def __init__(self, path=DEFAULT_TUNING_PATH, initial=DEFAULT_INITIAL, minimum=1, maximum=32):
+        self.path = path
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._lock = threading.Lock()
+        self._hosts = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._hosts = json.load(f)
+            except (OSError, ValueError):
+                self._hosts = {}
+
+    def _state(self, host):
+        return self._hosts.setdefault(host or "", {
+            "value": self.initial,
+            "direction": 1,
+            "ceiling": self.maximum,
+            "best_value": None,
+            "best_rate": 0.0,
+            "last_rate": None,
+            "last_latency": None,
+            "stable": 0,
+        })
+
+    def suggest(self, host, maximum=None):
+        """다음 파일에 쓸 세그먼트 동시 다운로드 수"""
+        with self._lock:
+            state = self._state(host)
+            upper = min(self.maximum, state["ceiling"], maximum or self.maximum)
+            return max(self.minimum, min(state["value"], upper))
+
+    def observe(self, host, concurrency, nbytes, elapsed, fragments, retries=0):
+        """파일 하나의 측정 결과를 반영하고 다음 값을 반환"""
+        if not elapsed or not fragments:
+            return self.suggest(host)
+
+        rate = nbytes / elapsed
+        # 동시에 받은 세그먼트 수를 고려한 세그먼트 하나당 평균 시간
+        latency = elapsed * min(concurrency, fragments) / fragments
+        step = max(1, concurrency // 4)
+
+        with self._lock:
+            state = self._state(host)
+            # 오래된 최고 기록이 계속 기준이 되지 않도록 조금씩 낮춘다.
+            state["best_rate"] *= 0.9
+            if rate > state["best_rate"]:
+                state["best_rate"] = rate
+                state["best_value"] = concurrency
+
+            last_rate, last_latency = state["last_rate"], state["last_latency"]
+            stable = 0
+            if retries / fragments > RETRY_RATE_LIMIT:
+                value = concurrency // 2
+                state["ceiling"] = max(self.minimum, concurrency - 1)
+                state["direction"] = -1
+            elif last_rate is None or rate > last_rate * (1 + RATE_TOLERANCE):
+                value = concurrency + state["direction"] * step
+            elif rate < last_rate * (1 - RATE_TOLERANCE):
+                state["direction"] = -state["direction"]
+                value = state["best_value"] or concurrency
+            elif last_latency and latency > last_latency * (1 + LATENCY_TOLERANCE):
+                state["direction"] = -1
+                value = concurrency - step
+            else:
+                value = concurrency
+                # 안정적이면 줄였던 상한을 하나씩 되돌리고, 한동안 그대로면 위로 한 단계 시험
+                state["ceiling"] = min(self.maximum, state["ceiling"] + 1)
+                stable = state.get("stable", 0) + 1
+                if stable >= PROBE_AFTER:
+                    state["direction"] = 1
+                    value = concurrency + step
+                    stable = 0
+
+            state["value"] = max(self.minimum, min(value, state["ceiling"], self.maximum))
+            state["last_rate"] = rate
+            state["last_latency"] = latency
+            state["stable"] = stable
+            result = state["value"]
+            self._save()
+        return result
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._hosts, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+class FragmentTuningSession:
+    """
+    YoutubeDL 인스턴스 하나에 붙는 측정기
+    - before_dl 후처리기: 스트림 호스트에 맞는 값을 ydl.params에 넣는다.
+    - progress_hook: 파일별 바이트 / 경과 시간 / 세그먼트 수 수집
+    - retry_sleep_functions: yt-dlp가 재시도할 때마다 호출되므로 여기서 재시도 수를 센다.
+      (세그먼트 다운로드의 재시도 메시지는 yt-dlp 내부에서 출력되지 않는다) 대기 시간은 지수 증가
+    """
+
+    def __init__(self, tuner: FragmentTuner, maximum=None):
+        self.tuner = tuner
+        self.maximum = maximum
+        self.ydl = None
+        self.host = None
+        self.concurrency = None
+        # 마지막 영상을 시작할 때 쓴 값
+        self.concurrency_used = None
+        self.retries = 0
+        self._retry_lock = threading.Lock()
+        # filename -> [세그먼트 수, 시작 시점 재시도 수, 시작 시각]
+        self._files = {}
+
+    def retry_sleep_functions(self):
+        return {"http": self._retry_sleep, "fragment": self._retry_sleep}
+
+    def _retry_sleep(self, n):
+        with self._retry_lock:
+            self.retries += 1
+        return min(RETRY_BACKOFF * 2 ** n, RETRY_BACKOFF_MAX)
+
+    def attach(self, ydl):
+        self.ydl = ydl
+        ydl.add_post_processor(_TuningPP(self, ydl), when="before_dl")
+
+    def prepare(self, info):
+        self.host = url_host(info)
+        self.concurrency = self.concurrency_used = self.tuner.suggest(self.host, self.maximum)
+        self.ydl.params["concurrent_fragment_downloads"] = self.concurrency
+
+    # -------------------------------------
+    # progress_hook
+    # -------------------------------------
+    def hook(self, d):
+        filename = d.get("filename")
+        if d["status"] == "downloading":
+            if d.get("fragment_count") and filename not in self._files:
+                self._files[filename] = [d["fragment_count"], self.retries, time.monotonic()]
+        elif d["status"] == "finished":
+            started = self._files.pop(filename, None)
+            if started is None or self.concurrency is None:
+                return
+            fragments, retries_before, start = started
+            # 병합 포맷의 다음 스트림(오디오 등)부터 바로 새 값을 쓴다.
+            self.concurrency = self.tuner.observe(
+                self.host, self.concurrency,
+                d.get("total_bytes") or d.get("downloaded_bytes") or 0,
+                d.get("elapsed") or time.monotonic() - start,
+                fragments,
+                retries=self.retries - retries_before,
+            )
+            self.ydl.params["concurrent_fragment_downloads"] = self.concurrency
+
+
+class _TuningPP(PostProcessor):
+    def __init__(self, session, downloader=None):
+        super().__init__(downloader)
+        self.session = session
+
+    def run(self, info):
+        self.session.prepare(info)
+        return [], info
+
+
+_default_tuner = None
+_default_tuner_lock = threading.Lock()
+
+
+def get_fragment_tuner() -> FragmentTuner:
+    """프로그램 전체에서 공유하는 기본 조절기 (호스트별 기록 공유)"""
+    global _default_tuner
+    with _default_tuner_lock:
+        if _default_tuner is None:
+            _default_tuner = FragmentTuner()
+        return _default_tuner
@@ -0,0 +1,317 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_QUEUE_PATH = os.path.join(os.getcwd(), "data", "queue.sqlite3")
+# 작업을 가져간 작업자가 이 시간(초) 안에 갱신하지 않으면 죽은 것으로 보고 다시 대기열로
+DEFAULT_LEASE = 60
+# 작업자 하나가 동시에 실행하는 작업 수
+DEFAULT_WORKER_CONCURRENCY = 2
+# 대기열이 비었을 때 다시 확인하는 간격 (초)
+DEFAULT_POLL_INTERVAL = 2.0
+# 작업자가 죽어 다시 대기열로 돌아간 횟수가 이만큼이면 실패로 (매번 작업자를 죽이는 작업)
+MAX_ATTEMPTS = 3
+
+# 작업 상태
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+CANCELED = "canceled"
+
+
+class JobQueue:
+    """
+    여러 작업자 프로세스(같은 컴퓨터 또는 파일 시스템을 공유하는 여러 컴퓨터)가 함께 쓰는 작업 대기열 (SQLite)
+    - claim(): 대기 중인 작업 하나를 작업자에게 빌려 준다. (lease, 우선순위 높은 것부터 등록 순)
+    - heartbeat(): 실행 중인 작업의 lease를 늘린다. 만료된 작업은 다음 claim 때 다른 작업자가 가져간다.
+    - finish(): 결과 기록 (lease를 가진 작업자만), release(): 실행하지 않고 돌려놓기 (작업자 종료)
+    - wal=False: 여러 컴퓨터가 네트워크 파일 시스템으로 공유할 때 (WAL은 같은 컴퓨터의 프로세스끼리만 안전)
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, wal=True):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 다른 프로세스가 쓰는 중이면 잠시 기다린다.
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " options TEXT NOT NULL,"
+            " priority INTEGER NOT NULL DEFAULT 0,"
+            " state TEXT NOT NULL,"
+            " worker TEXT,"
+            " lease_until REAL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " message TEXT,"
+            " created REAL NOT NULL,"
+            " updated REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, priority DESC);"
+        )
+        self._conn.commit()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # -------------------------------------
+    # 등록 / 조회
+    # -------------------------------------
+    def enqueue(self, options: dict, priority=0) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (job_id, options, priority, state, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, json.dumps(options, ensure_ascii=False), priority, QUEUED, now, now))
+        return job_id
+
+    def cancel(self, job_id):
+        """대기 / 실행 중인 작업 취소 (실행 중이면 작업자가 다음 heartbeat 때 중단)"""
+        cursor = self._execute(
+            "UPDATE jobs SET state = ?, updated = ? WHERE job_id = ? AND state IN (?, ?)",
+            (CANCELED, time.time(), job_id, QUEUED, LEASED))
+        return cursor.rowcount > 0
+
+    def pending(self, now=None):
+        """가져갈 수 있는 작업 수 (대기 중 + lease가 만료된 작업)"""
+        now = time.time() if now is None else now
+        return self._query("SELECT COUNT(*) FROM jobs WHERE state = ? OR (state = ? AND lease_until < ?)",
+                           (QUEUED, LEASED, now))[0][0]
+
+    def counts(self):
+        return dict(self._query("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+
+    def workers(self, now=None):
+        """lease가 살아 있는 작업자별 실행 중인 작업 수 {worker: count}"""
+        now = time.time() if now is None else now
+        return dict(self._query("SELECT worker, COUNT(*) FROM jobs WHERE state = ? AND lease_until >= ? GROUP BY worker",
+                                (LEASED, now)))
+
+    def jobs(self, state=None, limit=100):
+        rows = self._query(
+            "SELECT job_id, options, priority, state, worker, attempts, message, updated FROM jobs"
+            + (" WHERE state = ?" if state else "") + " ORDER BY rowid DESC LIMIT ?",
+            (state, limit) if state else (limit,))
+        return [{
+            "job_id": job_id,
+            "url": json.loads(options).get("url"),
+            "priority": priority,
+            "state": job_state,
+            "worker": worker,
+            "attempts": attempts,
+            "message": message,
+            "updated": updated,
+        } for job_id, options, priority, job_state, worker, attempts, message, updated in rows]
+
+    # -------------------------------------
+    # 작업자
+    # -------------------------------------
+    def claim(self, worker, lease=DEFAULT_LEASE):
+        """
+        작업 하나를 worker에게 lease초 동안 빌려 준다. {job_id, options, attempts} 또는 None
+        죽은 작업자의 작업(lease 만료)도 가져간다. 이미 MAX_ATTEMPTS번 가져간 작업은 실패로 돌린다.
+        하나의 UPDATE 문으로 고르고 표시하므로 여러 프로세스가 동시에 불러도 같은 작업을 받지 않는다.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, message = ?, updated = ? WHERE state = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, "작업자가 응답하지 않아 중단됐습니다.", now, LEASED, now, MAX_ATTEMPTS))
+            row = self._conn.execute(
+                "UPDATE jobs SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1, updated = ?"
+                " WHERE job_id = (SELECT job_id FROM jobs WHERE state = ? OR (state = ? AND lease_until < ?)"
+                " ORDER BY priority DESC, rowid LIMIT 1)"
+                " RETURNING job_id, options, attempts",
+                (LEASED, worker, now + lease, now, QUEUED, LEASED, now)).fetchone()
+            self._conn.commit()
+        if row is None:
+            return None
+        job_id, options, attempts = row
+        return {"job_id": job_id, "options": json.loads(options), "attempts": attempts}
+
+    def heartbeat(self, job_id, worker, lease=DEFAULT_LEASE):
+        """lease 연장. 다른 작업자가 가져갔거나 취소됐으면 False (작업을 중단해야 함)"""
+        cursor = self._execute(
+            "UPDATE jobs SET lease_until = ? WHERE job_id = ? AND worker = ? AND state = ?",
+            (time.time() + lease, job_id, worker, LEASED))
+        return cursor.rowcount > 0
+
+    def finish(self, job_id, worker, ok, message=None):
+        cursor = self._execute(
+            "UPDATE jobs SET state = ?, message = ?, lease_until = NULL, updated = ?"
+            " WHERE job_id = ? AND worker = ? AND state = ?",
+            (DONE if ok else FAILED, message, time.time(), job_id, worker, LEASED))
+        return cursor.rowcount > 0
+
+    def release(self, job_id, worker):
+        """실행을 끝내지 못한 작업을 대기열로 돌려놓는다. (작업자 종료, 시도 횟수에 넣지 않음)"""
+        self._execute(
+            "UPDATE jobs SET state = ?, worker = NULL, lease_until = NULL, attempts = MAX(0, attempts - 1),"
+            " updated = ? WHERE job_id = ? AND worker = ? AND state = ?",
+            (QUEUED, time.time(), job_id, worker, LEASED))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def default_worker_id():
+    """'<호스트>:<pid>:<임의 6자>' (같은 컴퓨터의 여러 작업자 / 재시작한 작업자 구분)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _default_engine(options, job):
+    from core.engine import DownloadEngine
+
+    result = {"ok": False, "message": None}
+
+    def on_finished(msg):
+        result.update(ok=engine.ok, message=msg)
+
+    def on_error(msg):
+        result["message"] = msg
+
+    engine = DownloadEngine(options, on_finished=on_finished, on_error=on_error)
+    return engine, result
+
+
+class QueueWorker:
+    """
+    JobQueue에서 작업을 가져와 DownloadEngine으로 실행하는 작업자 (헤드리스, 프로세스당 하나)
+    - 동시에 concurrency개까지 실행하고, 자리가 비면 바로 다음 작업을 가져간다.
+    - lease / 4초마다 실행 중인 작업의 lease와 다운로드 기록의 받는 중 표시를 갱신한다.
+      lease를 잃은 작업(취소 / 다른 작업자가 가져감)은 중단한다.
+    - 작업 옵션에 claim_owner('<작업자>/<작업>')를 넣어 다른 작업자와 같은 영상을 동시에 받지 않는다.
+    - make_engine(options, job) -> (engine, {"ok", "message"}): 엔진 생성 (CLI는 진행 상황 출력용)
+    """
+
+    def __init__(self, queue: JobQueue, concurrency=DEFAULT_WORKER_CONCURRENCY, worker_id=None,
+                 lease=DEFAULT_LEASE, poll=DEFAULT_POLL_INTERVAL, make_engine=None, archive=None):
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.worker_id = worker_id or default_worker_id()
+        self.lease = lease
+        self.poll = poll
+        self.make_engine = make_engine or _default_engine
+        self.archive = archive
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        self._running = {}  # job_id -> engine
+        self._lost = set()
+        self._stop = threading.Event()
+        self._done = threading.Event()  # 실행 중인 작업까지 모두 끝남 (heartbeat 종료)
+        self._canceling = False
+        self.finished = {DONE: 0, FAILED: 0}
+
+    def run(self, exit_when_empty=False):
+        """
+        stop()할 때까지 (exit_when_empty면 대기열이 비고 실행 중인 작업이 끝날 때까지) 작업 실행
+        끝난 작업 수 {done, failed} 반환 (중단해 돌려놓은 작업은 제외)
+        """
+        heartbeat = threading.Thread(target=self._heartbeat, name="queue-heartbeat", daemon=True)
+        heartbeat.start()
+        threads = []
+        try:
+            while not self._stop.is_set():
+                if not self._slots.acquire(timeout=self.poll):
+                    continue
+                job = self.queue.claim(self.worker_id, self.lease)
+                if job is None:
+                    self._slots.release()
+                    with self._lock:
+                        idle = not self._running
+                    if exit_when_empty and idle and not self.queue.pending():
+                        break
+                    self._stop.wait(self.poll)
+                    continue
+                thread = threading.Thread(target=self._run_job, args=(job,), name=f"queue-job-{job['job_id'][:8]}",
+                                          daemon=True)
+                with self._lock:
+                    self._running[job["job_id"]] = None
+                thread.start()
+                threads = [t for t in threads if t.is_alive()] + [thread]
+        except KeyboardInterrupt:
+            # 실행 중인 작업은 중단해 대기열로 돌려놓는다.
+            self.stop(cancel=True)
+            raise
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self._done.set()
+            heartbeat.join()
+        return dict(self.finished)
+
+    def stop(self, cancel=False):
+        """새 작업을 가져가지 않는다. cancel이면 실행 중인 작업도 중단해 대기열로 돌려놓는다."""
+        with self._lock:
+            self._canceling = self._canceling or cancel
+            engines = [engine for engine in self._running.values() if engine is not None] if cancel else []
+        self._stop.set()
+        for engine in engines:
+            engine.cancel()
+
+    def _run_job(self, job):
+        job_id = job["job_id"]
+        options = dict(job["options"], claim_owner=f"{self.worker_id}/{job_id}")
+        result = {"ok": False, "message": None}
+        try:
+            engine, result = self.make_engine(options, job)
+            with self._lock:
+                self._running[job_id] = engine
+                canceled = self._canceling or job_id in self._lost
+            if canceled:
+                engine.cancel()
+            engine.run()
+        except Exception as e:
+            result["message"] = f"작업 실행 오류: {e}"
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+                lost = job_id in self._lost
+                self._lost.discard(job_id)
+                canceling = self._canceling
+            self._slots.release()
+
+        if lost:
+            return  # 취소됐거나 다른 작업자가 가져감
+        if canceling and not result["ok"]:
+            self.queue.release(job_id, self.worker_id)  # 중단됨, 다른 작업자 / 다음 실행이 다시 받음
+            return
+        if self.queue.finish(job_id, self.worker_id, result["ok"], result["message"]):
+            with self._lock:
+                self.finished[DONE if result["ok"] else FAILED] += 1
+
+    def _heartbeat(self):
+        interval = self.lease / 4
+        while not self._done.wait(interval):
+            with self._lock:
+                running = dict(self._running)
+            for job_id, engine in running.items():
+                try:
+                    alive = self.queue.heartbeat(job_id, self.worker_id, self.lease)
+                except sqlite3.Error:
+                    continue  # 잠깐 잠긴 경우 다음 갱신 때 (lease는 네 번 갱신할 시간이 남음)
+                if not alive:
+                    with self._lock:
+                        self._lost.add(job_id)
+                    if engine is not None:
+                        engine.cancel()
+            if self.archive is not None and running:
+                try:
+                    self.archive.refresh_claims(f"{self.worker_id}/", self.lease * 2)
+                except sqlite3.Error:
+                    pass
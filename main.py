@@ -1,8 +1,29 @@
-import sys
+import time
+
+_START = time.perf_counter()
 
+import os
+import sys
 
+from PyQt6.QtCore import QCoreApplication, QObject, Qt, QTimer, pyqtSignal
 from PyQt6.QtWidgets import QApplication
-from ui.browser import BrowserWindow
+
+from core.startup import StartupTimer, prewarm
+
+
+def _pop_option(argv, name, default=None):
+    """argv에서 '이름 값'을 꺼내 제거 (없으면 default)"""
+    if name not in argv:
+        return default
+    index = argv.index(name)
+    value = argv[index + 1] if index + 1 < len(argv) else None
+    del argv[index:index + 2]
+    return value
+
+
+class _StartupSignals(QObject):
+    # prewarm 스레드에서 보내면 메인 스레드 이벤트 루프에서 처리된다.
+    prewarmed = pyqtSignal()
 
 # def main():
 #
@@ -26,7 +47,54 @@ from ui.browser import BrowserWindow
     # sys.exit(app.exec())
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    win = BrowserWindow()
+    # --startup-report: 단계별 시작 시간을 표준 에러로 출력
+    # --exit-after-startup: 시작(웹 뷰 생성 + prewarm)이 끝나면 종료 (bench.startup용)
+    # --api-port N: 로컬 제어 API 사용 (환경 변수 YTD_API_PORT도 같음, 토큰은 YTD_API_TOKEN)
+    # --limit-rate 5M: 모든 작업을 합친 속도 상한 (YTD_LIMIT_RATE)
+    # --bandwidth-schedule 09:00-18:00=2M[,...]: 시간대별 전체 상한 (YTD_BANDWIDTH_SCHEDULE)
+    report = "--startup-report" in sys.argv
+    exit_after_startup = "--exit-after-startup" in sys.argv
+    argv = [arg for arg in sys.argv if arg not in ("--startup-report", "--exit-after-startup")]
+    api_port = _pop_option(argv, "--api-port", os.environ.get("YTD_API_PORT"))
+    limit_rate = _pop_option(argv, "--limit-rate", os.environ.get("YTD_LIMIT_RATE"))
+    schedule = _pop_option(argv, "--bandwidth-schedule", os.environ.get("YTD_BANDWIDTH_SCHEDULE"))
+    if limit_rate or schedule:
+        from core.bandwidth import get_bandwidth_governor, parse_rate, parse_schedule
+        get_bandwidth_governor().configure(
+            limit=parse_rate(limit_rate or 0),
+            schedule=parse_schedule([item for item in (schedule or "").split(",") if item.strip()]))
+    timer = StartupTimer(_START, echo=report)
+    timer.mark("imports")
+
+    # QtWebEngine을 QApplication 생성 뒤(첫 화면 이후)에 로드하려면 필요
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    app = QApplication(argv)
+
+    from ui.browser import BrowserWindow
+    win = BrowserWindow(api_port=int(api_port) if api_port else None, api_token=os.environ.get("YTD_API_TOKEN"))
+    timer.mark("window")
     win.show()
+    app.processEvents()
+    timer.mark("first_paint")
+
+    # 첫 화면 이후: yt_dlp / ffmpeg 확인은 백그라운드에서, 웹 뷰는 다음 이벤트 루프에서 생성
+    pending = {"web_view", "prewarm"}
+
+    def _startup_step_done(name):
+        pending.discard(name)
+        if not pending:
+            timer.mark("ready")
+            if exit_after_startup:
+                app.quit()
+
+    signals = _StartupSignals()
+    signals.prewarmed.connect(lambda: _startup_step_done("prewarm"))
+    prewarm(timer, on_done=signals.prewarmed.emit)
+
+    def _finish_startup():
+        win.finish_startup()
+        timer.mark("web_view")
+        _startup_step_done("web_view")
+
+    QTimer.singleShot(0, _finish_startup)
     sys.exit(app.exec())
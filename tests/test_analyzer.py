@@ -0,0 +1,57 @@
+"""메타데이터 추출 횟수 (extraction_counter) / 정규화 키 테스트 (가짜 추출기, 네트워크 없음)"""
+import pytest
+
+from core.analyzer import canonical_key, extract_info, extraction_counter, reset_extraction_counter
+from core.cache import MetadataCache
+
+VIDEO_URL = "https://www.youtube.com/watch?v=abc123"
+
+
+class FakeExtractor:
+    """extract_info(url, download=False, process=False)만 있는 가짜 YoutubeDL"""
+
+    def __init__(self):
+        self.calls = []
+
+    def extract_info(self, url, download=True, process=True):
+        assert not download and not process
+        self.calls.append(url)
+        return {"id": "abc123", "title": "영상", "extractor_key": "Youtube", "formats": []}
+
+
+@pytest.fixture(autouse=True)
+def _clean_counter():
+    reset_extraction_counter()
+    yield
+    reset_extraction_counter()
+
+
+def test_counts_every_extraction_without_cache():
+    ydl = FakeExtractor()
+    extract_info(ydl, VIDEO_URL)
+    extract_info(ydl, VIDEO_URL)
+    assert extraction_counter[VIDEO_URL] == 2
+    assert ydl.calls == [VIDEO_URL, VIDEO_URL]
+
+
+def test_cache_hit_is_not_counted(tmp_path):
+    cache = MetadataCache(str(tmp_path / "metadata.sqlite3"))
+    ydl = FakeExtractor()
+    first = extract_info(ydl, VIDEO_URL, cache=cache)
+    # 같은 영상의 다른 URL 표기도 같은 키라 다시 추출하지 않는다.
+    second = extract_info(ydl, "https://youtu.be/abc123", cache=cache)
+    assert extraction_counter[VIDEO_URL] == 1
+    assert sum(extraction_counter.values()) == 1
+    assert second == first
+    cache.close()
+
+
+@pytest.mark.parametrize("url, key", [
+    ("https://www.youtube.com/watch?v=abc123&t=10", "Youtube:abc123"),
+    ("https://youtu.be/abc123", "Youtube:abc123"),
+    ("https://www.youtube.com/shorts/abc123", "Youtube:abc123"),
+    ("https://www.youtube.com/playlist?list=PL1", "YoutubeTab:PL1"),
+    ("https://example.com/video.mp4", "url:https://example.com/video.mp4"),
+])
+def test_canonical_key(url, key):
+    assert canonical_key(url) == key
@@ -0,0 +1,80 @@
+"""MetadataCache TTL / LRU 정리 / 저장할 수 없는 값 테스트 (임시 SQLite 파일)"""
+import pytest
+
+from core import cache as cache_module
+from core.cache import MetadataCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock.time)
+    return clock
+
+
+def _info(video_id, size=0):
+    return {"id": video_id, "title": "영상", "formats": [{"format_id": "18", "url": "x" * size}]}
+
+
+def test_put_get_round_trip_drops_heavy_fields(tmp_path):
+    cache = MetadataCache(str(tmp_path / "c.sqlite3"))
+    assert cache.put("Youtube:a", {**_info("a"), "thumbnails": [{"url": "t"}], "__internal": 1})
+    info = cache.get("Youtube:a")
+    assert info == _info("a")
+    cache.close()
+
+
+def test_expired_entry_is_removed(tmp_path, clock):
+    cache = MetadataCache(str(tmp_path / "c.sqlite3"), ttl=60)
+    cache.put("Youtube:a", _info("a"))
+    clock.now += 59
+    assert cache.get("Youtube:a") is not None
+    clock.now += 2
+    assert cache.get("Youtube:a") is None
+    # 조회 때 지웠으므로 시간을 되돌려도 없다.
+    clock.now -= 61
+    assert cache.get("Youtube:a") is None
+    cache.close()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = MetadataCache(str(tmp_path / "c.sqlite3"))
+    cache.put("Youtube:a", _info("a", 4000))
+    one_entry = cache._conn.execute("SELECT size FROM entries").fetchone()[0]
+    cache.max_bytes = one_entry * 2 + one_entry // 2
+    clock.now += 1
+    cache.put("Youtube:b", _info("b", 4000))
+    clock.now += 1
+    # a를 최근에 썼으므로 세 번째 항목이 들어오면 b가 빠진다.
+    assert cache.get("Youtube:a") is not None
+    clock.now += 1
+    cache.put("Youtube:c", _info("c", 4000))
+    assert cache.get("Youtube:b") is None
+    assert cache.get("Youtube:a") is not None
+    assert cache.get("Youtube:c") is not None
+    cache.close()
+
+
+def test_unserializable_info_is_not_stored(tmp_path):
+    cache = MetadataCache(str(tmp_path / "c.sqlite3"))
+    # 지연 목록(제너레이터) / 함수 같은 값은 저장하지 않는다.
+    assert not cache.put("YoutubeTab:p", {"id": "p", "entries": (n for n in range(3))})
+    assert not cache.put("Youtube:f", {"id": "f", "hook": print})
+    assert cache.get("YoutubeTab:p") is None
+    assert cache.get("Youtube:f") is None
+    cache.close()
+
+
+def test_entry_larger_than_limit_is_not_stored(tmp_path):
+    cache = MetadataCache(str(tmp_path / "c.sqlite3"), max_bytes=16)
+    assert not cache.put("Youtube:a", _info("a", 4000))
+    assert cache.get("Youtube:a") is None
+    cache.close()
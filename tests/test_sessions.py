@@ -0,0 +1,93 @@
+"""
+YoutubeDLSession.reconfigure가 yt-dlp 내부 필드를 다시 쓰는 방식을 고정하는 테스트 (네트워크 없음)
+yt-dlp를 올린 뒤 실패하면 reconfigure / detach가 비우거나 유지하는 필드를 다시 확인해야 한다.
+"""
+from yt_dlp.postprocessor import PostProcessor
+
+from core.sessions import SessionPool
+
+
+def _hook(d):
+    pass
+
+
+def _job_params(**extra):
+    return {"quiet": True, "no_warnings": True, "outtmpl": "first.%(ext)s", "format": "best",
+            "progress_hooks": [_hook], "postprocessor_hooks": [_hook], **extra}
+
+
+def _reacquire(pool, first_params, second_params):
+    session = pool.acquire(first_params)
+    session.add_post_processor(PostProcessor(session), when="before_dl")
+    session.add_progress_hook(lambda d: None)
+    session.add_post_hook(lambda filename: None)
+    session._num_downloads = 3
+    session._download_retcode = 1
+    session._printed_messages.add("old warning")
+    director, cookiejar, extractor = session._request_director, session.cookiejar, session.get_info_extractor("Generic")
+    session.close()
+    return session, pool.acquire(second_params), director, cookiejar, extractor
+
+
+def test_reconfigure_reuses_network_and_extractor_state():
+    pool = SessionPool()
+    try:
+        first, second, director, cookiejar, extractor = _reacquire(pool, _job_params(), _job_params())
+        assert second is first
+        assert second.jobs == 2
+        # 요청 처리기(연결 풀) / 쿠키 / 추출기 인스턴스는 그대로
+        assert second._request_director is director
+        assert second.cookiejar is cookiejar
+        assert second.get_info_extractor("Generic") is extractor
+        assert second._ies
+    finally:
+        pool.close()
+
+
+def test_reconfigure_resets_job_state():
+    pool = SessionPool()
+    second_hook = []
+    try:
+        _, session, _, _, _ = _reacquire(pool, _job_params(), _job_params(
+            outtmpl="second.%(ext)s", format="worst", progress_hooks=[second_hook.append]))
+        assert session.params["outtmpl"]["default"] == "second.%(ext)s"
+        assert session.params["format"] == "worst"
+        # 이전 작업의 훅 / 후처리기 / 카운터 / 경고 기록은 남지 않는다.
+        assert session._progress_hooks == [second_hook.append]
+        assert session._postprocessor_hooks == [_hook]
+        assert session._post_hooks == []
+        assert all(not pps for pps in session._pps.values())
+        assert session._num_downloads == 0
+        assert session._download_retcode == 0
+        assert "old warning" not in session._printed_messages
+        assert session.merge_pool is None and session.storage is None
+    finally:
+        pool.close()
+
+
+def test_detach_drops_job_references():
+    pool = SessionPool()
+    try:
+        session = pool.acquire(_job_params(http_headers={"X-Test": "1"}))
+        session.add_post_processor(PostProcessor(session), when="post_process")
+        session.close()
+        # 풀에서 쉬는 동안에는 네트워크 옵션만 남는다.
+        assert set(session.params) <= {"http_headers", "compat_opts"}
+        assert session._progress_hooks == [] and session._postprocessor_hooks == []
+        assert all(not pps for pps in session._pps.values())
+        assert session.idle_since is not None
+    finally:
+        pool.close()
+
+
+def test_different_network_params_get_new_session():
+    pool = SessionPool()
+    try:
+        first = pool.acquire(_job_params())
+        first.close()
+        second = pool.acquire(_job_params(proxy="http://127.0.0.1:9"))
+        assert second is not first
+        assert pool.status()["created"] == 2
+        second.close()
+    finally:
+        pool.close()
@@ -0,0 +1,64 @@
+"""FragmentTuner 상태 변화 테스트 (파일 저장 없이, 측정 값은 직접 넣음)"""
+import json
+
+from core.tuning import PROBE_AFTER, FragmentTuner
+
+HOST = "media.example.com"
+MB = 1024 * 1024
+
+
+def _tuner(**kwargs):
+    return FragmentTuner(path=None, **kwargs)
+
+
+def test_unknown_host_starts_at_initial_within_limit():
+    tuner = _tuner(initial=8)
+    assert tuner.suggest(HOST) == 8
+    assert tuner.suggest(HOST, maximum=4) == 4
+
+
+def test_faster_rate_keeps_increasing():
+    tuner = _tuner(initial=8)
+    first = tuner.observe(HOST, 8, 10 * MB, 1.0, 100)
+    assert first == 10  # 첫 측정은 오른 것으로 본다. (step = 8 // 4)
+    assert tuner.observe(HOST, first, 14 * MB, 1.0, 100) > first
+
+
+def test_slower_rate_returns_to_best_value_and_reverses():
+    tuner = _tuner(initial=8)
+    tuner.observe(HOST, 8, 10 * MB, 1.0, 100)
+    value = tuner.observe(HOST, 10, 5 * MB, 1.0, 100)
+    assert value == 8
+    assert tuner._hosts[HOST]["direction"] == -1
+
+
+def test_retries_halve_and_cap_value():
+    tuner = _tuner(initial=16)
+    value = tuner.observe(HOST, 16, 10 * MB, 1.0, 100, retries=10)
+    assert value == 8
+    assert tuner._hosts[HOST]["ceiling"] == 15
+    assert tuner.suggest(HOST) == 8
+
+
+def test_stable_rate_probes_upward():
+    tuner = _tuner(initial=8)
+    value = tuner.observe(HOST, 8, 10 * MB, 1.0, 100)
+    values = [tuner.observe(HOST, value, 10 * MB, 1.0, 100) for _ in range(PROBE_AFTER)]
+    assert values[:-1] == [value] * (PROBE_AFTER - 1)
+    assert values[-1] > value
+
+
+def test_longer_fragment_latency_reduces_value():
+    tuner = _tuner(initial=8)
+    tuner.observe(HOST, 8, 10 * MB, 1.0, 100)
+    # 속도는 같은데 세그먼트당 시간이 늘었다. (연결만 늘어남)
+    assert tuner.observe(HOST, 16, 10 * MB, 1.0, 100) == 12
+
+
+def test_state_is_saved_per_host(tmp_path):
+    path = tmp_path / "tuning.json"
+    tuner = FragmentTuner(path=str(path), initial=8)
+    tuner.observe(HOST, 8, 10 * MB, 1.0, 100)
+    assert json.loads(path.read_text(encoding="utf-8"))[HOST]["value"] == 10
+    assert FragmentTuner(path=str(path)).suggest(HOST) == 10
+    assert FragmentTuner(path=str(path)).suggest("other.example.com") == 8
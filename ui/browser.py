@@ -1,14 +1,18 @@
-from PyQt6.QtCore import QUrl, Qt
+import os
+
+from PyQt6.QtCore import QUrl, Qt, pyqtSignal
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLineEdit,
-    QPushButton, QMessageBox,
+    QPushButton, QMessageBox, QLabel,
 )
 
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-
 from ui.download_popup import DownloadPopup
-from ui.progress_window import ProgressDialog
-from core.downloader import DownloadThread
+from ui.job_list_window import JobListWindow
+from ui.job_manager import DownloadManager, ManagerControl
+from core.job_manager import DONE, FAILED
+from core.analyzer import canonical_key
+from core.journal import get_job_journal
+from core.prefetch import Prefetcher
 
 
 class BrowserWindow(QMainWindow):
@@ -18,11 +22,16 @@ class BrowserWindow(QMainWindow):
         - 하단에 QWebEngineView로 유튜브 페이지 표시
         - 주소 표시줄 Enter로 이동 / 브라우저 URL 변경 시 주소 표시줄 자동 업데이트
         - 다운로드 버튼은 현재 단계에서는 클릭 로그만 출력
+        - 창을 먼저 그리고, 웹 뷰 생성과 중단된 작업 복원은 finish_startup()에서 진행
+        - 보고 있는 영상 / 플레이리스트는 백그라운드에서 미리 분석 (Prefetcher, 팝업과 다운로드가 재사용)
+        - api_port를 주면 로컬 HTTP/JSON 제어 API(core.api.ControlServer)로 작업 등록 / 상태 확인 / 취소
     """
 
+    # 미리 분석 완료 (prefetch 스레드에서 보내면 메인 스레드에서 처리)
+    prefetch_ready = pyqtSignal(str)
 
 
-    def __init__(self):
+    def __init__(self, api_port=None, api_token=None):
         super().__init__()
         self.home_url = "https://www.youtube.com/"
         self.setWindowTitle("YouTube Downloader")
@@ -46,15 +55,17 @@ class BrowserWindow(QMainWindow):
         top_bar.addWidget(self.url_bar, stretch=1)
         top_bar.addWidget(self.btn_download)
 
-        # --- 웹 뷰 ---
-        self.web = QWebEngineView(self)
-        self.web.setUrl(QUrl(self.home_url))
+        # --- 웹 뷰 (QtWebEngine 로드가 느려 첫 화면 이후 finish_startup()에서 생성) ---
+        self.web = None
+        self.web_placeholder = QLabel("페이지 불러오는 중...")
+        self.web_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.url_bar.setText(self.home_url)
 
         # --- 레이아웃 조합 ---
         layout = QVBoxLayout()
         layout.addLayout(top_bar)
-        layout.addWidget(self.web)
+        layout.addWidget(self.web_placeholder, stretch=1)
+        self._layout = layout
 
         container = QWidget()
         container.setLayout(layout)
@@ -64,12 +75,47 @@ class BrowserWindow(QMainWindow):
         self.btn_back.clicked.connect(self._go_back)
         self.btn_forward.clicked.connect(self._go_forward)
         self.url_bar.returnPressed.connect(self._navigate)
-        self.web.urlChanged.connect(lambda url: self.url_bar.setText(url.toString()))
         self.btn_download.clicked.connect(self._on_download_clicked)
 
         # 마우스 앞/뒤 버튼(일부 마우스): 브라우저 앞/뒤 동작 매핑
         self._enable_mouse_nav = True
 
+        # --- 다운로드 작업 관리 (여러 작업을 큐로 실행, 목록 창은 모달 아님) ---
+        self.download_manager = DownloadManager(self, journal=get_job_journal())
+        self.job_window = JobListWindow(self.download_manager, self)
+        self.download_manager.job_updated.connect(self._on_job_updated)
+
+        # --- 미리 분석 (열려 있는 다운로드 팝업이 있으면 결과로 갱신) ---
+        self._popup = None
+        self.prefetcher = Prefetcher(on_ready=self.prefetch_ready.emit)
+        self.prefetch_ready.connect(self._on_prefetch_ready)
+
+        # --- 제어 API (선택) ---
+        self.control_api = None
+        self.sync_scheduler = None
+        if api_port is not None:
+            self._start_control_api(api_port, api_token)
+
+    def finish_startup(self):
+        """첫 화면을 그린 뒤 호출: 웹 뷰 생성, 중단된 작업 복원"""
+        from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+        self.web = QWebEngineView(self)
+        self.web.urlChanged.connect(self._on_url_changed)
+        self._layout.replaceWidget(self.web_placeholder, self.web)
+        self.web_placeholder.deleteLater()
+        # 웹 뷰가 생기기 전에 주소 표시줄에서 이동한 주소가 있으면 그 주소로 연다.
+        self.web.setUrl(QUrl(self.url_bar.text().strip() or self.home_url))
+
+        # 이전 실행에서 끝나지 않은 작업 이어서 진행
+        restored = self.download_manager.restore_unfinished()
+        if restored:
+            self.statusBar().showMessage(f"중단된 작업 {restored}개를 이어서 진행합니다.", 5000)
+            self.job_window.show()
+
+        # 구독이 있으면 주기적으로 새 영상 확인 (cli.py --sync-add로 추가)
+        self._start_sync()
+
     # ===================
     #     동작 핸들러
     # ===================
@@ -79,14 +125,20 @@ class BrowserWindow(QMainWindow):
         if self._is_invalid_url(url):
             return
 
-        self.web.setUrl(QUrl(url))
+        # 웹 뷰 생성 전이면 주소 표시줄의 주소로 열린다. (finish_startup)
+        if self.web is not None:
+            self.web.setUrl(QUrl(url))
+
+    def _on_url_changed(self, url):
+        self.url_bar.setText(url.toString())
+        self.prefetcher.request(url.toString())
 
     def _go_back(self):
-        if self.web.history().canGoBack():
+        if self.web is not None and self.web.history().canGoBack():
             self.web.back()
 
     def _go_forward(self):
-        if self.web.history().canGoForward():
+        if self.web is not None and self.web.history().canGoForward():
             self.web.forward()
 
     def _on_download_clicked(self):
@@ -99,9 +151,16 @@ class BrowserWindow(QMainWindow):
         if self._is_invalid_url(current_url):
             return
 
-        popup = DownloadPopup(current_url, self)
+        # 아직 분석 전이면 기다리지 않고 바로 시작 (팝업은 기본 목록으로 열렸다가 결과가 오면 갱신)
+        summary = self.prefetcher.summary(current_url)
+        if summary is None:
+            self.prefetcher.request(current_url, delay=0)
+        popup = DownloadPopup(current_url, self, summary=summary)
 
-        if popup.exec():
+        self._popup = popup
+        accepted = popup.exec()
+        self._popup = None
+        if accepted:
             options = popup.result_data
             self._start_download(options)
 
@@ -138,29 +197,58 @@ class BrowserWindow(QMainWindow):
     #     main logic
     # ===================
     def _start_download(self, options):
-        self.progress_dialog = ProgressDialog(self)
-        self.download_thread = DownloadThread(options)
-
-        # 연결
-        self.download_thread.progress_signal.connect(self.progress_dialog.update_progress)
-        self.download_thread.finished_signal.connect(self._on_download_finished)
-        self.download_thread.error_signal.connect(self._on_download_error)
-        self.progress_dialog.btn_cancel.clicked.connect(self._cancel_download)
-
-        # 실행
-        self.download_thread.start()
-        self.progress_dialog.exec()
-
-    def _on_download_finished(self, msg):
-        self.progress_dialog.close()
-        QMessageBox.information(self, "완료", msg)
-
-    def _on_download_error(self, msg):
-        self.progress_dialog.close()
-        QMessageBox.critical(self, "오류", msg)
+        self.download_manager.submit(options)
+        self.job_window.show()
+        self.job_window.raise_()
+
+    def _start_control_api(self, port, token):
+        from core.api import ControlServer
+
+        control = ManagerControl(self.download_manager)
+        server = ControlServer(control.submit, control.cancel, port=port, token=token)
+        try:
+            port = server.start()
+        except OSError as e:
+            self.statusBar().showMessage(f"제어 API를 시작하지 못했습니다: {e}", 10000)
+            return
+        control.add_listener(server.publish)
+        self.control_api = server
+        self.statusBar().showMessage(f"제어 API: http://127.0.0.1:{port}/jobs", 5000)
 
-    def _cancel_download(self):
-        self.download_thread.cancel()
-        self.progress_dialog.close()
-        QMessageBox.information(self, "취소됨", "다운로드가 취소되었습니다.")
+    def _start_sync(self):
+        from core.sync import DEFAULT_SYNC_PATH, SyncRunner, SyncScheduler, get_sync_store
 
+        self.sync_scheduler = None
+        if not os.path.exists(DEFAULT_SYNC_PATH):
+            return
+        control = ManagerControl(self.download_manager)
+        # 확인 스레드에서 메인 스레드로 작업 등록 (결과를 기다리지 않음: 창을 닫을 때 stop()과 엇갈리지 않게)
+        runner = SyncRunner(get_sync_store(), lambda options: control.call(self.download_manager.submit, options))
+        self._sync_runner = runner
+        self.sync_scheduler = SyncScheduler(runner)
+        self.sync_scheduler.start()
+
+    def _on_prefetch_ready(self, key):
+        if self._popup is not None and canonical_key(self._popup.url) == key:
+            self._popup.apply_summary(self.prefetcher.summary(self._popup.url))
+
+    def _on_job_updated(self, job_id):
+        job = self.download_manager.jobs[job_id]
+        if job.state in (DONE, FAILED) and self.sync_scheduler is not None:
+            self._sync_runner.job_finished(job.options, job.state == DONE)
+        if job.state == DONE:
+            self.statusBar().showMessage(f"완료: {job.url}", 5000)
+        elif job.state == FAILED:
+            self.statusBar().showMessage(f"오류: {job.url} — {job.status_text}", 10000)
+
+    def closeEvent(self, event):
+        if self.sync_scheduler is not None:
+            self.sync_scheduler.stop(timeout=5)
+        self.prefetcher.shutdown()
+        if self.control_api is not None:
+            self.control_api.stop()
+        self.download_manager.shutdown()
+        # 다운로드 스레드가 모두 끝난 뒤 쉬고 있는 YoutubeDL 세션을 닫는다. (쿠키 저장, 연결 정리)
+        from core.sessions import get_session_pool
+        get_session_pool().close()
+        super().closeEvent(event)
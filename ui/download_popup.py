@@ -6,6 +6,23 @@ from PyQt6.QtWidgets import (
 
 from PyQt6.QtCore import Qt
 
+from core.formats import choose
+from core.options import (
+    AUDIO_BITRATES, AUDIO_FORMATS, AUDIO_PRESETS, DEFAULT_AUDIO_BITRATE, DEFAULT_CONTAINER, DEFAULT_OUTPUT_PATH,
+    QUALITY_HEIGHTS, QUALITY_LABEL_HEIGHTS, QUALITY_PRESETS, SUBTITLE_FORMAT_LABELS,
+)
+from core.telemetry import get_telemetry_sink
+
+# 미리 분석한 정보가 없을 때 보여줄 자막 언어
+DEFAULT_SUBTITLES = [("ko", "한국어"), ("en", "영어"), ("th", "태국어")]
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f}{unit}" if unit in ("B", "KB") else f"{size:.1f}{unit}"
+        size /= 1024
+
 
 class DownloadPopup(QDialog):
     """
@@ -13,19 +30,24 @@ class DownloadPopup(QDialog):
     - 품질, 포맷, 자막, 세그먼트, 저장 경로를 설정
         - 품질 선택: 480p / 720p / 1080p / 4K
         - 선택한 해상도가 지원되지 않으면 자동으로 그 영상의 최고 화질로 다운로드
+        - 최대 크기 / 완료 시간 목표를 주면 영상마다 포맷 표에서 목표 안의 가장 좋은 화질을 고른다. (core.formats)
+          화질이 같으면 더 작은 파일 (60fps 우선은 선택)
+        - 저장 포맷에서 오디오(mp3 / m4a / opus)를 고르면 오디오만 받아 선택한 비트레이트로 변환
     - "다운로드 시작" 버튼 클릭 시 선택 결과를 콘솔에 출력
+    - summary(Prefetcher 요약)가 있으면 그 영상의 실제 해상도 / 예상 크기 / 자막 언어를 보여준다.
+      (팝업이 열린 뒤 분석이 끝나면 apply_summary()로 갱신)
     """
-    def __init__(self, url: str, parent=None):
+    def __init__(self, url: str, parent=None, summary=None):
         print("Popup init 시작")
         super().__init__(parent)
         print("Popup 호출 완료")
         self.url = url
 
-        self.output_path =  os.path.join(os.getcwd(), "downloads")
+        self.output_path = DEFAULT_OUTPUT_PATH
         os.makedirs(self.output_path, exist_ok=True)
 
         self.setWindowTitle("다운로드 옵션 설정")
-        self.setFixedSize(400, 600)
+        self.setFixedSize(400, 910)
 
 
         layout = QVBoxLayout()
@@ -37,26 +59,60 @@ class DownloadPopup(QDialog):
         layout.addWidget(QLabel("품질 선택:"))
         self.combo_quality = QComboBox()
 
-        # 사용자에게 표시할 라벨과 실제 yt-dlp format 매핑
-        self.quality_map = {
-            "4K (2160p)": "bestvideo[height<=2160]+bestaudio/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]",
-            "1440p (QHD)": "bestvideo[height<=1440][ext=mp4]+bestaudio[ext=m4a]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]",
-            "1080p (Full HD)": "bestvideo[height<=1080]+bestaudio[ext=m4a]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]",
-            "720p (HD)": "bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]",
-            "480p (SD)": "bestvideo[height<=480][ext=mp4]+bestaudio[ext=m4a]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]"
-        }
-
-        self.combo_quality.addItems(list(self.quality_map.keys()))
+        # 사용자에게 표시할 라벨과 실제 yt-dlp format 매핑 (항목 data = 프리셋 라벨)
+        self.quality_map = QUALITY_PRESETS
         layout.addWidget(self.combo_quality)
 
+        # 영상 하나의 최대 크기 / 작업 전체 완료 시간 (최근 다운로드 속도 기준)
+        layout.addWidget(QLabel("목표 (최대 크기 MB / 완료 시간 분):"))
+        budget_row = QHBoxLayout()
+        self.spin_size_budget = QSpinBox()
+        self.spin_size_budget.setRange(0, 100000)
+        self.spin_size_budget.setSingleStep(100)
+        self.spin_size_budget.setSpecialValueText("크기 제한 없음")
+        self.spin_time_budget = QSpinBox()
+        self.spin_time_budget.setRange(0, 24 * 60)
+        self.spin_time_budget.setSpecialValueText("시간 제한 없음")
+        budget_row.addWidget(self.spin_size_budget)
+        budget_row.addWidget(self.spin_time_budget)
+        layout.addLayout(budget_row)
+        # 목표가 없으면 품질 프리셋 그대로, 체크하면 목표 없이도 포맷 표에서 같은 화질의 가장 작은 파일
+        self.checkbox_smallest = QCheckBox("같은 화질이면 가장 작은 파일")
+        layout.addWidget(self.checkbox_smallest)
+        self.checkbox_prefer_fps = QCheckBox("60fps 우선 (같은 해상도면 더 큰 파일이라도)")
+        layout.addWidget(self.checkbox_prefer_fps)
+        # 포맷 표로 고를 때(목표 / 가장 작은 파일) 고를 포맷과 예상 크기 (미리 분석한 포맷 표 기준)
+        self.label_projection = QLabel("")
+        layout.addWidget(self.label_projection)
+        self.link_speed = get_telemetry_sink().link_speed()
+
         # ==========================
         # 포맷 선택
         # ==========================
         layout.addWidget(QLabel("저장 포맷:"))
         self.combo_format = QComboBox()
-        self.combo_format.addItems(["mp4(4k이하) 또는 webm(4k)"])
+        # 항목 data = 오디오 저장 형식 (영상이면 None)
+        self.combo_format.addItem(DEFAULT_CONTAINER, None)
+        for key, label in AUDIO_FORMATS.items():
+            self.combo_format.addItem(label, key)
         layout.addWidget(self.combo_format)
 
+        # 오디오 변환 비트레이트 (원본 코덱이 저장 형식과 같으면 변환 없이 복사)
+        layout.addWidget(QLabel("오디오 비트레이트 (변환 시):"))
+        self.combo_audio_bitrate = QComboBox()
+        for bitrate in AUDIO_BITRATES:
+            self.combo_audio_bitrate.addItem(f"{bitrate} kbps", bitrate)
+        self.combo_audio_bitrate.setCurrentIndex(AUDIO_BITRATES.index(DEFAULT_AUDIO_BITRATE))
+        self.combo_audio_bitrate.setEnabled(False)
+        layout.addWidget(self.combo_audio_bitrate)
+        self.combo_format.currentIndexChanged.connect(self._on_format_changed)
+        self.combo_format.currentIndexChanged.connect(self._update_projection)
+        self.combo_quality.currentIndexChanged.connect(self._update_projection)
+        self.spin_size_budget.valueChanged.connect(self._update_projection)
+        self.spin_time_budget.valueChanged.connect(self._update_projection)
+        self.checkbox_smallest.stateChanged.connect(self._update_projection)
+        self.checkbox_prefer_fps.stateChanged.connect(self._update_projection)
+
         # ==========================
         # 자막 설정
         # ==========================
@@ -71,15 +127,17 @@ class DownloadPopup(QDialog):
         self.subtitle_list = QListWidget()
         self.subtitle_list.setMaximumHeight(180)
         # self.subtitle_list.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.AsNeeded)
-        for lang_label in ["한국어(ko)", "영어(en)", "태국어(th)"]:
-            item = QListWidgetItem(lang_label)
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-            item.setCheckState(Qt.CheckState.Unchecked)
-            self.subtitle_list.addItem(item)
-
         layout.addWidget(self.subtitle_list)
         self.subtitle_list.setEnabled(False)  # 기본적으로 비활성화
 
+        # 자막만 받을 때 저장 형식 (VTT를 프로세스 안에서 변환)
+        layout.addWidget(QLabel("자막 저장 형식 (자막만 다운로드):"))
+        self.combo_subtitle_format = QComboBox()
+        for key, label in SUBTITLE_FORMAT_LABELS.items():
+            self.combo_subtitle_format.addItem(label, key)
+        self.combo_subtitle_format.setEnabled(False)
+        layout.addWidget(self.combo_subtitle_format)
+
         self.checkbox_subtitle.stateChanged.connect(self._on_subtitle_toggle)  # 체크 상태 변화 시 콤보박스 활성/비활성
         self.checkbox_subtitle_only.stateChanged.connect(self._toggle_subtitle_only) # 체크 상태 변화 시 콤보박스 활성/비활성
 
@@ -88,10 +146,38 @@ class DownloadPopup(QDialog):
         # ==========================
         layout.addWidget(QLabel("동시 세그먼트 수:"))
         self.spin_fragments = QSpinBox()
-        self.spin_fragments.setRange(1, 32)
-        self.spin_fragments.setValue(16)
+        # 0 = 자동 (측정한 속도 / 재시도에 맞춰 조절하고 사이트별로 기억)
+        self.spin_fragments.setRange(0, 32)
+        self.spin_fragments.setSpecialValueText("자동")
+        self.spin_fragments.setValue(0)
         layout.addWidget(self.spin_fragments)
 
+        # ==========================
+        # 플레이리스트 동시 다운로드 영상 수
+        # ==========================
+        layout.addWidget(QLabel("동시 다운로드 영상 수 (플레이리스트):"))
+        self.spin_workers = QSpinBox()
+        self.spin_workers.setRange(1, 8)
+        self.spin_workers.setValue(3)
+        layout.addWidget(self.spin_workers)
+
+        # ==========================
+        # 대역폭 (다른 작업과 함께 쓰는 전체 제한 안에서)
+        # ==========================
+        layout.addWidget(QLabel("속도 제한 (KB/s) / 대역폭 가중치:"))
+        bandwidth_row = QHBoxLayout()
+        self.spin_rate_limit = QSpinBox()
+        self.spin_rate_limit.setRange(0, 1000000)
+        self.spin_rate_limit.setSingleStep(256)
+        self.spin_rate_limit.setSpecialValueText("무제한")
+        self.spin_weight = QSpinBox()
+        # 전체 제한이 있을 때 다른 작업보다 몇 배 더 받을지
+        self.spin_weight.setRange(1, 10)
+        self.spin_weight.setPrefix("×")
+        bandwidth_row.addWidget(self.spin_rate_limit)
+        bandwidth_row.addWidget(self.spin_weight)
+        layout.addLayout(bandwidth_row)
+
         # ==========================
         # 저장 경로 선택
         # ==========================
@@ -110,11 +196,113 @@ class DownloadPopup(QDialog):
         layout.addLayout(btn_row)
 
         self.setLayout(layout)
+        self.apply_summary(summary)
 
         # 이벤트 연결 (시그널)
         self.btn_cancel.clicked.connect(self.reject)
         self.btn_ok.clicked.connect(self._on_download_clicked)
 
+    # -------------------------------------
+    # 미리 분석한 정보 반영
+    # -------------------------------------
+    def apply_summary(self, summary):
+        """품질 / 자막 목록을 summary 기준으로 다시 채운다. (선택은 가능한 한 유지)"""
+        self.summary = summary
+        if summary and summary.get("title"):
+            self.setWindowTitle(f"다운로드 옵션 설정 - {summary['title']}")
+        self._fill_quality(summary)
+        self._fill_subtitles(summary)
+        self._update_projection()
+
+    def _fill_quality(self, summary):
+        selected = self.combo_quality.currentData()
+        heights = (summary or {}).get("heights") or {}
+        presets = sorted(QUALITY_HEIGHTS, reverse=True)
+        if heights:
+            # 영상 최고 해상도 이하 프리셋 + 그 위 가장 가까운 프리셋 하나 (같은 결과를 고르는 항목은 숨김)
+            top = max(heights)
+            above = [h for h in presets if h >= top]
+            presets = [h for h in presets if h < top] + ([min(above)] if above else [])
+            presets.sort(reverse=True)
+
+        self.combo_quality.clear()
+        for preset_height in presets:
+            label = QUALITY_HEIGHTS[preset_height]
+            text = label
+            available = [h for h in heights if h <= preset_height]
+            # 포맷 표가 있으면 실제로 고를 조합의 크기 (화질이 같으면 작은 파일)
+            choice = choose(summary.get("formats") or [], preset_height) if available else None
+            if choice is not None:
+                text += f" — {choice['height']}p" if choice["height"] != preset_height else ""
+                text += f" · 약 {_format_bytes(choice['size'])}" if choice["size"] else ""
+            elif available:
+                best = max(available)
+                size = heights[best]
+                text += f" — {best}p" if best != preset_height else ""
+                text += f" · 약 {_format_bytes(size)}" if size else ""
+            self.combo_quality.addItem(text, label)
+
+        index = self.combo_quality.findData(selected)
+        self.combo_quality.setCurrentIndex(max(index, 0))
+
+    def _budget_bytes(self):
+        """영상 하나에 쓸 수 있는 크기 (목표 없으면 None, 플레이리스트는 시간 목표를 영상 수로 나눔)"""
+        limits = []
+        if self.spin_size_budget.value():
+            limits.append(self.spin_size_budget.value() * 1024 * 1024)
+        if self.spin_time_budget.value() and self.link_speed:
+            entries = (self.summary or {}).get("count") or 1
+            limits.append(self.link_speed * self.spin_time_budget.value() * 60 / entries)
+        return min(limits) if limits else None
+
+    def _table_selection(self):
+        """포맷 표에서 고르는지 (목표가 있거나 가장 작은 파일, 아니면 품질 프리셋 형식 문자열)"""
+        return bool(self.checkbox_smallest.isChecked() or self.spin_size_budget.value()
+                    or self.spin_time_budget.value())
+
+    def _update_projection(self, *_):
+        if self.combo_format.currentData() is not None or not self._table_selection():
+            self.label_projection.setText("")
+            return
+        if self.spin_time_budget.value() and not self.link_speed:
+            self.label_projection.setText("다운로드 속도 기록이 없어 시간 목표는 적용되지 않습니다.")
+            return
+        table = (self.summary or {}).get("formats")
+        if not table:
+            self.label_projection.setText("")
+            return
+        label = self.combo_quality.currentData()
+        height = QUALITY_LABEL_HEIGHTS.get(label)
+        budget = self._budget_bytes()
+        choice = choose(table, height, budget, self.checkbox_prefer_fps.isChecked())
+        if choice is None:
+            self.label_projection.setText("")
+            return
+        text = f"예상: {choice['height']}p{choice['fps'] or ''} {choice['codec']}"
+        if choice["size"]:
+            text += f" · 약 {_format_bytes(choice['size'])}"
+            if budget and choice["size"] > budget:
+                text += " (목표보다 큼: 가장 작은 포맷)"
+        self.label_projection.setText(text)
+
+    def _fill_subtitles(self, summary):
+        checked = set(self._get_selected_subtitles())
+        subtitles = (summary or {}).get("subtitles")
+        if summary is None or subtitles is None or summary.get("playlist"):
+            subtitles = DEFAULT_SUBTITLES
+
+        self.subtitle_list.clear()
+        if not subtitles:
+            item = QListWidgetItem("제공되는 자막 없음")
+            item.setFlags(Qt.ItemFlag.NoItemFlags)
+            self.subtitle_list.addItem(item)
+            return
+        for code, name in subtitles:
+            item = QListWidgetItem(f"{name}({code})")
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked if code in checked else Qt.CheckState.Unchecked)
+            self.subtitle_list.addItem(item)
+
     # -------------------------------------
     # 자막 체크 상태에 따라 언어 선택 제어
     # -------------------------------------
@@ -126,6 +314,13 @@ class DownloadPopup(QDialog):
         if not checked:
             self.checkbox_subtitle_only.setChecked(False)
 
+    def _on_format_changed(self, _index=None):
+        """오디오를 고르면 화질 선택 대신 비트레이트 선택"""
+        audio = self.combo_format.currentData() is not None
+        enabled = not self.checkbox_subtitle_only.isChecked()
+        self.combo_quality.setEnabled(enabled and not audio)
+        self.combo_audio_bitrate.setEnabled(enabled and audio)
+
     def _toggle_subtitle_only(self, state: int):
         """'자막만 다운로드' 체크 시 영상 관련 옵션 비활성화"""
         only = (state == Qt.CheckState.Checked.value)
@@ -133,13 +328,13 @@ class DownloadPopup(QDialog):
             # 자막만이면 자막 체크 강제 on
             if not self.checkbox_subtitle.isChecked():
                 self.checkbox_subtitle.setChecked(True)
-            self.combo_quality.setEnabled(False)
             self.combo_format.setEnabled(False)
             self.spin_fragments.setEnabled(False)
         else:
-            self.combo_quality.setEnabled(True)
             self.combo_format.setEnabled(True)
             self.spin_fragments.setEnabled(True)
+        self._on_format_changed()
+        self.combo_subtitle_format.setEnabled(only)
 
     def _get_selected_subtitles(self):
         langs = []
@@ -163,8 +358,9 @@ class DownloadPopup(QDialog):
     # 다운로드 버튼 클릭
     # -------------------------------------
     def _on_download_clicked(self):
-        selected_label = self.combo_quality.currentText()
-        format_string = self.quality_map[selected_label]
+        selected_label = self.combo_quality.currentData()
+        audio_format = self.combo_format.currentData()
+        format_string = AUDIO_PRESETS[audio_format] if audio_format else self.quality_map[selected_label]
 
         self.result_data = {
             "url": self.url,
@@ -173,7 +369,18 @@ class DownloadPopup(QDialog):
             "subtitle_only": self.checkbox_subtitle_only.isChecked(),
             "subtitle": self.checkbox_subtitle.isChecked(),
             "max_fragments": self.spin_fragments.value(),
+            "playlist_workers": self.spin_workers.value(),
             "output_path": self.output_path,
+            "subtitle_format": self.combo_subtitle_format.currentData(),
+            "rate_limit": self.spin_rate_limit.value() * 1024,
+            "bandwidth_weight": self.spin_weight.value(),
+            "audio_format": audio_format,
+            "audio_bitrate": self.combo_audio_bitrate.currentData(),
+            "max_height": QUALITY_LABEL_HEIGHTS.get(selected_label),
+            "size_budget": self.spin_size_budget.value() * 1024 * 1024,
+            "time_budget": self.spin_time_budget.value() * 60,
+            "prefer_fps": self.checkbox_prefer_fps.isChecked(),
+            "smallest_format": self.checkbox_smallest.isChecked(),
         }
 
         # 자막 받을 때만 언어 목록 포함
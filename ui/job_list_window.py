@@ -0,0 +1,114 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpinBox,
+    QTableWidget, QTableWidgetItem, QProgressBar, QHeaderView, QAbstractItemView,
+)
+
+from core.job_manager import STATE_LABELS
+
+
+class JobListWindow(QWidget):
+    """
+    다운로드 작업 목록 창 (모달 아님)
+    - 작업별 URL / 상태 / 진행률 / 메시지 표시
+    - 선택한 작업 일시정지 / 재개 / 취소 / 우선 실행
+    - 동시 실행 작업 수 설정
+    """
+
+    COL_URL, COL_STATE, COL_PROGRESS, COL_STATUS = range(4)
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self._rows = {}  # job_id -> row
+
+        self.setWindowFlag(Qt.WindowType.Window)
+        self.setWindowTitle("다운로드 목록")
+        self.resize(800, 400)
+
+        layout = QVBoxLayout()
+
+        # --- 작업 테이블 ---
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["URL", "상태", "진행률", "메시지"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(self.COL_URL, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(self.COL_STATUS, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        # --- 하단 컨트롤 ---
+        self.btn_pause = QPushButton("일시정지")
+        self.btn_resume = QPushButton("재개")
+        self.btn_cancel = QPushButton("취소")
+        self.btn_top = QPushButton("우선 실행")
+        self.spin_concurrent = QSpinBox()
+        self.spin_concurrent.setRange(1, 8)
+        self.spin_concurrent.setValue(manager.max_concurrent)
+
+        btn_row = QHBoxLayout()
+        btn_row.addWidget(self.btn_pause)
+        btn_row.addWidget(self.btn_resume)
+        btn_row.addWidget(self.btn_cancel)
+        btn_row.addWidget(self.btn_top)
+        btn_row.addStretch()
+        btn_row.addWidget(QLabel("동시 작업 수:"))
+        btn_row.addWidget(self.spin_concurrent)
+        layout.addLayout(btn_row)
+
+        self.setLayout(layout)
+
+        # --- 시그널 연결 ---
+        self.btn_pause.clicked.connect(lambda: self._for_selected(self.manager.pause))
+        self.btn_resume.clicked.connect(lambda: self._for_selected(self.manager.resume))
+        self.btn_cancel.clicked.connect(lambda: self._for_selected(self.manager.cancel))
+        self.btn_top.clicked.connect(self._move_to_top)
+        self.spin_concurrent.valueChanged.connect(self.manager.set_max_concurrent)
+        self.manager.job_added.connect(self._add_row)
+        self.manager.job_updated.connect(self._update_row)
+
+    # -------------------------------------
+    # 테이블 갱신
+    # -------------------------------------
+    def _add_row(self, job_id):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self._rows[job_id] = row
+
+        url_item = QTableWidgetItem(self.manager.jobs[job_id].url)
+        url_item.setData(Qt.ItemDataRole.UserRole, job_id)
+        self.table.setItem(row, self.COL_URL, url_item)
+        self.table.setItem(row, self.COL_STATE, QTableWidgetItem())
+        self.table.setItem(row, self.COL_STATUS, QTableWidgetItem())
+
+        bar = QProgressBar()
+        bar.setRange(0, 100)
+        self.table.setCellWidget(row, self.COL_PROGRESS, bar)
+        self._update_row(job_id)
+
+    def _update_row(self, job_id):
+        row = self._rows.get(job_id)
+        if row is None:
+            return
+        job = self.manager.jobs[job_id]
+        self.table.item(row, self.COL_STATE).setText(STATE_LABELS[job.state])
+        # 여러 줄 상태 문구는 한 줄로 표시
+        self.table.item(row, self.COL_STATUS).setText(" ".join(job.status_text.split()))
+        self.table.cellWidget(row, self.COL_PROGRESS).setValue(int(job.percent))
+
+    # -------------------------------------
+    # 버튼 동작
+    # -------------------------------------
+    def _selected_job_ids(self):
+        rows = {index.row() for index in self.table.selectionModel().selectedRows()}
+        return [self.table.item(row, self.COL_URL).data(Qt.ItemDataRole.UserRole) for row in sorted(rows)]
+
+    def _for_selected(self, action):
+        for job_id in self._selected_job_ids():
+            action(job_id)
+
+    def _move_to_top(self):
+        top = max((job.priority for job in self.manager.jobs.values()), default=0) + 1
+        for job_id in self._selected_job_ids():
+            self.manager.set_priority(job_id, top)
@@ -0,0 +1,89 @@
+from concurrent.futures import Future
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.job_manager import DEFAULT_MAX_CONCURRENT, JobScheduler
+
+
+class DownloadManager(QObject, JobScheduler):
+    """
+    JobScheduler의 Qt 어댑터
+    - job_added(job_id), job_updated(job_id) 시그널로 UI에 상태 변화를 알림
+    - 작업은 core.downloader.DownloadThread(QThread)로 실행
+    """
+
+    job_added = pyqtSignal(int)
+    job_updated = pyqtSignal(int)
+
+    def __init__(self, parent=None, max_concurrent: int = DEFAULT_MAX_CONCURRENT, journal=None):
+        # PyQt의 협조적 다중 상속: 남은 키워드 인자는 JobScheduler.__init__으로 넘어간다.
+        super().__init__(parent, max_concurrent=max_concurrent, journal=journal)
+
+    def _job_added(self, job_id):
+        self.job_added.emit(job_id)
+
+    def _job_updated(self, job_id):
+        self.job_updated.emit(job_id)
+
+    def _create_thread(self, job):
+        # yt_dlp를 포함한 다운로드 모듈은 첫 작업 때 로드한다. (보통 시작 직후 prewarm()으로 미리 로드됨)
+        from core.downloader import DownloadThread
+
+        thread = DownloadThread(job.options)
+        thread.progress_signal.connect(lambda p, text, job_id=job.id: self._on_progress(job_id, p, text))
+        thread.finished_signal.connect(lambda msg, job_id=job.id: self._on_finished(job_id, msg))
+        thread.error_signal.connect(lambda msg, job_id=job.id: self._on_error(job_id, msg))
+        thread.finished.connect(lambda thread=thread: self._thread_exited(thread))
+        return thread
+
+
+class ManagerControl(QObject):
+    """
+    다른 스레드(제어 API)에서 DownloadManager를 조작한다.
+    - call(func, *args)는 func를 메인 스레드 이벤트 루프에서 실행하고 결과를 Future로 돌려준다.
+    - add_listener(publish): 작업이 추가 / 변경될 때마다 publish(job.to_dict()) 호출 (기존 작업은 바로 한 번씩)
+    """
+
+    _call = pyqtSignal(object)
+
+    def __init__(self, manager: DownloadManager):
+        super().__init__(manager)
+        self.manager = manager
+        # 다른 스레드에서 emit하면 큐로 전달되어 메인 스레드에서 실행된다.
+        self._call.connect(self._run)
+
+    def add_listener(self, publish):
+        for job in self.manager.jobs.values():
+            publish(job.to_dict())
+        self.manager.job_added.connect(lambda job_id: publish(self.manager.jobs[job_id].to_dict()))
+        self.manager.job_updated.connect(lambda job_id: publish(self.manager.jobs[job_id].to_dict()))
+
+    def call(self, func, *args) -> Future:
+        future = Future()
+        self._call.emit((func, args, future))
+        return future
+
+    def _run(self, task):
+        func, args, future = task
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+    # -------------------------------------
+    # ControlServer 콜백 (API 스레드에서 호출)
+    # -------------------------------------
+    def submit(self, options: dict, priority: int = 0) -> int:
+        return self.call(self.manager.submit, options, priority).result()
+
+    def cancel(self, job_id: int) -> bool:
+        return self.call(self._cancel, job_id).result()
+
+    def _cancel(self, job_id):
+        job = self.manager.jobs.get(job_id)
+        if job is None or job.is_finished():
+            return False
+        self.manager.cancel(job_id)
+        return True